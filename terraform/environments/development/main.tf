@@ -28,6 +28,8 @@ locals {
   csr_bucket_name           = "${var.project_name}-csr-${var.environment}"
   log_bucket_name           = "${var.project_name}-logs-${var.environment}"
   static_bucket_name        = "${var.project_name}-static-${var.environment}"
+  # The static-site module's bucket, named here to avoid a cycle with the edge functions.
+  static_site_bucket_name = "${var.project_name}-${var.environment}-static"
   download_tracking_table   = "${var.project_name}-download-tracking"
   log_upload_tracking_table = "${var.project_name}-log-uploads"
   csr_uploads_table         = "${var.project_name}-csr-uploads-${var.environment}"
@@ -155,6 +157,8 @@ module "lambda_log_download" {
   notify_template_id = local.notify_templates.log_download
   alerts_team_emails = "alec.ashmore@digital.cabinet-office.gov.uk"
   log_invite_tracking_table = module.lambda_log_upload.log_invite_tracking_table_name
+  log_upload_tracking_table = module.lambda_log_upload.log_upload_tracking_table_name
+  dynamodb_replica_regions  = var.dynamodb_replica_regions
 }
 
 # Log upload Lambda
@@ -190,6 +194,8 @@ module "lambda_edge_log_download" {
   environment                 = local.environment
   download_tracking_table     = local.download_tracking_table
   dynamodb_region             = local.aws_region
+  dynamodb_replica_regions    = var.dynamodb_replica_regions
+  dynamodb_replica_routes     = var.dynamodb_replica_routes
   cloudfront_distribution_arn = module.operator_request_portal_static_site.cloudfront_distribution_arn
   cloudfront_distribution_id  = module.operator_request_portal_static_site.cloudfront_distribution_id
 
@@ -205,6 +211,9 @@ module "lambda_edge_log_upload" {
   environment                = local.environment
   upload_domain              = local.domain_name
   dynamodb_region            = local.aws_region
+  dynamodb_replica_regions   = var.dynamodb_replica_regions
+  dynamodb_replica_routes    = var.dynamodb_replica_routes
+  upload_bucket_name         = local.static_site_bucket_name
   cloudfront_distribution_id = module.operator_request_portal_static_site.cloudfront_distribution_id
 
   providers = {
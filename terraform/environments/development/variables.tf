@@ -49,4 +49,16 @@ variable "tags" {
   description = "Common tags to apply to all resources"
   type        = map(string)
   default     = {}
-}
\ No newline at end of file
+}
+
+variable "dynamodb_replica_regions" {
+  description = "Regions holding global-table replicas of the edge tracking tables"
+  type        = list(string)
+  default     = []
+}
+
+variable "dynamodb_replica_routes" {
+  description = "Lambda@Edge executing region => nearest replica region, for edge regions without a replica"
+  type        = map(string)
+  default     = {}
+}
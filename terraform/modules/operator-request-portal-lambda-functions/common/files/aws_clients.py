@@ -0,0 +1,103 @@
+"""
+Shared boto3 client registry for the operator portal Lambda functions.
+
+Building a boto3 client costs tens of milliseconds of CPU (endpoint resolution,
+credential lookup, service model loading), so each client is built once per container
+on first request and then reused by every invocation and every thread. Every API call
+a client makes is timed as a metrics stage (see metrics.instrument_client).
+
+boto3 itself is only imported when the first client is built. In lazy-init mode
+(AWS_CLIENTS_LAZY_INIT=true, or {"lazy_init": true} in an embedded aws_clients.json
+for Lambda@Edge, which has no environment variables) get_client returns a LazyClient
+instead, so a handler's module-level clients cost nothing until its first API call and
+a cold start that never reaches AWS (e.g. a request rejected at the edge) never imports
+boto3 at all.
+
+This file is packaged alongside each handler by its archive_file data source.
+"""
+
+import json
+import os
+import threading
+from functools import cache
+
+import metrics
+
+SETTINGS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "aws_clients.json")
+
+
+def _load_lazy_init(path: str = SETTINGS_FILE) -> bool:
+    try:
+        with open(path, encoding="utf-8") as f:
+            return bool(json.load(f).get("lazy_init", False))
+    except FileNotFoundError:
+        return os.environ.get("AWS_CLIENTS_LAZY_INIT", "false").lower() == "true"
+
+
+LAZY_INIT = _load_lazy_init()
+
+# Keyword arguments for the botocore Config shared by every client (see client_config).
+CLIENT_SETTINGS = {
+    "max_pool_connections": int(os.environ.get("AWS_CLIENT_MAX_POOL_CONNECTIONS", "10")),
+    "tcp_keepalive": True,
+    "connect_timeout": int(os.environ.get("AWS_CLIENT_CONNECT_TIMEOUT_SECONDS", "3")),
+    "read_timeout": int(os.environ.get("AWS_CLIENT_READ_TIMEOUT_SECONDS", "10")),
+    "retries": {"mode": "adaptive", "max_attempts": int(os.environ.get("AWS_CLIENT_MAX_ATTEMPTS", "3"))},
+}
+
+_clients = {}
+_lazy_clients = {}
+_lock = threading.Lock()
+
+
+@cache
+def client_config():
+    """The botocore Config for every client, built (importing botocore) on first use."""
+    from botocore.config import Config
+
+    return Config(**CLIENT_SETTINGS)
+
+
+class LazyClient:
+    """
+    Stands in for the registry's client for service_name/region_name, which is built on
+    the first attribute access (normally the first API call) and looked up on every
+    access after that, so reset_clients still takes effect.
+    """
+
+    def __init__(self, service_name: str, region_name: str = None):
+        self.service_name = service_name
+        self.region_name = region_name
+
+    def __getattr__(self, name):
+        return getattr(get_client(self.service_name, self.region_name, lazy=False), name)
+
+
+def get_client(service_name: str, region_name: str = None, lazy: bool = None):
+    """
+    Return the container-wide client for service_name/region_name, building it on first
+    use. With lazy (defaulting to LAZY_INIT) returns its container-wide LazyClient instead.
+    """
+    key = (service_name, region_name)
+    if LAZY_INIT if lazy is None else lazy:
+        with _lock:
+            return _lazy_clients.setdefault(key, LazyClient(service_name, region_name))
+
+    client = _clients.get(key)
+    if client is None:
+        with _lock:
+            client = _clients.get(key)
+            if client is None:
+                import boto3
+
+                client = metrics.instrument_client(
+                    boto3.client(service_name, region_name=region_name, config=client_config())
+                )
+                _clients[key] = client
+    return client
+
+
+def reset_clients():
+    """Drop every cached client, e.g. after rotating credentials in a long-lived test process."""
+    with _lock:
+        _clients.clear()
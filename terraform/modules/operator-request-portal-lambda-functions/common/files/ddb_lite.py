@@ -0,0 +1,357 @@
+"""
+Minimal DynamoDB client for Lambda@Edge, using only the standard library.
+
+Covers the operations the edge functions make (GetItem and UpdateItem) over the
+DynamoDB JSON protocol: a SigV4-signed POST to / with the operation named in
+X-Amz-Target. Request parameters and responses are the same dicts boto3's low-level
+client takes and returns (attribute values stay in their typed form, e.g. {"S": "x"};
+binary values are left base64-encoded), and a failed call raises a ClientError whose
+.response matches botocore's, so ddb_routing and the handlers work with either client.
+
+Importing boto3 and building a client dominates an edge cold start (see
+docs/cold-start.md); this client costs neither. It pools keep-alive connections
+across invocations, with TCP keep-alive probes, and can open them during the init
+phase (preconnect) so a warm container's requests skip the TCP and TLS handshakes.
+
+Credentials come from the Lambda environment (AWS_ACCESS_KEY_ID, AWS_SECRET_ACCESS_KEY,
+AWS_SESSION_TOKEN). DYNAMODB_ENDPOINT_URL, or endpoint_url, points the client at
+DynamoDB Local or moto_server instead of the regional endpoint.
+
+This file is packaged alongside each handler by its archive_file data source.
+"""
+
+import hashlib
+import hmac
+import http.client
+import json
+import os
+import random
+import socket
+import ssl
+import threading
+import time
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from urllib.parse import urlsplit
+
+import metrics
+
+SERVICE = "dynamodb"
+TARGET_PREFIX = "DynamoDB_20120810"
+CONTENT_TYPE = "application/x-amz-json-1.0"
+ALGORITHM = "AWS4-HMAC-SHA256"
+
+TIMEOUT_SECONDS = 3
+PRECONNECT_TIMEOUT_SECONDS = 1
+MAX_ATTEMPTS = 3
+BACKOFF_BASE_SECONDS = 0.025
+
+MAX_POOL_CONNECTIONS = 4
+# A connection idle for longer is closed rather than reused: a frozen container's
+# connections are likely to have been dropped by the far end (load balancers commonly
+# time out idle connections at 60s), and a request sent on one could hang until the
+# timeout instead of failing fast.
+MAX_IDLE_SECONDS = 50
+# (socket option, value): first probe after 15s idle, then every 5s, dead after 3.
+KEEPALIVE_OPTIONS = (("TCP_KEEPIDLE", 15), ("TCP_KEEPINTVL", 5), ("TCP_KEEPCNT", 3))
+
+# Error codes worth another attempt, as in botocore's standard retry mode.
+RETRYABLE_ERROR_CODES = (
+    "ProvisionedThroughputExceededException",
+    "ThrottlingException",
+    "RequestLimitExceeded",
+    "InternalServerError",
+    "ServiceUnavailable",
+)
+
+_ssl_context = None
+_clients = {}
+_lock = threading.Lock()
+
+
+class ClientError(Exception):
+    """A DynamoDB error response, shaped like botocore.exceptions.ClientError."""
+
+    def __init__(self, error_response: dict, operation_name: str):
+        error = error_response.get("Error", {})
+        super().__init__(
+            f"An error occurred ({error.get('Code', 'Unknown')}) when calling the {operation_name} "
+            f"operation: {error.get('Message', '')}"
+        )
+        self.response = error_response
+        self.operation_name = operation_name
+
+
+class ConditionalCheckFailedException(ClientError):
+    pass
+
+
+class TransactionCanceledException(ClientError):
+    pass
+
+
+class ResourceNotFoundException(ClientError):
+    pass
+
+
+class ProvisionedThroughputExceededException(ClientError):
+    pass
+
+
+ERRORS = {
+    cls.__name__: cls
+    for cls in (
+        ConditionalCheckFailedException,
+        TransactionCanceledException,
+        ResourceNotFoundException,
+        ProvisionedThroughputExceededException,
+    )
+}
+
+
+def _hmac(key: bytes, message: str) -> bytes:
+    return hmac.new(key, message.encode("utf-8"), hashlib.sha256).digest()
+
+
+def signing_key(secret_key: str, date_stamp: str, region: str, service: str = SERVICE) -> bytes:
+    key = _hmac(f"AWS4{secret_key}".encode("utf-8"), date_stamp)
+    for part in (region, service, "aws4_request"):
+        key = _hmac(key, part)
+    return key
+
+
+def sign(headers: dict, body: bytes, region: str, credentials: dict, now: datetime) -> dict:
+    """
+    Add X-Amz-Date, X-Amz-Security-Token (for temporary credentials) and a SigV4
+    Authorization header to headers, for a POST of body to /. Every header already in
+    headers (which must include Host) is signed. Returns headers.
+    """
+    amz_date = now.strftime("%Y%m%dT%H%M%SZ")
+    date_stamp = amz_date[:8]
+    headers["X-Amz-Date"] = amz_date
+    if credentials.get("token"):
+        headers["X-Amz-Security-Token"] = credentials["token"]
+
+    canonical = {name.lower(): " ".join(str(value).split()) for name, value in headers.items()}
+    signed_headers = ";".join(sorted(canonical))
+    canonical_request = "\n".join([
+        "POST",
+        "/",
+        "",
+        "".join(f"{name}:{canonical[name]}\n" for name in sorted(canonical)),
+        signed_headers,
+        hashlib.sha256(body).hexdigest(),
+    ])
+    scope = f"{date_stamp}/{region}/{SERVICE}/aws4_request"
+    string_to_sign = "\n".join([
+        ALGORITHM, amz_date, scope, hashlib.sha256(canonical_request.encode("utf-8")).hexdigest()
+    ])
+    signature = hmac.new(
+        signing_key(credentials["secret_key"], date_stamp, region), string_to_sign.encode("utf-8"), hashlib.sha256
+    ).hexdigest()
+    headers["Authorization"] = (
+        f"{ALGORITHM} Credential={credentials['access_key']}/{scope}, "
+        f"SignedHeaders={signed_headers}, Signature={signature}"
+    )
+    return headers
+
+
+def credentials_from_env() -> dict:
+    # Read per request: the environment is the only credential source at the edge, and
+    # tests may rotate it.
+    return {
+        "access_key": os.environ["AWS_ACCESS_KEY_ID"],
+        "secret_key": os.environ["AWS_SECRET_ACCESS_KEY"],
+        "token": os.environ.get("AWS_SESSION_TOKEN"),
+    }
+
+
+def _default_ssl_context() -> ssl.SSLContext:
+    global _ssl_context
+    if _ssl_context is None:
+        _ssl_context = ssl.create_default_context()
+    return _ssl_context
+
+
+def _client_error(operation: str, status: int, payload: bytes, request_id: str = None) -> ClientError:
+    try:
+        body = json.loads(payload or b"{}")
+    except ValueError:
+        body = {}
+    # __type is "com.amazonaws.dynamodb.v20120810#ConditionalCheckFailedException".
+    code = body.pop("__type", "").rsplit("#", 1)[-1] or f"HTTP{status}"
+    message = body.pop("message", None) or body.pop("Message", "")
+    response = {
+        "Error": {"Code": code, "Message": message},
+        "ResponseMetadata": {"HTTPStatusCode": status, "RequestId": request_id},
+        # Any other fields, e.g. the Item returned by ReturnValuesOnConditionCheckFailure.
+        **body,
+    }
+    return ERRORS.get(code, ClientError)(response, operation)
+
+
+def _enable_tcp_keepalive(sock):
+    # Probes keep NAT and load balancer state alive while the container is idle but not
+    # frozen, and detect a dead peer before a request hangs on it until the timeout.
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+    for option, value in KEEPALIVE_OPTIONS:
+        if hasattr(socket, option):
+            sock.setsockopt(socket.IPPROTO_TCP, getattr(socket, option), value)
+
+
+def _is_retryable(error: ClientError) -> bool:
+    code = error.response["Error"]["Code"]
+    return code in RETRYABLE_ERROR_CODES or error.response["ResponseMetadata"]["HTTPStatusCode"] >= 500
+
+
+class DynamoDBClient:
+    """
+    A DynamoDB client for region_name with a pool of keep-alive connections. A call
+    takes the most recently used idle connection (opening one if there is none), and
+    returns it to the pool afterwards unless the server asked to close it.
+
+    Each new connection is timed as the metrics stage "dynamodb.connect", and every call
+    logs ConnectionReused, so the reuse ratio per region comes from the log group;
+    stats holds the same counts for this container.
+    """
+
+    exceptions = SimpleNamespace(ClientError=ClientError, **ERRORS)
+
+    def __init__(self, region_name: str, endpoint_url: str = None, timeout: float = TIMEOUT_SECONDS,
+                 credentials=credentials_from_env, max_pool_connections: int = MAX_POOL_CONNECTIONS,
+                 max_idle_seconds: float = MAX_IDLE_SECONDS):
+        self.region_name = region_name
+        endpoint = urlsplit(endpoint_url or f"https://dynamodb.{region_name}.amazonaws.com")
+        self._secure = endpoint.scheme == "https"
+        self._host = endpoint.hostname
+        self._port = endpoint.port
+        self._host_header = endpoint.netloc
+        self._timeout = timeout
+        self._credentials = credentials
+        self.max_pool_connections = max_pool_connections
+        self.max_idle_seconds = max_idle_seconds
+        self.stats = {"requests": 0, "reused": 0, "connections_opened": 0}
+        # (connection, monotonic time it went idle), most recently used last.
+        self._idle = []
+        self._pool_lock = threading.Lock()
+
+    def get_item(self, **params) -> dict:
+        return self._call("GetItem", params)
+
+    def update_item(self, **params) -> dict:
+        return self._call("UpdateItem", params)
+
+    def preconnect(self, connections: int = 1, timeout: float = PRECONNECT_TIMEOUT_SECONDS):
+        """
+        Open connections (TCP and TLS handshakes included) into the pool now, e.g. during
+        the Lambda init phase, so the first calls do not pay for them.
+        """
+        for _ in range(min(connections, self.max_pool_connections) - len(self._idle)):
+            self._release(self._connect(timeout), reusable=True)
+
+    def reuse_ratio(self) -> float:
+        """The fraction of requests this container sent on an already-open connection."""
+        with self._pool_lock:
+            return self.stats["reused"] / self.stats["requests"] if self.stats["requests"] else 0.0
+
+    def close(self):
+        with self._pool_lock:
+            idle, self._idle = self._idle, []
+        for connection, _ in idle:
+            connection.close()
+
+    def _call(self, operation: str, params: dict) -> dict:
+        body = json.dumps(params).encode("utf-8")
+        with metrics.timed(f"{SERVICE}.{operation}", Region=self.region_name) as result:
+            try:
+                return self._call_with_retries(operation, body, result)
+            except ClientError as e:
+                result["outcome"] = e.response["Error"]["Code"]
+                raise
+
+    def _call_with_retries(self, operation: str, body: bytes, result: dict) -> dict:
+        for attempt in range(1, MAX_ATTEMPTS + 1):
+            try:
+                status, payload, request_id = self._send(operation, body, result)
+            except (OSError, http.client.HTTPException):
+                # A keep-alive connection the server has since closed fails on reuse;
+                # the next attempt opens a fresh one straight away.
+                if attempt == MAX_ATTEMPTS:
+                    raise
+                continue
+            if status < 300:
+                return json.loads(payload or b"{}")
+            error = _client_error(operation, status, payload, request_id)
+            if attempt == MAX_ATTEMPTS or not _is_retryable(error):
+                raise error
+            # Full jitter, as botocore's standard retry mode.
+            time.sleep(random.uniform(0, BACKOFF_BASE_SECONDS * 2 ** attempt))
+
+    def _send(self, operation: str, body: bytes, result: dict):
+        headers = {
+            "Host": self._host_header,
+            "Content-Type": CONTENT_TYPE,
+            "X-Amz-Target": f"{TARGET_PREFIX}.{operation}",
+        }
+        sign(headers, body, self.region_name, self._credentials(), datetime.now(timezone.utc))
+        connection, reused = self._acquire()
+        result["ConnectionReused"] = reused
+        try:
+            connection.request("POST", "/", body=body, headers=headers)
+            response = connection.getresponse()
+            payload = response.read()
+        except Exception:
+            connection.close()
+            raise
+        self._release(connection, reusable=not response.will_close)
+        return response.status, payload, response.getheader("x-amzn-RequestId")
+
+    def _acquire(self):
+        """An idle connection from the pool, or a new one; and whether it was reused."""
+        now = time.monotonic()
+        stale = []
+        with self._pool_lock:
+            self.stats["requests"] += 1
+            connection = None
+            while self._idle and connection is None:
+                candidate, idle_since = self._idle.pop()
+                if now - idle_since > self.max_idle_seconds:
+                    stale.append(candidate)
+                else:
+                    connection = candidate
+                    self.stats["reused"] += 1
+        for candidate in stale:
+            candidate.close()
+        return (connection, True) if connection else (self._connect(), False)
+
+    def _release(self, connection, reusable: bool):
+        with self._pool_lock:
+            if reusable and len(self._idle) < self.max_pool_connections:
+                self._idle.append((connection, time.monotonic()))
+                return
+        connection.close()
+
+    def _connect(self, timeout: float = None):
+        if self._secure:
+            connection = http.client.HTTPSConnection(
+                self._host, self._port, timeout=timeout or self._timeout, context=_default_ssl_context()
+            )
+        else:
+            connection = http.client.HTTPConnection(self._host, self._port, timeout=timeout or self._timeout)
+        with metrics.timed(f"{SERVICE}.connect", Region=self.region_name):
+            connection.connect()
+        _enable_tcp_keepalive(connection.sock)
+        connection.sock.settimeout(self._timeout)
+        with self._pool_lock:
+            self.stats["connections_opened"] += 1
+        return connection
+
+
+def get_client(region_name: str) -> DynamoDBClient:
+    """The container-wide client for region_name, created on first use."""
+    with _lock:
+        client = _clients.get(region_name)
+        if client is None:
+            client = DynamoDBClient(region_name, endpoint_url=os.environ.get("DYNAMODB_ENDPOINT_URL"))
+            _clients[region_name] = client
+        return client
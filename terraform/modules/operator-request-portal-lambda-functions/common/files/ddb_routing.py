@@ -0,0 +1,150 @@
+"""
+Region routing for DynamoDB calls made from Lambda@Edge.
+
+Lambda@Edge runs in whichever region serves the viewer, so a client pinned to the
+table's home region pays a cross-region round trip from every far-away edge. When the
+table is a global table, reads go to the replica nearest the executing region instead.
+Writes that guard single use (conditional updates) stay in the home region unless the
+replicas are strongly consistent; under eventual consistency two edges could
+otherwise both win the same condition.
+
+Routing is embedded at deploy time as dynamodb_routing.json (Lambda@Edge has no
+environment variables):
+    {"home_region": "eu-west-2",
+     "replica_regions": ["us-east-1", "ap-southeast-2"],
+     "routes": {"us-east-2": "us-east-1", "ap-southeast-1": "ap-southeast-2"},
+     "strongly_consistent_writes": false,
+     "client": "boto3"}
+An executing region that is itself a replica always uses its own replica; "routes"
+maps other regions to their nearest replica. Anything else uses the home region.
+"client" picks the DynamoDB client: "boto3" (the default), or "lite" for the
+dependency-free ddb_lite client, which spares the edge importing boto3.
+
+This file is packaged alongside each handler by its archive_file data source.
+"""
+
+import json
+import logging
+import os
+import time
+
+from aws_clients import get_client
+
+logger = logging.getLogger()
+
+ROUTING_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "dynamodb_routing.json")
+DEFAULT_HOME_REGION = "eu-west-2"
+CLIENTS = ("boto3", "lite")
+
+# Errors that are a definitive answer from the table, not a fault worth retrying elsewhere.
+AUTHORITATIVE_ERROR_CODES = ("ConditionalCheckFailedException", "TransactionCanceledException")
+
+
+def load_routing(path: str = ROUTING_FILE) -> dict:
+    """Read the embedded routing; an absent file means every call goes to the home region."""
+    try:
+        with open(path, encoding="utf-8") as f:
+            config = json.load(f)
+    except FileNotFoundError:
+        config = {}
+    return {
+        "home_region": config.get("home_region") or os.environ.get("DYNAMODB_REGION", DEFAULT_HOME_REGION),
+        "replica_regions": list(config.get("replica_regions") or []),
+        "routes": dict(config.get("routes") or {}),
+        "strongly_consistent_writes": bool(config.get("strongly_consistent_writes", False)),
+        "client": _client_kind(config.get("client") or os.environ.get("DYNAMODB_CLIENT", "boto3")),
+    }
+
+
+def _client_kind(kind: str) -> str:
+    if kind not in CLIENTS:
+        logger.warning("Unknown DynamoDB client %r; using boto3", kind)
+        return "boto3"
+    return kind
+
+
+def _client(routing: dict, region: str):
+    if routing.get("client") == "lite":
+        # Imported here so the boto3 route never pays for ssl and http.client.
+        import ddb_lite
+
+        return ddb_lite.get_client(region)
+    return get_client("dynamodb", region_name=region)
+
+
+def read_region(routing: dict, executing_region: str) -> str:
+    replicas = routing["replica_regions"]
+    if executing_region in replicas:
+        return executing_region
+    routed = routing["routes"].get(executing_region)
+    return routed if routed in replicas else routing["home_region"]
+
+
+def write_region(routing: dict, executing_region: str) -> str:
+    if routing["strongly_consistent_writes"]:
+        return read_region(routing, executing_region)
+    return routing["home_region"]
+
+
+def routes(routing: dict, executing_region: str) -> dict:
+    """The read and write routes (see call) for a function executing in executing_region."""
+    home_region = routing["home_region"]
+    home_client = _client(routing, home_region)
+
+    def _route(region: str) -> dict:
+        client = _client(routing, region)
+        return {"client": client, "region": region, "home_client": home_client, "home_region": home_region}
+
+    return {
+        "read": _route(read_region(routing, executing_region)),
+        "write": _route(write_region(routing, executing_region)),
+    }
+
+
+def preconnect(routing: dict, dynamodb_routes: dict):
+    """
+    Open a pooled connection for every distinct client in dynamodb_routes during the
+    init phase, so the first request skips the handshakes. Only the lite client has a
+    pool to fill; a failure is logged, as the request path connects anyway.
+    """
+    if routing["client"] != "lite":
+        return
+    clients = {id(route[key]): route[key] for route in dynamodb_routes.values() for key in ("client", "home_client")}
+    for client in clients.values():
+        try:
+            client.preconnect()
+        except OSError as e:
+            logger.warning("Could not pre-connect to DynamoDB in %s: %s", client.region_name, e)
+
+
+def _is_authoritative(error: Exception) -> bool:
+    code = getattr(error, "response", {}).get("Error", {}).get("Code")
+    return code in AUTHORITATIVE_ERROR_CODES
+
+
+def _timed_call(client, region: str, operation: str, kwargs: dict):
+    started = time.perf_counter()
+    try:
+        return getattr(client, operation)(**kwargs)
+    finally:
+        logger.info(
+            "DynamoDB %s in %s took %.1fms", operation, region, (time.perf_counter() - started) * 1000
+        )
+
+
+def call(route: dict, operation: str, **kwargs):
+    """
+    Run a DynamoDB operation against route["client"] (in route["region"]). If that is a
+    replica and the call fails for any reason other than a failed condition, retry once
+    against route["home_client"] in the home region.
+    """
+    try:
+        return _timed_call(route["client"], route["region"], operation, kwargs)
+    except Exception as e:
+        if route["client"] is route["home_client"] or _is_authoritative(e):
+            raise
+        logger.warning(
+            "DynamoDB %s in replica %s failed (%s); retrying in home region %s",
+            operation, route["region"], e, route["home_region"]
+        )
+        return _timed_call(route["home_client"], route["home_region"], operation, kwargs)
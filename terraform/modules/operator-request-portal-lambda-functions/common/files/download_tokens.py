@@ -0,0 +1,70 @@
+"""
+HMAC-signed download tokens.
+
+A signed token carries two extra query parameters alongside alert/mno/expiry/reference:
+"kid" names the signing key and "sig" is the base64url HMAC-SHA256 of those four fields
+under that key. Lambda@Edge can then reject forged tokens without a DynamoDB read.
+
+Keys are embedded at deploy time as download_token_keys.json:
+    {"active_kid": "2025-06", "keys": {"2025-06": "<base64url secret>", "2025-01": "..."}}
+New tokens are signed with active_kid. To rotate, add a new key, make it active, and
+remove the old key only once the last token signed with it has expired.
+
+This file is packaged alongside each handler by its archive_file data source.
+"""
+
+import base64
+import hashlib
+import hmac
+import json
+import os
+
+SIGNED_FIELDS = ("alert", "mno", "expiry", "reference")
+KEYS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "download_token_keys.json")
+
+
+def load_keys(path: str = KEYS_FILE) -> dict:
+    """Read the embedded key set; an absent file means signed tokens are not in use."""
+    try:
+        with open(path, encoding="utf-8") as f:
+            config = json.load(f)
+    except FileNotFoundError:
+        return {"active_kid": None, "keys": {}}
+    keys = {kid: base64.urlsafe_b64decode(_pad(secret)) for kid, secret in config.get("keys", {}).items()}
+    return {"active_kid": config.get("active_kid"), "keys": keys}
+
+
+def _pad(b64: str) -> str:
+    return b64 + "=" * (-len(b64) % 4)
+
+
+def _signing_input(params: dict, kid: str) -> bytes:
+    # kid is covered too, so a signature cannot be replayed under another key id.
+    return "&".join([f"kid={kid}"] + [f"{field}={params[field]}" for field in SIGNED_FIELDS]).encode("utf-8")
+
+
+def sign(params: dict, kid: str, key: bytes) -> str:
+    digest = hmac.new(key, _signing_input(params, kid), hashlib.sha256).digest()
+    return base64.urlsafe_b64encode(digest).decode("ascii").rstrip("=")
+
+
+def build_signed_token(params: dict, key_set: dict) -> str:
+    """Encode params as a signed, base64url download token using the active key."""
+    kid = key_set["active_kid"]
+    fields = {field: params[field] for field in SIGNED_FIELDS}
+    fields.update(kid=kid, sig=sign(fields, kid, key_set["keys"][kid]))
+    query = "&".join(f"{name}={value}" for name, value in fields.items())
+    return base64.urlsafe_b64encode(query.encode("utf-8")).decode("ascii")
+
+
+def is_signed(params: dict) -> bool:
+    return "sig" in params
+
+
+def verify(params: dict, key_set: dict) -> bool:
+    """True if params carry a valid signature under one of the known keys."""
+    key = key_set["keys"].get(params.get("kid"))
+    if key is None or not params.get("sig"):
+        return False
+    expected = sign(params, params["kid"], key)
+    return hmac.compare_digest(expected.encode("utf-8"), params["sig"].encode("utf-8"))
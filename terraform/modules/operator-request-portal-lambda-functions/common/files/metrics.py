@@ -0,0 +1,112 @@
+"""
+Per-stage latency metrics in CloudWatch Embedded Metric Format (EMF).
+
+Each timed stage prints one JSON line to stdout. CloudWatch Logs extracts the Duration
+metric from it asynchronously, so there is no PutMetricData call on the request path,
+and p50/p99 per stage and outcome come straight from the log group. Lambda@Edge
+functions log in the region that served the request, so their metrics appear there.
+
+Every line carries the dimensions Function, Stage and Outcome. Outcome is "ok", "error",
+or a handler's own result such as an error type (expired_link, already_used). Extra
+keyword properties are logged with the line but are not dimensions.
+
+This file is packaged alongside each handler by its archive_file data source.
+"""
+
+import json
+import os
+import sys
+import time
+from contextlib import contextmanager
+from functools import partial
+
+NAMESPACE = "OperatorRequestPortal"
+DIMENSION_SETS = [["Function", "Stage", "Outcome"], ["Function", "Stage"]]
+
+
+def _function_name() -> str:
+    return os.environ.get("AWS_LAMBDA_FUNCTION_NAME", "local")
+
+
+def emit(stage: str, duration_ms: float, outcome: str = "ok", **properties):
+    """Write one EMF line recording duration_ms for stage."""
+    record = {
+        "_aws": {
+            "Timestamp": int(time.time() * 1000),
+            "CloudWatchMetrics": [{
+                "Namespace": NAMESPACE,
+                "Dimensions": DIMENSION_SETS,
+                "Metrics": [{"Name": "Duration", "Unit": "Milliseconds"}],
+            }],
+        },
+        "Function": _function_name(),
+        "Stage": stage,
+        "Outcome": outcome,
+        "Duration": round(duration_ms, 3),
+        **properties,
+    }
+    # Printed rather than logged: the Lambda log formatter's prefix would stop CloudWatch
+    # recognising the line as EMF.
+    sys.stdout.write(json.dumps(record, default=str) + "\n")
+    sys.stdout.flush()
+
+
+@contextmanager
+def timed(stage: str, **properties):
+    """
+    Time the enclosed block as stage. The yielded dict's "outcome" may be set to record
+    a result other than "ok"; an exception that escapes without one records "error".
+    Any other keys set on it are logged as properties, overriding those passed in.
+    Once the block has exited, the dict's "duration_ms" holds the duration recorded.
+    """
+    result = {"outcome": "ok"}
+    started = time.perf_counter()
+    try:
+        yield result
+    except Exception:
+        if result["outcome"] == "ok":
+            result["outcome"] = "error"
+        raise
+    finally:
+        duration_ms = (time.perf_counter() - started) * 1000
+        outcome = result.pop("outcome")
+        emit(stage, duration_ms, outcome, **{**properties, **result})
+        result["duration_ms"] = duration_ms
+
+
+def _start_call(model, context, **kwargs):
+    context["metrics_call"] = (model.name, time.perf_counter())
+
+
+def _emit_call(service: str, region: str, outcome: str, context: dict):
+    call = context.pop("metrics_call", None)
+    if call is None:
+        return
+    operation, started = call
+    emit(f"{service}.{operation}", (time.perf_counter() - started) * 1000, outcome, Region=region)
+
+
+def _after_call(service: str, region: str, http_response, parsed, context, **kwargs):
+    # An error response's outcome is its code, e.g. ConditionalCheckFailedException.
+    outcome = "ok" if http_response.status_code < 300 else parsed.get("Error", {}).get("Code", "error")
+    _emit_call(service, region, outcome, context)
+
+
+def _after_call_error(service: str, region: str, context, **kwargs):
+    _emit_call(service, region, "error", context)
+
+
+def instrument_client(client):
+    """
+    Time every API call the boto3 client makes (including its retries) as a stage named
+    after the service and operation, e.g. "dynamodb.GetItem", with the error code as
+    the outcome of a failed call. Returns the client.
+    """
+    service = client.meta.service_model.service_name
+    region = client.meta.region_name
+    # before-parameter-build rather than before-call: the latter stops at the first
+    # handler that returns a response (e.g. a Stubber), so it may never reach ours.
+    client.meta.events.register("before-parameter-build", _start_call)
+    client.meta.events.register("after-call", partial(_after_call, service, region))
+    client.meta.events.register("after-call-error", partial(_after_call_error, service, region))
+    return client
@@ -1,9 +1,13 @@
 import os
 import json
 import logging
-from datetime import datetime
-import boto3
+from datetime import datetime, timezone
 import re
+import struct
+from concurrent.futures import ThreadPoolExecutor
+
+import metrics
+from aws_clients import get_client
 
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
@@ -12,22 +16,50 @@ GDS_AWS_PROFILE = os.environ["GDS_AWS_PROFILE"]
 NOTIFY_LAMBDA_ARN = os.environ["NOTIFY_LAMBDA_ARN"]
 NOTIFY_TEMPLATE_ID = os.environ["NOTIFY_TEMPLATE_ID"]
 LOG_INVITE_TRACKING_TABLE = os.environ["LOG_INVITE_TRACKING_TABLE"]
+LOG_UPLOAD_TRACKING_TABLE = os.environ.get("LOG_UPLOAD_TRACKING_TABLE", "operator-request-portal-log-uploads")
+
+# Upper bound on S3 event records processed concurrently; 1 keeps the serial loop.
+RECORD_MAX_WORKERS = int(os.environ.get("RECORD_MAX_WORKERS", "4"))
 
 raw_list = os.environ["ALERTS_TEAM_EMAILS"]
 recipients = [email.strip() for email in raw_list.split(",") if email.strip()]
 
-ddb = boto3.client("dynamodb")
-lambda_cli = boto3.client("lambda")
-s3 = boto3.client("s3")
+ddb = get_client("dynamodb")
+lambda_cli = get_client("lambda")
+s3 = get_client("s3")
 
 KEY_RE = re.compile(
     r"^received/logs/(?P<alert>[^/]+)/CBC_(?P<mno>[^_]+)_[^_]+_(?P=alert)\.zip$"
 )
 
-ZIP_HEADER_SIGNATURES = (b"PK\x03\x04", b"PK\x05\x06")
+LOCAL_FILE_HEADER_SIGNATURE = b"PK\x03\x04"
 EOCD_SIGNATURE = b"PK\x05\x06"
+ZIP_HEADER_SIGNATURES = (LOCAL_FILE_HEADER_SIGNATURE, EOCD_SIGNATURE)
+ZIP64_EOCD_LOCATOR_SIGNATURE = b"PK\x06\x07"
+ZIP64_EOCD_SIGNATURE = b"PK\x06\x06"
+CENTRAL_DIRECTORY_SIGNATURE = b"PK\x01\x02"
+ZIP64_EXTRA_FIELD_ID = 0x0001
+
+# Fixed-size parts of the records, little-endian as per the PKWARE APPNOTE.
+EOCD_RECORD = struct.Struct("<4sHHHHIIH")
+ZIP64_EOCD_LOCATOR = struct.Struct("<4sIQI")
+ZIP64_EOCD_RECORD = struct.Struct("<4sQHHIIQQQQ")
+CENTRAL_DIRECTORY_HEADER = struct.Struct("<4sHHHHHHIIIHHHHHII")
+
 # EOCD record is 22 bytes plus up to a 65535-byte comment.
-MAX_EOCD_SEARCH_WINDOW = 22 + 65535
+MAX_EOCD_SEARCH_WINDOW = EOCD_RECORD.size + 65535
+
+# Upper bounds on what an uploaded log archive may claim to contain.
+ZIP_MAX_ENTRIES = int(os.environ.get("ZIP_MAX_ENTRIES", "10000"))
+ZIP_MAX_CENTRAL_DIRECTORY_BYTES = int(os.environ.get("ZIP_MAX_CENTRAL_DIRECTORY_BYTES", str(16 * 1024 * 1024)))
+ZIP_MAX_UNCOMPRESSED_BYTES = int(os.environ.get("ZIP_MAX_UNCOMPRESSED_BYTES", str(10 * 1024 ** 3)))
+ZIP_MAX_COMPRESSION_RATIO = float(os.environ.get("ZIP_MAX_COMPRESSION_RATIO", "250"))
+# Central directory bytes fetched per ranged GET when it does not fit in the tail read.
+ZIP_DIRECTORY_READ_CHUNK_BYTES = 1024 * 1024
+# "suffix": one suffix-range GET gives the object size, the EOCD window and (for a small
+# object) its header; nothing else is read unless the central directory overflows it.
+# "head": the original head_object + header range + tail range reads.
+ZIP_VALIDATION_MODE = os.environ.get("ZIP_VALIDATION_MODE", "suffix")
 
 
 def _s3_read_range(bucket: str, key: str, range_str: str) -> bytes | None:
@@ -38,27 +70,267 @@ def _s3_read_range(bucket: str, key: str, range_str: str) -> bytes | None:
         return None
 
 
+def _read_at(archive: dict, offset: int, length: int) -> bytes:
+    """
+    Read length bytes at offset, from the already-fetched tail of the object when they
+    fall inside it, otherwise with a ranged GET. Raises ValueError on a short read.
+    """
+    tail_offset = offset - archive["tail_start"]
+    if tail_offset >= 0:
+        data = archive["tail"][tail_offset:tail_offset + length]
+    else:
+        data = _s3_read_range(archive["bucket"], archive["key"], f"bytes={offset}-{offset + length - 1}") or b""
+    if len(data) != length:
+        raise ValueError(f"short read of {len(data)}/{length} bytes at offset {offset}")
+    return data
+
+
+def _find_eocd(tail: bytes) -> int:
+    """Offset within tail of the EOCD record whose comment ends exactly at the end of the file."""
+    position = tail.rfind(EOCD_SIGNATURE)
+    while position >= 0:
+        if position + EOCD_RECORD.size <= len(tail):
+            comment_length = EOCD_RECORD.unpack_from(tail, position)[-1]
+            if position + EOCD_RECORD.size + comment_length == len(tail):
+                return position
+        position = tail.rfind(EOCD_SIGNATURE, 0, position)
+    raise ValueError("no end of central directory record")
+
+
+def _read_zip64_layout(archive: dict, eocd_offset: int) -> tuple:
+    locator_offset = eocd_offset - ZIP64_EOCD_LOCATOR.size
+    if locator_offset < 0:
+        raise ValueError("missing ZIP64 end of central directory locator")
+    signature, _, record_offset, _ = ZIP64_EOCD_LOCATOR.unpack(
+        _read_at(archive, locator_offset, ZIP64_EOCD_LOCATOR.size)
+    )
+    if signature != ZIP64_EOCD_LOCATOR_SIGNATURE:
+        raise ValueError("missing ZIP64 end of central directory locator")
+    if record_offset + ZIP64_EOCD_RECORD.size > locator_offset:
+        raise ValueError("ZIP64 end of central directory record overlaps its locator")
+    fields = ZIP64_EOCD_RECORD.unpack(_read_at(archive, record_offset, ZIP64_EOCD_RECORD.size))
+    if fields[0] != ZIP64_EOCD_SIGNATURE:
+        raise ValueError("bad ZIP64 end of central directory signature")
+    # disk, central directory disk, total entries, directory size, directory offset
+    return fields[4], fields[5], fields[7], fields[8], fields[9], record_offset
+
+
+def _read_directory_layout(archive: dict, eocd_offset: int) -> dict:
+    """Where the central directory lives and how many entries it declares, from the (ZIP64) EOCD."""
+    _, disk, directory_disk, _, entries, directory_size, directory_offset, _ = EOCD_RECORD.unpack(
+        _read_at(archive, eocd_offset, EOCD_RECORD.size)
+    )
+    directory_end = eocd_offset
+    if entries == 0xFFFF or 0xFFFFFFFF in (directory_size, directory_offset):
+        disk, directory_disk, entries, directory_size, directory_offset, directory_end = _read_zip64_layout(
+            archive, eocd_offset
+        )
+    if disk or directory_disk:
+        raise ValueError("multi-disk archives are not supported")
+    if directory_offset + directory_size != directory_end:
+        raise ValueError("central directory does not end at the end of central directory record")
+    return {"entries": entries, "offset": directory_offset, "size": directory_size}
+
+
+def _zip64_extra_values(extra: bytes, count: int) -> tuple:
+    position = 0
+    while position + 4 <= len(extra):
+        header_id, data_size = struct.unpack_from("<HH", extra, position)
+        if header_id == ZIP64_EXTRA_FIELD_ID:
+            if data_size < 8 * count:
+                raise ValueError("ZIP64 extra field is too short")
+            return struct.unpack_from(f"<{count}Q", extra, position + 4)
+        position += 4 + data_size
+    raise ValueError("missing ZIP64 extra field")
+
+
+def _central_directory_entry(fields: tuple, extra: bytes) -> dict:
+    # ZIP64 extra values appear in this order, only for the fields that overflowed.
+    values = [fields[9], fields[8], fields[16]]
+    overflowed = [value == 0xFFFFFFFF for value in values]
+    if any(overflowed):
+        zip64_values = iter(_zip64_extra_values(extra, sum(overflowed)))
+        values = [next(zip64_values) if over else value for value, over in zip(values, overflowed)]
+    uncompressed_size, compressed_size, local_header_offset = values
+    return {
+        "uncompressed_size": uncompressed_size,
+        "compressed_size": compressed_size,
+        "local_header_offset": local_header_offset,
+    }
+
+
+def _iter_central_directory(archive: dict, directory: dict):
+    """
+    Yield each central directory entry, fetching the directory in
+    ZIP_DIRECTORY_READ_CHUNK_BYTES pieces so memory stays bounded however many entries
+    there are.
+    """
+    buffer = bytearray()
+    next_read = directory["offset"]
+    directory_end = directory["offset"] + directory["size"]
+
+    def _fill(length: int):
+        nonlocal next_read
+        while len(buffer) < length and next_read < directory_end:
+            chunk_length = min(ZIP_DIRECTORY_READ_CHUNK_BYTES, directory_end - next_read)
+            buffer.extend(_read_at(archive, next_read, chunk_length))
+            next_read += chunk_length
+        if len(buffer) < length:
+            raise ValueError("central directory is truncated")
+
+    while buffer or next_read < directory_end:
+        _fill(CENTRAL_DIRECTORY_HEADER.size)
+        fields = CENTRAL_DIRECTORY_HEADER.unpack_from(buffer)
+        if fields[0] != CENTRAL_DIRECTORY_SIGNATURE:
+            raise ValueError("bad central directory entry signature")
+        name_end = CENTRAL_DIRECTORY_HEADER.size + fields[10]
+        record_length = name_end + fields[11] + fields[12]
+        _fill(record_length)
+        yield _central_directory_entry(fields, bytes(buffer[name_end:name_end + fields[11]]))
+        del buffer[:record_length]
+
+
+def _compression_ratio(entry: dict) -> float:
+    if entry["compressed_size"]:
+        return entry["uncompressed_size"] / entry["compressed_size"]
+    return float("inf") if entry["uncompressed_size"] else 0.0
+
+
+def _summarise_entries(archive: dict, directory: dict) -> dict:
+    report = {"entries": 0, "uncompressed_size": 0, "compressed_size": 0, "max_compression_ratio": 0.0,
+              "first_local_header_offset": None, "anomalies": []}
+    for index, entry in enumerate(_iter_central_directory(archive, directory)):
+        if entry["local_header_offset"] + entry["compressed_size"] > directory["offset"]:
+            raise ValueError(f"entry {index} runs past the start of the central directory")
+        ratio = _compression_ratio(entry)
+        if ratio > ZIP_MAX_COMPRESSION_RATIO:
+            report["anomalies"].append(f"entry {index} compression ratio {ratio:.0f} exceeds limit")
+        report["entries"] += 1
+        report["uncompressed_size"] += entry["uncompressed_size"]
+        report["compressed_size"] += entry["compressed_size"]
+        report["max_compression_ratio"] = max(report["max_compression_ratio"], ratio)
+        if index == 0 or entry["local_header_offset"] < report["first_local_header_offset"]:
+            report["first_local_header_offset"] = entry["local_header_offset"]
+    if report["entries"] != directory["entries"]:
+        raise ValueError(f"central directory holds {report['entries']} entries, expected {directory['entries']}")
+    if report["uncompressed_size"] > ZIP_MAX_UNCOMPRESSED_BYTES:
+        report["anomalies"].append(f"total uncompressed size {report['uncompressed_size']} exceeds limit")
+    return report
+
+
+def _directory_limit_anomalies(directory: dict) -> list[str]:
+    anomalies = []
+    if directory["entries"] > ZIP_MAX_ENTRIES:
+        anomalies.append(f"{directory['entries']} entries exceeds limit of {ZIP_MAX_ENTRIES}")
+    if directory["size"] > ZIP_MAX_CENTRAL_DIRECTORY_BYTES:
+        anomalies.append(f"central directory of {directory['size']} bytes exceeds limit")
+    return anomalies
+
+
+def inspect_zip(bucket: str, key: str, size: int, tail: bytes = None) -> dict:
+    """
+    Structurally validate a ZIP archive in S3 without downloading it: locate the EOCD
+    (and ZIP64 locator/record) in the tail, then walk the central directory with
+    ranged reads. Returns a report of entry count, sizes and compression-ratio
+    anomalies. Raises ValueError if the archive is truncated or inconsistent.
+
+    tail, if given, is the already-fetched end of the object.
+    """
+    if tail is None:
+        tail_start = max(0, size - MAX_EOCD_SEARCH_WINDOW)
+        tail = _s3_read_range(bucket, key, f"bytes={tail_start}-{size - 1}")
+        if tail is None:
+            raise ValueError("could not read the end of the object")
+    tail_start = size - len(tail)
+    archive = {"bucket": bucket, "key": key, "tail": tail, "tail_start": tail_start}
+
+    directory = _read_directory_layout(archive, tail_start + _find_eocd(tail))
+    anomalies = _directory_limit_anomalies(directory)
+    if anomalies:
+        # Too big to walk cheaply: reject on the declared figures alone.
+        return {"entries": directory["entries"], "uncompressed_size": None, "compressed_size": None,
+                "max_compression_ratio": None, "first_local_header_offset": None, "anomalies": anomalies}
+    return _summarise_entries(archive, directory)
+
+
+def _inspect_zip_report(bucket: str, key: str, size: int, tail: bytes = None) -> dict | None:
+    """inspect_zip, logging the report; None if the archive is malformed."""
+    try:
+        report = inspect_zip(bucket, key, size, tail)
+    except ValueError as e:
+        logger.warning("Rejected malformed ZIP %s/%s: %s", bucket, key, e)
+        return None
+    logger.info("ZIP structure for %s/%s: %s", bucket, key, json.dumps(report))
+    return report
+
+
+def _read_object_suffix(bucket: str, key: str) -> tuple[int, bytes] | None:
+    """
+    Fetch the last MAX_EOCD_SEARCH_WINDOW bytes (the whole object if it is smaller) in
+    one suffix-range GET, taking the object size from Content-Range.
+    """
+    try:
+        response = s3.get_object(Bucket=bucket, Key=key, Range=f"bytes=-{MAX_EOCD_SEARCH_WINDOW}")
+        tail = response["Body"].read()
+    except Exception as e:
+        logger.error("Failed to read the end of %s/%s: %s", bucket, key, e)
+        return None
+    content_range = response.get("ContentRange")
+    size = int(content_range.rsplit("/", 1)[1]) if content_range else len(tail)
+    return size, tail
+
+
+def _is_zip_content_single_read(bucket: str, key: str) -> bool:
+    """
+    As _is_zip_content, from a single suffix-range GET in place of head_object and the
+    header and tail reads. The central directory must place its first entry at offset
+    0, and the local file header signature is checked there when the suffix reaches it.
+    For a larger object the consistency-checked central directory is taken as the
+    evidence of where the archive starts, rather than paying for a second GET.
+    """
+    suffix = _read_object_suffix(bucket, key)
+    if suffix is None:
+        return False
+    size, tail = suffix
+    if size < EOCD_RECORD.size:
+        return False
+
+    report = _inspect_zip_report(bucket, key, size, tail)
+    if report is None or report["anomalies"]:
+        return False
+    tail_start = size - len(tail)
+    if not report["entries"]:
+        # An empty archive is its End Of Central Directory record alone.
+        return tail_start == 0 and tail.startswith(EOCD_SIGNATURE)
+    if report["first_local_header_offset"] != 0:
+        logger.warning("Rejected ZIP %s/%s: data precedes its first entry", bucket, key)
+        return False
+    return tail_start > 0 or tail.startswith(LOCAL_FILE_HEADER_SIGNATURE)
+
+
 def _is_zip_content(bucket: str, key: str) -> bool:
     """
-    Validate the object looks like a genuine ZIP archive: a leading local/empty-archive
-    file header signature, plus an End Of Central Directory record near the tail of the
-    file.
+    Validate the object is a genuine, complete ZIP archive: a leading local/empty-archive
+    file header signature, plus a consistent End Of Central Directory record and central
+    directory (see inspect_zip) with no size or compression-ratio anomalies.
     """
+    if ZIP_VALIDATION_MODE == "suffix":
+        return _is_zip_content_single_read(bucket, key)
+
     try:
         size = s3.head_object(Bucket=bucket, Key=key)["ContentLength"]
     except Exception as e:
         logger.error("Failed to read object metadata for %s/%s: %s", bucket, key, e)
         return False
-    if size < len(EOCD_SIGNATURE):
+    if size < EOCD_RECORD.size:
         return False
 
     header = _s3_read_range(bucket, key, "bytes=0-3")
     if header is None or not header.startswith(ZIP_HEADER_SIGNATURES):
         return False
 
-    tail_start = max(0, size - MAX_EOCD_SEARCH_WINDOW)
-    tail = _s3_read_range(bucket, key, f"bytes={tail_start}-{size - 1}")
-    return tail is not None and EOCD_SIGNATURE in tail
+    report = _inspect_zip_report(bucket, key, size)
+    return report is not None and not report["anomalies"]
 
 
 def _mask_email(email: str) -> str:
@@ -69,9 +341,16 @@ def _mask_email(email: str) -> str:
     return f"{masked_local}@{domain}"
 
 
+def _upload_record_from_item(item: dict, mno_label: str) -> dict:
+    mno_name = item.get("MnoName", {}).get("S") or mno_label
+    alert_time = item.get("AlertTime", {}).get("S") or ""
+    upload_ref = item.get("UploadRef", {}).get("S")
+    return {"mno_name": mno_name, "alert_time": alert_time, "upload_ref": upload_ref}
+
+
 def _get_upload_record(mno_label: str, broadcast_id: str) -> dict:
     """
-    Fetch MnoName and AlertTime from the invite tracking record.
+    Fetch MnoName, AlertTime and UploadRef from the invite tracking record.
     """
     key = f"{mno_label}#{broadcast_id}"
     try:
@@ -79,13 +358,101 @@ def _get_upload_record(mno_label: str, broadcast_id: str) -> dict:
             TableName=LOG_INVITE_TRACKING_TABLE,
             Key={"AlertRef": {"S": key}}
         )
-        item = resp.get("Item", {})
-        mno_name = item.get("MnoName", {}).get("S") or mno_label
-        alert_time = item.get("AlertTime", {}).get("S") or ""
-        return {"mno_name": mno_name, "alert_time": alert_time}
+        return _upload_record_from_item(resp.get("Item", {}), mno_label)
     except Exception as e:
         logger.warning("Could not look up invite record for %s: %s", key, e)
-        return {"mno_name": mno_label, "alert_time": ""}
+        return {"mno_name": mno_label, "alert_time": "", "upload_ref": None}
+
+
+def _content_fingerprint(rec: dict) -> str | None:
+    """
+    The S3 event's ETag and size for the object. A re-upload of the same archive by the
+    same method has the same ETag (the MD5 of a single PUT, or of its parts' MD5s).
+    """
+    obj = rec["s3"]["object"]
+    etag = obj.get("eTag")
+    if not etag:
+        return None
+    return f"{etag.strip(chr(34))}:{obj.get('size', '')}"
+
+
+def _claim_content(mno_label: str, broadcast_id: str, fingerprint: str) -> tuple[bool, dict | None]:
+    """
+    Record fingerprint as the content processed for mno#broadcast_id, in one conditional
+    UpdateItem on the invite tracking record. Returns (duplicate, upload record): duplicate
+    is True if that content has already been processed, and the upload record (as
+    _get_upload_record) is None unless this call made the claim.
+    """
+    key = f"{mno_label}#{broadcast_id}"
+    try:
+        resp = ddb.update_item(
+            TableName=LOG_INVITE_TRACKING_TABLE,
+            Key={"AlertRef": {"S": key}},
+            UpdateExpression="SET ProcessedContent = :fp, ProcessedAt = :now",
+            # attribute_exists stops the update creating a record the invite pre-check would trust.
+            ConditionExpression=(
+                "attribute_exists(AlertRef) AND "
+                "(attribute_not_exists(ProcessedContent) OR ProcessedContent <> :fp)"
+            ),
+            ExpressionAttributeValues={
+                ":fp": {"S": fingerprint},
+                ":now": {"S": datetime.now(timezone.utc).isoformat()}
+            },
+            ReturnValues="ALL_NEW",
+            ReturnValuesOnConditionCheckFailure="ALL_OLD"
+        )
+        return False, _upload_record_from_item(resp.get("Attributes", {}), mno_label)
+    except ddb.exceptions.ConditionalCheckFailedException as e:
+        old_item = getattr(e, "response", {}).get("Item") or {}
+        return old_item.get("ProcessedContent", {}).get("S") == fingerprint, None
+    except Exception as e:
+        logger.warning("Could not record content fingerprint for %s: %s", key, e)
+        return False, None
+
+
+def _release_content(mno_label: str, broadcast_id: str, fingerprint: str):
+    """
+    Undo _claim_content for content that was not notified, so Lambda's asynchronous
+    retry of a failed invocation, or a re-upload of a rejected archive, processes it again.
+    """
+    key = f"{mno_label}#{broadcast_id}"
+    try:
+        ddb.update_item(
+            TableName=LOG_INVITE_TRACKING_TABLE,
+            Key={"AlertRef": {"S": key}},
+            UpdateExpression="REMOVE ProcessedContent, ProcessedAt",
+            ConditionExpression="ProcessedContent = :fp",
+            ExpressionAttributeValues={":fp": {"S": fingerprint}}
+        )
+    except Exception as e:
+        logger.error("Could not release content fingerprint for %s: %s", key, e)
+
+
+def _consume_upload_link(upload_ref: str | None, key: str):
+    """
+    Mark the upload link used now that S3 has created its object. The edge function can
+    confirm a single PUT from its response, but not a multipart complete or a presigned
+    PUT, so this is where those consume the link. The S3Location condition leaves a newer
+    link for the same MNO and broadcast alone; any other failure raises for the retry.
+    """
+    if not upload_ref:
+        logger.warning("No upload reference recorded for %s, link not consumed", key)
+        return
+    try:
+        ddb.update_item(
+            TableName=LOG_UPLOAD_TRACKING_TABLE,
+            Key={"RequestId": {"S": upload_ref}},
+            UpdateExpression="SET #u = :true, UsedAt = if_not_exists(UsedAt, :now)",
+            ConditionExpression="S3Location = :loc",
+            ExpressionAttributeNames={"#u": "Used"},
+            ExpressionAttributeValues={
+                ":true": {"BOOL": True},
+                ":loc": {"S": f"/{key}"},
+                ":now": {"S": datetime.now(timezone.utc).isoformat()}
+            }
+        )
+    except ddb.exceptions.ConditionalCheckFailedException:
+        logger.warning("Upload link for %s no longer points at this object, left as it is", key)
 
 
 def _format_alert_time(iso_str: str) -> str:
@@ -98,59 +465,131 @@ def _format_alert_time(iso_str: str) -> str:
         return iso_str
 
 
-def send_notification(broadcast_id: str, mno_label: str, bucket: str, key: str):
-    record = _get_upload_record(mno_label, broadcast_id)
+def send_notification(broadcast_id: str, mno_label: str, bucket: str, key: str, record: dict = None):
+    if not recipients:
+        logger.warning("No alerts team recipients configured, skipping download notification")
+        return
+    record = record or _get_upload_record(mno_label, broadcast_id)
     mno_name = record["mno_name"]
     alert_time = _format_alert_time(record["alert_time"])
 
     filename = key.rsplit("/", 1)[-1]
     gds_cli_command = f"gds aws {GDS_AWS_PROFILE} aws s3 cp s3://{bucket}/{key} {filename}"
 
-    for email in recipients:
-        payload = {
-            "email_address": email,
-            "template_id": NOTIFY_TEMPLATE_ID,
-            "personalisation": {
-                "broadcastId": broadcast_id,
-                "MNO": mno_name,
-                "alertTime": alert_time,
-                "gdsCliDownloadCommand": gds_cli_command
-            }
-        }
-        lambda_cli.invoke(
-            FunctionName=NOTIFY_LAMBDA_ARN,
-            InvocationType="Event",
-            Payload=json.dumps(payload).encode("utf-8")
-        )
-        logger.info(
-            "Sent download notification for %s/%s to %s", broadcast_id, mno_name, _mask_email(email)
-        )
+    payload = {
+        "template_id": NOTIFY_TEMPLATE_ID,
+        "personalisation": {
+            "broadcastId": broadcast_id,
+            "MNO": mno_name,
+            "alertTime": alert_time,
+            "gdsCliDownloadCommand": gds_cli_command
+        },
+        "recipients": [{"email_address": email} for email in recipients]
+    }
+    lambda_cli.invoke(
+        FunctionName=NOTIFY_LAMBDA_ARN,
+        InvocationType="Event",
+        Payload=json.dumps(payload).encode("utf-8")
+    )
+    logger.info(
+        "Sent download notification for %s/%s to %s",
+        broadcast_id, mno_name, ", ".join(_mask_email(email) for email in recipients)
+    )
 
 
-def lambda_handler(event, context):
+def _process_record(rec: dict):
     """
-    Triggered by S3 PutObject on received/logs/... .zip.
+    Consume the object's upload link, validate the object and notify the team. Raises if
+    it should be retried.
     """
-    for rec in event["Records"]:
-        bucket = rec["s3"]["bucket"]["name"]
-        key = rec["s3"]["object"]["key"]
-        m = KEY_RE.match(key)
-        if not m:
-            logger.warning("S3 key did not match expected pattern: %s", key)
-            continue
+    bucket = rec["s3"]["bucket"]["name"]
+    key = rec["s3"]["object"]["key"]
+    m = KEY_RE.match(key)
+    if not m:
+        logger.warning("S3 key did not match expected pattern: %s", key)
+        return
+
+    broadcast_id = m.group("alert")
+    mno_label = m.group("mno")
+
+    fingerprint = _content_fingerprint(rec)
+    duplicate, record = _claim_content(mno_label, broadcast_id, fingerprint) if fingerprint else (False, None)
+    if duplicate:
+        logger.info(
+            "Skipping duplicate upload for broadcast_id=%s, mno=%s (content %s already processed)",
+            broadcast_id, mno_label, fingerprint
+        )
+        return
+
+    # The claim is taken before validation so a duplicate event skips it too; it is only
+    # kept once the notification has gone out.
+    claimed = record is not None
+    notified = False
+    try:
+        record = record or _get_upload_record(mno_label, broadcast_id)
+        _consume_upload_link(record["upload_ref"], key)
+        notified = _validate_and_notify(bucket, key, broadcast_id, mno_label, record)
+    finally:
+        if claimed and not notified:
+            _release_content(mno_label, broadcast_id, fingerprint)
+
+
+def _validate_and_notify(bucket: str, key: str, broadcast_id: str, mno_label: str, record: dict | None) -> bool:
+    """Validate the archive and notify the team; returns whether the notification was sent."""
+    with metrics.timed("zip_validation", ValidationMode=ZIP_VALIDATION_MODE) as result:
+        is_zip = _is_zip_content(bucket, key)
+        result["outcome"] = "valid" if is_zip else "rejected"
+    if not is_zip:
+        logger.warning(
+            "Rejected upload with non-ZIP content for broadcast_id=%s, mno=%s",
+            broadcast_id, mno_label
+        )
+        return False
+
+    logger.info("New logs for broadcast_id=%s, mno=%s", broadcast_id, mno_label)
 
-        broadcast_id = m.group("alert")
-        mno_label = m.group("mno")
+    send_notification(broadcast_id, mno_label, bucket, key, record)
+    return True
 
-        if not _is_zip_content(bucket, key):
-            logger.warning(
-                "Rejected upload with non-ZIP content for broadcast_id=%s, mno=%s",
-                broadcast_id, mno_label
-            )
-            continue
 
-        logger.info("New logs for broadcast_id=%s, mno=%s", broadcast_id, mno_label)
+def _process_record_isolated(rec: dict) -> str | None:
+    """Run _process_record, logging a failure; returns the object key if it failed."""
+    try:
+        _process_record(rec)
+        return None
+    except Exception as e:
+        key = rec.get("s3", {}).get("object", {}).get("key", "")
+        logger.error("Failed to process upload %s: %s", key, e)
+        return key
+
 
-        send_notification(broadcast_id, mno_label, bucket, key)
+def _process_records(records: list[dict]) -> list[str]:
+    """
+    Process the records of one event over a bounded thread pool, so several
+    operators uploading at once do not queue behind each other's validation.
+    Returns the keys of the records that failed.
+    """
+    workers = max(1, min(RECORD_MAX_WORKERS, len(records)))
+    if workers == 1:
+        results = [_process_record_isolated(rec) for rec in records]
+    else:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(_process_record_isolated, records))
+    return [result for result in results if result is not None]
 
+
+def lambda_handler(event, context):
+    """
+    Triggered by S3 PutObject on received/logs/... .zip.
+
+    Records are processed concurrently and independently. S3 invokes the function
+    asynchronously and ignores its response, so if any record fails the invocation
+    raises once the others have finished, and Lambda's asynchronous retry runs the
+    event again.
+    """
+    failures = _process_records(event["Records"])
+    if failures:
+        raise RuntimeError(
+            f"{len(failures)} of {len(event['Records'])} upload record(s) failed: {', '.join(failures)}"
+        )
     return {"status": "ok"}
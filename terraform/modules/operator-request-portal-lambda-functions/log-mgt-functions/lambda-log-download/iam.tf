@@ -26,9 +26,14 @@ resource "aws_iam_role_policy" "lambda_policy" {
     Statement = [
       {
         Effect   = "Allow",
-        Action   = ["dynamodb:GetItem"],
+        Action   = ["dynamodb:GetItem", "dynamodb:UpdateItem"],
         Resource = "arn:aws:dynamodb:${data.aws_region.current.region}:${data.aws_caller_identity.current.account_id}:table/${var.log_invite_tracking_table}"
       },
+      {
+        Effect   = "Allow",
+        Action   = ["dynamodb:UpdateItem"],
+        Resource = "arn:aws:dynamodb:${data.aws_region.current.region}:${data.aws_caller_identity.current.account_id}:table/${var.log_upload_tracking_table}"
+      },
       {
         Effect   = "Allow",
         Action   = ["lambda:InvokeFunction"],
@@ -1,7 +1,21 @@
 data "archive_file" "notify_on_upload_zip" {
   type        = "zip"
   output_path = format("%s/.terraform-assets/lambda_zip_file_notify_on_upload.zip", path.root)
-  source_file = format("%s/files/lambda-log-download.py", path.module)
+
+  source {
+    content  = file(format("%s/files/lambda-log-download.py", path.module))
+    filename = "lambda-log-download.py"
+  }
+
+  source {
+    content  = file(format("%s/../../common/files/aws_clients.py", path.module))
+    filename = "aws_clients.py"
+  }
+
+  source {
+    content  = file(format("%s/../../common/files/metrics.py", path.module))
+    filename = "metrics.py"
+  }
 }
 
 resource "aws_lambda_function" "notify_on_upload" {
@@ -19,7 +33,16 @@ resource "aws_lambda_function" "notify_on_upload" {
       NOTIFY_LAMBDA_ARN         = var.notify_lambda_arn
       NOTIFY_TEMPLATE_ID        = var.notify_template_id
       LOG_INVITE_TRACKING_TABLE = var.log_invite_tracking_table
+      LOG_UPLOAD_TRACKING_TABLE = var.log_upload_tracking_table
       ALERTS_TEAM_EMAILS        = var.alerts_team_emails
+      RECORD_MAX_WORKERS        = var.record_max_workers
+      AWS_CLIENTS_LAZY_INIT     = tostring(var.lazy_init)
+
+      ZIP_VALIDATION_MODE             = var.zip_validation_mode
+      ZIP_MAX_ENTRIES                 = var.zip_max_entries
+      ZIP_MAX_CENTRAL_DIRECTORY_BYTES = var.zip_max_central_directory_bytes
+      ZIP_MAX_UNCOMPRESSED_BYTES      = var.zip_max_uncompressed_bytes
+      ZIP_MAX_COMPRESSION_RATIO       = var.zip_max_compression_ratio
     }
   }
 }
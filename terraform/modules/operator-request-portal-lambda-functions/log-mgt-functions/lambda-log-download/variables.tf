@@ -32,3 +32,61 @@ variable "log_invite_tracking_table" {
   description = "Name of the DynamoDB table used to track log upload invites (for MNO name and alert time lookup)"
   type        = string
 }
+
+variable "log_upload_tracking_table" {
+  description = "Name of the DynamoDB table of upload links, marked used once the uploaded object is created"
+  type        = string
+}
+
+variable "zip_max_entries" {
+  description = "Uploads whose ZIP central directory declares more entries than this are rejected"
+  type        = number
+  default     = 10000
+}
+
+variable "zip_max_central_directory_bytes" {
+  description = "Uploads with a larger ZIP central directory are rejected without walking it"
+  type        = number
+  default     = 16777216
+}
+
+variable "zip_max_uncompressed_bytes" {
+  description = "Uploads whose entries add up to more than this many uncompressed bytes are rejected"
+  type        = number
+  default     = 10737418240
+}
+
+variable "zip_max_compression_ratio" {
+  description = "Uploads with any entry compressed more than this ratio (uncompressed/compressed) are rejected as likely zip bombs"
+  type        = number
+  default     = 250
+}
+
+variable "zip_validation_mode" {
+  description = "How uploads are read for ZIP validation: one suffix-range GET, or the original head_object plus header and tail range reads"
+  type        = string
+  default     = "suffix"
+
+  validation {
+    condition     = contains(["suffix", "head"], var.zip_validation_mode)
+    error_message = "zip_validation_mode must be \"suffix\" or \"head\"."
+  }
+}
+
+variable "record_max_workers" {
+  description = "Maximum number of S3 event records the log-download Lambda processes concurrently"
+  type        = number
+  default     = 4
+}
+
+variable "dynamodb_replica_regions" {
+  description = "Regions in which to replicate the download tracking table as a global table"
+  type        = list(string)
+  default     = []
+}
+
+variable "lazy_init" {
+  description = "Build AWS clients (and import boto3) on first use rather than at cold start (AWS_CLIENTS_LAZY_INIT)"
+  type        = bool
+  default     = false
+}
@@ -2,8 +2,14 @@ import os
 import json
 import logging
 import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from datetime import datetime, timedelta, timezone
-import boto3
+
+import metrics
+from aws_clients import get_client
 
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
@@ -17,36 +23,93 @@ LOG_UPLOAD_TRACKING_TABLE = os.environ["LOG_UPLOAD_TRACKING_TABLE"]
 EXPIRY_SECONDS = int(os.environ.get("UPLOAD_LINK_EXPIRY_SECONDS", "604800"))
 MNO_EMAIL_SSM_PREFIX = os.environ.get("MNO_EMAIL_SSM_PREFIX", "/operator-portal/mno-emails")
 MNO_ID_SSM_PREFIX = os.environ.get("MNO_ID_SSM_PREFIX", "/operator-portal/mno-ids")
+MNO_SSM_CACHE_TTL_SECONDS = int(os.environ.get("MNO_SSM_CACHE_TTL_SECONDS", "300"))
+# After a failed refresh, previously loaded values are served for this long before SSM
+# is tried again.
+MNO_SSM_ERROR_RETRY_SECONDS = 30
+INVITE_MAX_WORKERS = int(os.environ.get("INVITE_MAX_WORKERS", "4"))
+# "transaction" claims the invite and registers the upload reference in a single
+# TransactWriteItems call; "sequential" keeps the original get/put/put path.
+INVITE_WRITE_MODE = os.environ.get("INVITE_WRITE_MODE", "transaction")
 
-ddb = boto3.client("dynamodb")
-ssm = boto3.client("ssm")
+BATCH_GET_MAX_KEYS = 100
+BATCH_GET_MAX_ATTEMPTS = 5
+BATCH_GET_BACKOFF_SECONDS = 0.05
 
+INVITE_REGISTERED = "registered"
+INVITE_ALREADY_SENT = "already_invited"
+INVITE_FALLBACK = "fallback"
+
+ddb = get_client("dynamodb")
+ssm = get_client("ssm")
+s3 = get_client("s3")
+lambda_cli = get_client("lambda")
+
+
+# Portal identifiers and contact emails for every MNO, fetched in bulk and kept for the
+# lifetime of the warm container (bounded by MNO_SSM_CACHE_TTL_SECONDS).
+_mno_parameter_cache = {"loaded_at": None, "failed_at": None, "ids": {}, "emails": {}}
+
+
+def _fetch_parameters_by_path(prefix: str) -> dict[str, str]:
+    """Return every parameter directly under prefix, keyed by lower-cased leaf name."""
+    values = {}
+    paginator = ssm.get_paginator("get_parameters_by_path")
+    for page in paginator.paginate(Path=prefix, WithDecryption=True):
+        for param in page.get("Parameters", []):
+            values[param["Name"].rsplit("/", 1)[-1].lower()] = param["Value"]
+    return values
+
+
+def _load_mno_parameters() -> dict:
+    """
+    The cached MNO parameters, reloaded from SSM once the TTL has elapsed. If the reload
+    fails, values loaded earlier are served (without retrying SSM for
+    MNO_SSM_ERROR_RETRY_SECONDS); with nothing loaded yet, the error is raised, failing
+    the invocation rather than every MNO lookup.
+    """
+    now = time.monotonic()
+    loaded_at = _mno_parameter_cache["loaded_at"]
+    if loaded_at is not None and now - loaded_at < MNO_SSM_CACHE_TTL_SECONDS:
+        return _mno_parameter_cache
+    failed_at = _mno_parameter_cache["failed_at"]
+    if loaded_at is not None and failed_at is not None and now - failed_at < MNO_SSM_ERROR_RETRY_SECONDS:
+        return _mno_parameter_cache
 
-def _get_mno_identifier(mno_id: str) -> str | None:
-    param_name = f"{MNO_ID_SSM_PREFIX}/{mno_id.lower()}"
     try:
-        resp = ssm.get_parameter(Name=param_name, WithDecryption=True)
-        return resp["Parameter"]["Value"].strip()
-    except ssm.exceptions.ParameterNotFound:
-        logger.warning(f"No portal identifier SSM parameter found at {param_name}")
-        return None
+        ids = _fetch_parameters_by_path(MNO_ID_SSM_PREFIX)
+        emails = _fetch_parameters_by_path(MNO_EMAIL_SSM_PREFIX)
     except Exception as e:
-        logger.error(f"Error fetching SSM parameter {param_name}: {e}")
+        if loaded_at is None:
+            logger.error(f"Error fetching MNO SSM parameters: {e}")
+            raise
+        logger.error(f"Error fetching MNO SSM parameters, serving those loaded {now - loaded_at:.0f}s ago: {e}")
+        _mno_parameter_cache["failed_at"] = now
+        return _mno_parameter_cache
+
+    _mno_parameter_cache.update(loaded_at=now, failed_at=None, ids=ids, emails=emails)
+    logger.info(f"Loaded SSM parameters for {len(ids)} MNO identifier(s) and {len(emails)} email list(s)")
+    return _mno_parameter_cache
+
+
+def invalidate_mno_cache():
+    _mno_parameter_cache.update(loaded_at=None, failed_at=None, ids={}, emails={})
+
+
+def _get_mno_identifier(mno_id: str) -> str | None:
+    value = _load_mno_parameters()["ids"].get(mno_id.lower())
+    if value is None:
+        logger.warning(f"No portal identifier SSM parameter found at {MNO_ID_SSM_PREFIX}/{mno_id.lower()}")
         return None
+    return value.strip()
 
 
 def _get_mno_emails(mno_id: str) -> list[str]:
-    param_name = f"{MNO_EMAIL_SSM_PREFIX}/{mno_id.lower()}"
-    try:
-        resp = ssm.get_parameter(Name=param_name, WithDecryption=True)
-        raw = resp["Parameter"]["Value"]
-        return [e.strip() for e in raw.split(",") if e.strip()]
-    except ssm.exceptions.ParameterNotFound:
-        logger.warning(f"No SSM parameter found at {param_name}")
-        return []
-    except Exception as e:
-        logger.error(f"Error fetching SSM parameter {param_name}: {e}")
+    raw = _load_mno_parameters()["emails"].get(mno_id.lower())
+    if raw is None:
+        logger.warning(f"No SSM parameter found at {MNO_EMAIL_SSM_PREFIX}/{mno_id.lower()}")
         return []
+    return [e.strip() for e in raw.split(",") if e.strip()]
 
 
 def _mask_email(email: str) -> str:
@@ -84,16 +147,82 @@ def already_invited(mno_id: str, broadcast_id: str) -> bool:
     return "Item" in resp
 
 
-def mark_invited(mno_label: str, broadcast_id: str, mno_name: str, alert_time: str):
+def _batch_get_invites(invite_keys: list[str]) -> tuple[set[str], set[str]]:
+    """
+    One BatchGetItem (at most BATCH_GET_MAX_KEYS keys) against the invite table,
+    re-requesting UnprocessedKeys with exponential backoff. Returns (found, unresolved).
+    """
+    found = set()
+    pending = {
+        LOG_INVITE_TRACKING_TABLE: {
+            "Keys": [{"AlertRef": {"S": key}} for key in invite_keys],
+            "ProjectionExpression": "AlertRef"
+        }
+    }
+    for attempt in range(BATCH_GET_MAX_ATTEMPTS):
+        if attempt:
+            time.sleep(BATCH_GET_BACKOFF_SECONDS * 2 ** (attempt - 1))
+        try:
+            resp = ddb.batch_get_item(RequestItems=pending)
+        except Exception as e:
+            logger.error(f"Error pre-checking {len(invite_keys)} invite(s): {e}")
+            break
+        found.update(item["AlertRef"]["S"] for item in resp.get("Responses", {}).get(LOG_INVITE_TRACKING_TABLE, []))
+        pending = resp.get("UnprocessedKeys") or {}
+        if not pending:
+            break
+
+    unresolved = {key["AlertRef"]["S"] for key in pending.get(LOG_INVITE_TRACKING_TABLE, {}).get("Keys", [])}
+    return found, unresolved
+
+
+def fetch_existing_invites(invite_keys: list[str]) -> dict[str, bool]:
+    """
+    Resolve whether each invite key already exists, in as few BatchGetItem calls as
+    possible. Keys that could not be resolved (throttled or errored) are left out, so
+    callers fall back to checking them individually.
+    """
+    known = {}
+    for start in range(0, len(invite_keys), BATCH_GET_MAX_KEYS):
+        chunk = invite_keys[start:start + BATCH_GET_MAX_KEYS]
+        found, unresolved = _batch_get_invites(chunk)
+        if unresolved:
+            logger.warning(f"{len(unresolved)} invite key(s) unresolved by batch pre-check")
+        known.update({key: key in found for key in chunk if key in found or key not in unresolved})
+    return known
+
+
+def _invite_item(mno_label: str, portal_id: str, broadcast_id: str, mno_name: str, alert_time: str) -> dict:
+    # UploadRef is the upload reference's RequestId: the S3 key only carries the MNO label,
+    # so lambda-log-download uses it to consume the link once the object is created.
+    return {
+        "AlertRef": {"S": _invite_key(mno_label, broadcast_id)},
+        "InvitedAt": {"S": datetime.now(timezone.utc).isoformat()},
+        "MnoName": {"S": mno_name},
+        "AlertTime": {"S": alert_time},
+        "UploadRef": {"S": _invite_key(portal_id, broadcast_id)}
+    }
+
+
+def _upload_reference_item(mno_id: str, broadcast_id: str, s3_location: str, mno_name: str) -> dict:
+    expires_at = (datetime.now(timezone.utc) + timedelta(seconds=EXPIRY_SECONDS)).isoformat()
+    return {
+        "RequestId": {"S": _invite_key(mno_id, broadcast_id)},
+        "CreatedAt": {"S": datetime.now(timezone.utc).isoformat()},
+        "ExpiresAt": {"S": expires_at},
+        "Used": {"BOOL": False},
+        "S3Location": {"S": s3_location},
+        "MnoId": {"S": mno_id},
+        "MnoName": {"S": mno_name},
+        "BroadcastId": {"S": broadcast_id}
+    }
+
+
+def mark_invited(mno_label: str, portal_id: str, broadcast_id: str, mno_name: str, alert_time: str):
 
     ddb.put_item(
         TableName=LOG_INVITE_TRACKING_TABLE,
-        Item={
-            "AlertRef": {"S": _invite_key(mno_label, broadcast_id)},
-            "InvitedAt": {"S": datetime.now(timezone.utc).isoformat()},
-            "MnoName": {"S": mno_name},
-            "AlertTime": {"S": alert_time}
-        }
+        Item=_invite_item(mno_label, portal_id, broadcast_id, mno_name, alert_time)
     )
 
 
@@ -101,20 +230,10 @@ def register_upload_reference(
     mno_id: str, broadcast_id: str, s3_location: str, mno_name: str
 ) -> bool:
     key = _invite_key(mno_id, broadcast_id)
-    expires_at = (datetime.now(timezone.utc) + timedelta(seconds=EXPIRY_SECONDS)).isoformat()
     try:
         ddb.put_item(
             TableName=LOG_UPLOAD_TRACKING_TABLE,
-            Item={
-                "RequestId": {"S": key},
-                "CreatedAt": {"S": datetime.now(timezone.utc).isoformat()},
-                "ExpiresAt": {"S": expires_at},
-                "Used": {"BOOL": False},
-                "S3Location": {"S": s3_location},
-                "MnoId": {"S": mno_id},
-                "MnoName": {"S": mno_name},
-                "BroadcastId": {"S": broadcast_id}
-            },
+            Item=_upload_reference_item(mno_id, broadcast_id, s3_location, mno_name),
             ConditionExpression="attribute_not_exists(RequestId)"
         )
         logger.info(f"Registered upload reference {key} → {s3_location}")
@@ -127,41 +246,193 @@ def register_upload_reference(
         return False
 
 
+def register_invite_transaction(
+    mno_label: str, portal_id: str, broadcast_id: str, s3_location: str, mno_name: str, alert_time: str
+) -> str:
+    """
+    Claim the invite and register the upload reference in one TransactWriteItems call, so
+    neither table can be updated without the other. Returns INVITE_REGISTERED,
+    INVITE_ALREADY_SENT, or INVITE_FALLBACK when the caller should use the sequential path.
+    """
+    invite_key = _invite_key(mno_label, broadcast_id)
+    try:
+        ddb.transact_write_items(
+            TransactItems=[
+                {
+                    "Put": {
+                        "TableName": LOG_INVITE_TRACKING_TABLE,
+                        "Item": _invite_item(mno_label, portal_id, broadcast_id, mno_name, alert_time),
+                        "ConditionExpression": "attribute_not_exists(AlertRef)"
+                    }
+                },
+                {
+                    "Put": {
+                        "TableName": LOG_UPLOAD_TRACKING_TABLE,
+                        "Item": _upload_reference_item(portal_id, broadcast_id, s3_location, mno_name),
+                        "ConditionExpression": "attribute_not_exists(RequestId)"
+                    }
+                }
+            ]
+        )
+        logger.info(f"Registered invite {invite_key} and upload reference → {s3_location}")
+        return INVITE_REGISTERED
+    except ddb.exceptions.TransactionCanceledException as e:
+        # CancellationReasons are positional: [invite put, upload reference put].
+        reasons = [reason.get("Code") for reason in e.response.get("CancellationReasons", [])]
+        if reasons[:1] == ["ConditionalCheckFailed"]:
+            return INVITE_ALREADY_SENT
+        logger.warning(f"Invite transaction for {invite_key} cancelled ({reasons}), falling back to sequential writes")
+        return INVITE_FALLBACK
+    except Exception as e:
+        logger.error(f"Error running invite transaction for {invite_key}: {e}")
+        return INVITE_FALLBACK
+
+
 def prepare_folder(broadcast_id: str):
     try:
-        s3 = boto3.client("s3")
         s3.put_object(Bucket=LOG_BUCKET, Key=f"received/logs/{broadcast_id}/")
         logger.info(f"Created S3 prefix: received/logs/{broadcast_id}/")
     except Exception as e:
         logger.error(f"Error creating S3 prefix for broadcast {broadcast_id}: {e}")
 
 
-def send_invite(email: str, broadcast_id: str, mno_name: str, portal_id: str):
+def send_invite(emails: list[str], broadcast_id: str, mno_name: str, portal_id: str):
+    """Invite every contact for one MNO with a single asynchronous Notify invocation."""
     upload_site = f"https://{UPLOAD_DOMAIN}/upload-logs.html?broadcast_id={broadcast_id}"
     portal_upload_help = f"https://{UPLOAD_DOMAIN}/automate-upload.html"
 
     payload = {
-        "email_address": email,
         "template_id": NOTIFY_TEMPLATE_ID,
         "personalisation": {
             "broadcastRef": broadcast_id,
             "MNO": mno_name,
             "uploadSite": upload_site,
             "portalUploadHelp": portal_upload_help,
-        }
+        },
+        "recipients": [{"email_address": email} for email in emails],
     }
+    masked = ", ".join(_mask_email(email) for email in emails)
     try:
-        lambda_client = boto3.client("lambda")
-        lambda_client.invoke(
+        lambda_cli.invoke(
             FunctionName=NOTIFY_LAMBDA_ARN,
             InvocationType="Event",
             Payload=json.dumps(payload).encode("utf-8")
         )
         logger.info(
-            f"Sent invite to {_mask_email(email)} for MNO {mno_name} ({portal_id}) broadcast {broadcast_id}"
+            f"Sent invite to {masked} for MNO {mno_name} ({portal_id}) broadcast {broadcast_id}"
         )
     except Exception as e:
-        logger.error(f"Error sending invite to {_mask_email(email)}: {e}")
+        logger.error(f"Error sending invite to {masked}: {e}")
+
+
+_timings_lock = threading.Lock()
+
+
+@contextmanager
+def _timed(timings: dict, stage: str):
+    """
+    Time the block as a metrics stage, also adding the duration metrics.timed recorded
+    to timings[stage] (milliseconds) for the response's stage_timings_ms.
+    """
+    result = {}
+    try:
+        with metrics.timed(stage) as result:
+            yield
+    finally:
+        with _timings_lock:
+            timings[stage] = timings.get(stage, 0.0) + result.get("duration_ms", 0.0)
+
+
+def _unique_mnos(mnos: list[dict]) -> list[dict]:
+    """
+    Drop repeated MNO entries for the same broadcast so that two workers never race on
+    the same invite/upload-reference keys.
+    """
+    seen = set()
+    unique = []
+    for mno in mnos:
+        key = _invite_key(_sanitize_for_filename(mno["mno_id"]), mno["provider_message_id"])
+        if key in seen:
+            logger.warning(f"Ignoring duplicate MNO entry {key} in invite event")
+            continue
+        seen.add(key)
+        unique.append(mno)
+    return unique
+
+
+def _claim_invite(
+    mno_label: str, portal_id: str, broadcast_id: str, s3_location: str, mno_id: str, broadcast_start: str,
+    timings: dict, known_invites: dict
+) -> bool:
+    """Record the invite and its upload reference. Returns False if the MNO was already invited."""
+    if INVITE_WRITE_MODE == "transaction":
+        with _timed(timings, "invite_transaction"):
+            outcome = register_invite_transaction(
+                mno_label, portal_id, broadcast_id, s3_location, mno_id, broadcast_start
+            )
+        if outcome != INVITE_FALLBACK:
+            return outcome == INVITE_REGISTERED
+
+    if _invite_key(mno_label, broadcast_id) not in known_invites:
+        with _timed(timings, "already_invited"):
+            if already_invited(mno_label, broadcast_id):
+                return False
+    with _timed(timings, "register_upload_reference"):
+        register_upload_reference(portal_id, broadcast_id, s3_location, mno_id)
+    with _timed(timings, "mark_invited"):
+        mark_invited(mno_label, portal_id, broadcast_id, mno_id, broadcast_start)
+    return True
+
+
+def _process_mno(mno: dict, broadcast_start: str, timings: dict, known_invites: dict) -> dict | None:
+    """Run the full invite pipeline for one MNO, in order. Returns the invite sent, if any."""
+    mno_id = mno["mno_id"]
+    broadcast_id = mno["provider_message_id"]
+    mno_label = _sanitize_for_filename(mno_id)
+
+    if known_invites.get(_invite_key(mno_label, broadcast_id)):
+        logger.info(f"Invite for MNO {mno_id} broadcast {broadcast_id} already sent, skipping")
+        return None
+
+    portal_id = _get_mno_identifier(mno_id)
+    if not portal_id:
+        logger.warning(f"No portal identifier found for MNO {mno_id}, skipping")
+        return None
+
+    emails = _get_mno_emails(mno_id)
+    if not emails:
+        logger.warning(f"No emails found for MNO {mno_id}, skipping")
+        return None
+
+    filename = f"CBC_{mno_label}_{_format_timestamp_for_filename(broadcast_start)}_{broadcast_id}.zip"
+    s3_location = f"/received/logs/{broadcast_id}/{filename}"
+    if not _claim_invite(
+        mno_label, portal_id, broadcast_id, s3_location, mno_id, broadcast_start, timings, known_invites
+    ):
+        logger.info(f"Invite for MNO {mno_id} ({portal_id}) broadcast {broadcast_id} already sent, skipping")
+        return None
+
+    with _timed(timings, "prepare_folder"):
+        prepare_folder(broadcast_id)
+
+    with _timed(timings, "send_invite"):
+        send_invite(emails, broadcast_id, mno_id, portal_id)
+
+    return {"mno_id": mno_id, "portal_id": portal_id}
+
+
+def _process_mnos(mnos: list[dict], broadcast_start: str, timings: dict, known_invites: dict) -> list[dict]:
+    """
+    Fan the per-MNO pipeline out over a bounded thread pool. Each MNO's steps still run
+    in order within a single worker; INVITE_MAX_WORKERS=1 keeps the old serial loop.
+    """
+    workers = max(1, min(INVITE_MAX_WORKERS, len(mnos)))
+    if workers == 1:
+        results = [_process_mno(mno, broadcast_start, timings, known_invites) for mno in mnos]
+    else:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(lambda mno: _process_mno(mno, broadcast_start, timings, known_invites), mnos))
+    return [result for result in results if result]
 
 
 def lambda_handler(event, context):
@@ -182,44 +453,32 @@ def lambda_handler(event, context):
     32-character portal identifier from SSM. The portal identifier is used in upload
     URLs and DynamoDB keys; it never appears in the event payload or the invite email
     body text.
+
+    Both SSM prefixes are cached across warm invocations; pass "refresh_mno_config": true
+    to force a reload (e.g. straight after onboarding a new MNO).
     """
     alert_ref = event["alert_reference"]
+    if event.get("refresh_mno_config"):
+        invalidate_mno_cache()
     logger.info(f"Processing upload invite event: alert_reference={alert_ref}, mno_count={len(event.get('mnos', []))}")
 
-    invites_sent = []
+    started = time.perf_counter()
+    timings = {}
 
-    for mno in event.get("mnos", []):
-        mno_id = mno["mno_id"]
-        broadcast_id = mno["provider_message_id"]
+    # Warm the SSM cache once, up front, rather than from every worker.
+    with _timed(timings, "ssm_fetch"):
+        _load_mno_parameters()
 
-        portal_id = _get_mno_identifier(mno_id)
-        if not portal_id:
-            logger.warning(f"No portal identifier found for MNO {mno_id}, skipping")
-            continue
-
-        mno_label = _sanitize_for_filename(mno_id)
-
-        if already_invited(mno_label, broadcast_id):
-            logger.info(f"Invite for MNO {mno_id} ({portal_id}) broadcast {broadcast_id} already sent, skipping")
-            continue
-
-        emails = _get_mno_emails(mno_id)
-        if not emails:
-            logger.warning(f"No emails found for MNO {mno_id}, skipping")
-            continue
+    mnos = _unique_mnos(event.get("mnos", []))
 
-        broadcast_start = event.get("broadcast_start", "")
-        filename = f"CBC_{mno_label}_{_format_timestamp_for_filename(broadcast_start)}_{broadcast_id}.zip"
-        s3_location = f"/received/logs/{broadcast_id}/{filename}"
-        prepare_folder(broadcast_id)
-        register_upload_reference(portal_id, broadcast_id, s3_location, mno_id)
-
-        mark_invited(mno_label, broadcast_id, mno_id, broadcast_start)
-
-        for email in emails:
-            send_invite(email, broadcast_id, mno_id, portal_id)
+    # Resolve every invite key for the event in one BatchGetItem, so a re-delivered
+    # event costs a single read instead of one per MNO.
+    with _timed(timings, "invite_precheck"):
+        known_invites = fetch_existing_invites(
+            [_invite_key(_sanitize_for_filename(mno["mno_id"]), mno["provider_message_id"]) for mno in mnos]
+        )
 
-        invites_sent.append({"mno_id": mno_id, "portal_id": portal_id})
+    invites_sent = _process_mnos(mnos, event.get("broadcast_start", ""), timings, known_invites)
 
     logger.info(f"Sent {len(invites_sent)} upload invite(s) for alert {alert_ref}")
     return {
@@ -227,6 +486,8 @@ def lambda_handler(event, context):
         "body": json.dumps({
             "message": "Log upload invites sent",
             "alert_reference": alert_ref,
-            "links_generated": len(invites_sent)
+            "links_generated": len(invites_sent),
+            "duration_ms": round((time.perf_counter() - started) * 1000, 1),
+            "stage_timings_ms": {stage: round(ms, 1) for stage, ms in timings.items()}
         })
     }
@@ -49,6 +49,7 @@ resource "aws_iam_role_policy" "log_upload_policy" {
         Effect = "Allow"
         Action = [
           "dynamodb:GetItem",
+          "dynamodb:BatchGetItem",
           "dynamodb:UpdateItem",
           "dynamodb:PutItem"
         ]
@@ -78,6 +79,15 @@ resource "aws_iam_role_policy" "log_upload_policy" {
           "arn:aws:ssm:${data.aws_region.current.region}:${data.aws_caller_identity.current.account_id}:parameter/operator-portal/mno-emails/*",
           "arn:aws:ssm:${data.aws_region.current.region}:${data.aws_caller_identity.current.account_id}:parameter/operator-portal/mno-ids/*"
         ]
+      },
+
+      {
+        Effect = "Allow"
+        Action = ["ssm:GetParametersByPath"]
+        Resource = [
+          "arn:aws:ssm:${data.aws_region.current.region}:${data.aws_caller_identity.current.account_id}:parameter/operator-portal/mno-emails",
+          "arn:aws:ssm:${data.aws_region.current.region}:${data.aws_caller_identity.current.account_id}:parameter/operator-portal/mno-ids"
+        ]
       }
     ]
   })
@@ -1,7 +1,21 @@
 data "archive_file" "log_upload_zip" {
   type        = "zip"
   output_path = format("%s/.terraform-assets/lambda_zip_file_log_upload.zip", path.root)
-  source_file = format("%s/files/log-upload-handler.py", path.module)
+
+  source {
+    content  = file(format("%s/files/log-upload-handler.py", path.module))
+    filename = "log-upload-handler.py"
+  }
+
+  source {
+    content  = file(format("%s/../../common/files/aws_clients.py", path.module))
+    filename = "aws_clients.py"
+  }
+
+  source {
+    content  = file(format("%s/../../common/files/metrics.py", path.module))
+    filename = "metrics.py"
+  }
 }
 
 resource "aws_lambda_function" "log_upload" {
@@ -24,6 +38,10 @@ resource "aws_lambda_function" "log_upload" {
       LOG_UPLOAD_TRACKING_TABLE  = aws_dynamodb_table.log_upload_tracking.name
       MNO_EMAIL_SSM_PREFIX       = var.mno_email_ssm_prefix
       MNO_ID_SSM_PREFIX          = var.mno_id_ssm_prefix
+      MNO_SSM_CACHE_TTL_SECONDS  = tostring(var.mno_ssm_cache_ttl_seconds)
+      INVITE_MAX_WORKERS         = tostring(var.invite_max_workers)
+      INVITE_WRITE_MODE          = var.invite_write_mode
+      AWS_CLIENTS_LAZY_INIT      = tostring(var.lazy_init)
     }
   }
 
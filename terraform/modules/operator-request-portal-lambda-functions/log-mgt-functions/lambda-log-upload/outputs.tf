@@ -3,6 +3,11 @@ output "log_upload_lambda_arn" {
   value       = aws_lambda_function.log_upload.arn
 }
 
+output "log_upload_tracking_table_name" {
+  description = "Name of the log upload link tracking DynamoDB table"
+  value       = aws_dynamodb_table.log_upload_tracking.name
+}
+
 output "log_invite_tracking_table_name" {
   description = "Name of the log invite tracking DynamoDB table"
   value       = aws_dynamodb_table.log_invite_tracking.name
@@ -52,3 +52,32 @@ variable "mno_id_ssm_prefix" {
   type        = string
   default     = "/operator-portal/mno-ids"
 }
+
+variable "mno_ssm_cache_ttl_seconds" {
+  description = "Seconds a warm log-upload Lambda keeps the bulk-fetched MNO identifiers and emails before re-reading SSM"
+  type        = number
+  default     = 300
+}
+
+variable "invite_max_workers" {
+  description = "Number of MNOs the log-upload Lambda processes concurrently (1 disables concurrency)"
+  type        = number
+  default     = 4
+}
+
+variable "invite_write_mode" {
+  description = "How invite and upload-reference records are written: a single DynamoDB transaction, or the original sequential get/put calls"
+  type        = string
+  default     = "transaction"
+
+  validation {
+    condition     = contains(["transaction", "sequential"], var.invite_write_mode)
+    error_message = "invite_write_mode must be \"transaction\" or \"sequential\"."
+  }
+}
+
+variable "lazy_init" {
+  description = "Build AWS clients (and import boto3) on first use rather than at cold start (AWS_CLIENTS_LAZY_INIT)"
+  type        = bool
+  default     = false
+}
@@ -1,20 +1,36 @@
 import os
+import copy
 import base64
+import hashlib
 import logging
 from datetime import datetime, timezone
 from urllib.parse import parse_qs, unquote
 
-import boto3
+import ddb_routing
+import download_tokens
+import metrics
+import ttl_cache
 
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
 
 TRACK_TABLE = "operator-request-portal-download-tracking"
 
-ddb = boto3.client(
-    "dynamodb",
-    region_name=os.environ.get("DYNAMODB_REGION", "eu-west-2")
-)
+# Embedded at deploy time, as is SIGNING_KEYS below. AWS_REGION is the executing edge region.
+ROUTING = ddb_routing.load_routing()
+DDB_ROUTES = ddb_routing.routes(ROUTING, os.environ.get("AWS_REGION", ROUTING["home_region"]))
+ddb_routing.preconnect(ROUTING, DDB_ROUTES)
+ddb = DDB_ROUTES["write"]["home_client"]
+
+# Lambda@Edge has no environment variables.
+SIGNING_KEYS = download_tokens.load_keys()
+
+# Rejections that will not change on retry are remembered per container, keyed by a
+# hash of the token, so a repeated bad or replayed link is answered without DynamoDB.
+NEGATIVE_CACHE_TTL_SECONDS = 60
+NEGATIVE_CACHE_MAX_ENTRIES = 1024
+NEGATIVE_CACHE_ERROR_TYPES = ("invalid_token", "already_used", "expired_link")
+NEGATIVE_CACHE = ttl_cache.TTLCache(NEGATIVE_CACHE_MAX_ENTRIES, NEGATIVE_CACHE_TTL_SECONDS)
 
 
 def error_response(status_code: int, status_desc: str, body: str, error_type: str = None) -> dict:
@@ -93,10 +109,12 @@ def _check_expiry(kv: dict):
 
 def _get_tracking_record(reference: str, raw_b64: str):
     try:
-        resp = ddb.get_item(TableName=TRACK_TABLE, Key={"RequestId": {"S": reference}})
+        resp = ddb_routing.call(
+            DDB_ROUTES["read"], "get_item", TableName=TRACK_TABLE, Key={"RequestId": {"S": reference}}
+        )
     except Exception as e:
         logger.error("DynamoDB get_item failed for %s: %s", _mask_reference(reference), e)
-        return None, error_response(403, "Forbidden", "Invalid reference", "invalid_token")
+        return None, error_response(500, "Internal Server Error", "Could not check token", "internal_error")
 
     item = resp.get("Item")
     if not item:
@@ -111,36 +129,151 @@ def _get_tracking_record(reference: str, raw_b64: str):
     return item, None
 
 
-def _increment_download(reference: str):
+def _verify_signature(kv: dict):
+    if download_tokens.verify(kv, SIGNING_KEYS):
+        return None
+    logger.warning("Bad signature (kid=%s) for reference: %s", kv.get("kid"), _mask_reference(kv["reference"]))
+    return error_response(403, "Forbidden", "Invalid token", "invalid_token")
+
+
+def _classify_failed_update(reference: str, raw_b64: str | None, old_item: dict | None):
+    """
+    Map a failed conditional update to invalid_token or already_used, from the item
+    returned by ReturnValuesOnConditionCheckFailure. No item for a signed token means
+    there is no tracking record; for an unsigned one the record is read to check.
+    """
+    already_used = error_response(403, "Forbidden", "This download link has already been used", "already_used")
+    if raw_b64 is None:
+        if old_item is None:
+            logger.warning("No tracking record found for reference: %s", _mask_reference(reference))
+            return error_response(403, "Forbidden", "Invalid reference", "invalid_token")
+        return already_used
+    if old_item is None:
+        _, err = _get_tracking_record(reference, raw_b64)
+        return err or already_used
+    if old_item.get("RawDownloadToken", {}).get("S") != raw_b64:
+        logger.warning("Token mismatch for reference: %s", _mask_reference(reference))
+        return error_response(403, "Forbidden", "Invalid token", "invalid_token")
+    return already_used
+
+
+def _record_download(reference: str, raw_b64: str = None):
+    """
+    Mark the link used and bump DownloadCount in one conditional UpdateItem; returns
+    (new DownloadCount, error response). The update requires the tracking record to
+    exist, so a validly signed token for an unknown reference cannot create one. With
+    raw_b64 (an unsigned token) it also requires it to match the stored
+    RawDownloadToken, so a wrong token fails the same single call.
+    """
     update_expr = (
         "SET DownloadCount = if_not_exists(DownloadCount, :zero) + :one,"
         " LastDownloadAt = :now, #u = :true"
     )
+    condition = "attribute_not_exists(#u) OR #u = :false"
+    values = {
+        ":zero": {"N": "0"},
+        ":one": {"N": "1"},
+        ":true": {"BOOL": True},
+        ":false": {"BOOL": False},
+        ":now": {"S": datetime.now(timezone.utc).isoformat()}
+    }
+    if raw_b64 is not None:
+        condition = f"RawDownloadToken = :token AND ({condition})"
+        values[":token"] = {"S": raw_b64}
+    else:
+        condition = f"attribute_exists(RequestId) AND ({condition})"
     try:
-        ddb.update_item(
+        resp = ddb_routing.call(
+            DDB_ROUTES["write"], "update_item",
             TableName=TRACK_TABLE,
             Key={"RequestId": {"S": reference}},
             UpdateExpression=update_expr,
-            ConditionExpression="attribute_not_exists(#u) OR #u = :false",
+            ConditionExpression=condition,
             ExpressionAttributeNames={"#u": "Used"},
-            ExpressionAttributeValues={
-                ":zero": {"N": "0"},
-                ":one": {"N": "1"},
-                ":true": {"BOOL": True},
-                ":false": {"BOOL": False},
-                ":now": {"S": datetime.now(timezone.utc).isoformat()}
-            }
+            ExpressionAttributeValues=values,
+            ReturnValues="ALL_NEW",
+            ReturnValuesOnConditionCheckFailure="ALL_OLD"
         )
-        return None
-    except ddb.exceptions.ConditionalCheckFailedException:
-        return error_response(403, "Forbidden", "This download link has already been used", "already_used")
+        return int(resp.get("Attributes", {}).get("DownloadCount", {}).get("N", "1")), None
+    except ddb.exceptions.ConditionalCheckFailedException as e:
+        old_item = getattr(e, "response", {}).get("Item")
+        return None, _classify_failed_update(reference, raw_b64, old_item)
     except Exception as e:
         logger.error("Failed to update download count for %s: %s", _mask_reference(reference), e)
-        return error_response(500, "Internal Server Error", "Could not track download")
+        return None, error_response(500, "Internal Server Error", "Could not track download")
+
+
+def _authorise_download(kv: dict, raw_b64: str):
+    """
+    Returns (download count, error response), from exactly one DynamoDB call on the
+    success path. A signed token is verified locally first; an unsigned one is matched
+    against its stored RawDownloadToken inside the update's condition.
+    """
+    if download_tokens.is_signed(kv):
+        err = _verify_signature(kv)
+        if err:
+            return None, err
+        return _record_download(kv["reference"])
+    return _record_download(kv["reference"], raw_b64)
+
+
+def _check_token(token: str):
+    """Returns (token params, download count, error response) for a data token."""
+    raw_b64, decoded, err = _decode_token(token)
+    if err:
+        return None, None, err
+
+    kv, err = _parse_token(decoded)
+    if err:
+        return None, None, err
+
+    err = _check_expiry(kv)
+    if err:
+        return None, None, err
+
+    download_count, err = _authorise_download(kv, raw_b64)
+    return kv, download_count, err
+
+
+def _is_cacheable_rejection(response: dict) -> bool:
+    error_type = response["headers"].get("x-error-type", [{}])[0].get("value")
+    return response["status"] == "403" and error_type in NEGATIVE_CACHE_ERROR_TYPES
+
+
+def _check_token_cached(token: str):
+    """_check_token, answering repeated rejections from NEGATIVE_CACHE."""
+    cache_key = hashlib.sha256(token.encode("utf-8")).hexdigest()
+    cached = NEGATIVE_CACHE.get(cache_key)
+    if cached is not None:
+        logger.info("Rejected from negative cache: %s", cached["headers"]["x-error-type"][0]["value"])
+        return None, None, copy.deepcopy(cached)
+
+    kv, download_count, err = _check_token(token)
+    if err and _is_cacheable_rejection(err):
+        # CloudFront does not cache responses generated at viewer-request, but the
+        # browser may reuse the rejection for as long as we would.
+        err["headers"]["cache-control"] = [
+            {"key": "Cache-Control", "value": f"max-age={NEGATIVE_CACHE_TTL_SECONDS}"}
+        ]
+        NEGATIVE_CACHE.put(cache_key, copy.deepcopy(err))
+    return kv, download_count, err
+
+
+def _response_outcome(response: dict) -> str:
+    """Metrics outcome: "forwarded" for the rewritten request, else the error type."""
+    if "status" not in response:
+        return "forwarded"
+    return response["headers"].get("x-error-type", [{}])[0].get("value") or response["status"]
 
 
 def lambda_handler(event, context):
-    req = event["Records"][0]["cf"]["request"]
+    with metrics.timed("viewer-request") as result:
+        response = _handle_viewer_request(event["Records"][0]["cf"]["request"])
+        result["outcome"] = _response_outcome(response)
+    return response
+
+
+def _handle_viewer_request(req):
 
     if req.get("method") != "GET":
         logger.warning("Invalid method: %s", req.get("method"))
@@ -154,29 +287,10 @@ def lambda_handler(event, context):
     if not token:
         return error_response(400, "Bad Request", "Missing data parameter", "missing_token")
 
-    raw_b64, decoded, err = _decode_token(token)
-    if err:
-        return err
-
-    kv, err = _parse_token(decoded)
-    if err:
-        return err
-
-    err = _check_expiry(kv)
-    if err:
-        return err
-
-    reference = kv["reference"]
-
-    item, err = _get_tracking_record(reference, raw_b64)
-    if err:
-        return err
-
-    err = _increment_download(reference)
+    kv, download_count, err = _check_token_cached(token)
     if err:
         return err
 
-    download_count = int(item.get("DownloadCount", {}).get("N", "0")) + 1
     alert = kv["alert"]
     mno = kv["mno"]
     s3_path = f"/received/logs/{alert}/CBC_{alert}_{mno}.zip"
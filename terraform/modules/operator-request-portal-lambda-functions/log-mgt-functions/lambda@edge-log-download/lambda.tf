@@ -1,7 +1,67 @@
 data "archive_file" "download_edge_zip" {
   type        = "zip"
   output_path = format("%s/.terraform-assets/lambda_zip_file_download_edge.zip", path.root)
-  source_file = format("%s/files/edge-log-download.py", path.module)
+
+  source {
+    content  = file(format("%s/files/edge-log-download.py", path.module))
+    filename = "edge-log-download.py"
+  }
+
+  source {
+    content  = file(format("%s/../../common/files/aws_clients.py", path.module))
+    filename = "aws_clients.py"
+  }
+
+  source {
+    content  = file(format("%s/../../common/files/metrics.py", path.module))
+    filename = "metrics.py"
+  }
+
+  source {
+    content  = file(format("%s/../../common/files/ddb_routing.py", path.module))
+    filename = "ddb_routing.py"
+  }
+
+  source {
+    content  = file(format("%s/../../common/files/ddb_lite.py", path.module))
+    filename = "ddb_lite.py"
+  }
+
+  source {
+    content  = file(format("%s/../../common/files/ttl_cache.py", path.module))
+    filename = "ttl_cache.py"
+  }
+
+  source {
+    content = jsonencode({
+      home_region                = var.dynamodb_region
+      replica_regions            = var.dynamodb_replica_regions
+      routes                     = var.dynamodb_replica_routes
+      strongly_consistent_writes = var.dynamodb_strongly_consistent_writes
+      client                     = var.dynamodb_client
+    })
+    filename = "dynamodb_routing.json"
+  }
+
+  # Lambda@Edge has no environment variables, so the client mode is embedded.
+  source {
+    content  = jsonencode({ lazy_init = var.lazy_init })
+    filename = "aws_clients.json"
+  }
+
+  source {
+    content  = file(format("%s/../../common/files/download_tokens.py", path.module))
+    filename = "download_tokens.py"
+  }
+
+  # Lambda@Edge has no environment variables, so the token signing keys are embedded.
+  source {
+    content = jsonencode({
+      active_kid = var.download_token_active_kid
+      keys       = var.download_token_signing_keys
+    })
+    filename = "download_token_keys.json"
+  }
 }
 
 resource "aws_lambda_function" "download_edge" {
@@ -13,6 +73,13 @@ resource "aws_lambda_function" "download_edge" {
   role             = aws_iam_role.edge_role.arn
   publish          = true
   source_code_hash = data.archive_file.download_edge_zip.output_base64sha256
+
+  lifecycle {
+    precondition {
+      condition     = var.download_token_active_kid == null || contains(keys(var.download_token_signing_keys), coalesce(var.download_token_active_kid, "-"))
+      error_message = "download_token_active_kid must name a key in download_token_signing_keys."
+    }
+  }
 }
 
 output "download_edge_lambda_arn" {
@@ -23,3 +23,51 @@ variable "cloudfront_distribution_id" {
   description = "The ID of the CloudFront distribution that should invoke this Lambda@Edge"
   type        = string
 }
+
+variable "download_token_signing_keys" {
+  description = "HMAC keys (kid => base64url secret) accepted for signed download tokens. Keep a retired key until its last token has expired."
+  type        = map(string)
+  default     = {}
+  sensitive   = true
+}
+
+variable "download_token_active_kid" {
+  description = "Key id new download tokens are signed with; must be a key in download_token_signing_keys"
+  type        = string
+  default     = null
+}
+
+variable "dynamodb_replica_regions" {
+  description = "Regions holding global-table replicas of the tracking table; edges read from the nearest one"
+  type        = list(string)
+  default     = []
+}
+
+variable "dynamodb_replica_routes" {
+  description = "Executing edge region => nearest replica region, for edge regions that have no replica of their own"
+  type        = map(string)
+  default     = {}
+}
+
+variable "dynamodb_strongly_consistent_writes" {
+  description = "Set when the replicas use multi-region strong consistency, so conditional updates can also go to the nearest replica"
+  type        = bool
+  default     = false
+}
+
+variable "dynamodb_client" {
+  description = "DynamoDB client the edge function uses (embedded in dynamodb_routing.json): boto3, or the dependency-free ddb_lite client"
+  type        = string
+  default     = "boto3"
+
+  validation {
+    condition     = contains(["boto3", "lite"], var.dynamodb_client)
+    error_message = "dynamodb_client must be \"boto3\" or \"lite\"."
+  }
+}
+
+variable "lazy_init" {
+  description = "Build AWS clients (and import boto3) on first use rather than at cold start (embedded as aws_clients.json)"
+  type        = bool
+  default     = false
+}
@@ -4,6 +4,17 @@ resource "aws_dynamodb_table" "log_upload_tracking" {
 
   hash_key = "RequestId"
 
+  # Global-table replicas need a stream of new and old images.
+  stream_enabled   = length(var.dynamodb_replica_regions) > 0
+  stream_view_type = length(var.dynamodb_replica_regions) > 0 ? "NEW_AND_OLD_IMAGES" : null
+
+  dynamic "replica" {
+    for_each = var.dynamodb_replica_regions
+    content {
+      region_name = replica.value
+    }
+  }
+
   attribute {
     name = "RequestId"
     type = "S"
@@ -1,20 +1,27 @@
 import os
 import re
+import copy
+import json
 import logging
 from datetime import datetime, timezone
-from urllib.parse import parse_qs
+from urllib.parse import parse_qs, quote
 
-import boto3
+import aws_clients
+import ddb_routing
+import metrics
+import ttl_cache
 
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
 
 TRACK_TABLE = "operator-request-portal-log-uploads"
 
-ddb = boto3.client(
-    "dynamodb",
-    region_name=os.environ.get("DYNAMODB_REGION", "eu-west-2")
-)
+# Embedded at deploy time (Lambda@Edge has no environment variables). AWS_REGION is the
+# executing edge region.
+ROUTING = ddb_routing.load_routing()
+DDB_ROUTES = ddb_routing.routes(ROUTING, os.environ.get("AWS_REGION", ROUTING["home_region"]))
+ddb_routing.preconnect(ROUTING, DDB_ROUTES)
+ddb = DDB_ROUTES["write"]["home_client"]
 
 S3_KEY_RE = re.compile(
     r"^/received/logs/(?P<broadcast>[^/]+)/CBC_[^_]+_[^_]+_(?P=broadcast)\.zip$"
@@ -22,6 +29,52 @@ S3_KEY_RE = re.compile(
 
 MNO_ID_HEADER_NAME = "x-upload-token"
 
+# Presigned uploads (?action=presign) are enabled by embedding the destination bucket:
+#     {"bucket": "...-static", "region": "eu-west-2", "presign_expiry_seconds": 900}
+UPLOAD_CONFIG_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "upload_config.json")
+DEFAULT_PRESIGN_EXPIRY_SECONDS = 900
+
+
+def _load_upload_config(path: str = UPLOAD_CONFIG_FILE) -> dict:
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+UPLOAD_CONFIG = _load_upload_config()
+
+# ?action= selects an S3 multipart step; without it the whole archive is sent in one PUT.
+# Each step is authorised against the same mno#broadcast_id link. A single PUT consumes it
+# at origin-response; a multipart or presigned upload consumes it when S3 reports the
+# object created, in lambda-log-download.
+UPLOAD_ACTION_METHODS = {
+    None: "PUT",
+    "presign": "POST",
+    "initiate": "POST",
+    "part": "PUT",
+    "complete": "POST",
+    "abort": "DELETE",
+}
+MAX_PART_NUMBER = 10000
+
+# Rejections that will not change on retry are remembered per container, keyed by
+# mno#broadcast_id, so a repeated bad or replayed link is answered without DynamoDB.
+# Kept short because a link read from a lagging replica can briefly look missing.
+NEGATIVE_CACHE_TTL_SECONDS = 60
+NEGATIVE_CACHE_MAX_ENTRIES = 1024
+NEGATIVE_CACHE_ERROR_TYPES = ("invalid_request", "already_used", "expired_link")
+NEGATIVE_CACHE = ttl_cache.TTLCache(NEGATIVE_CACHE_MAX_ENTRIES, NEGATIVE_CACHE_TTL_SECONDS)
+
+# Links validated as unused are remembered for a few seconds, so an MNO script retrying a
+# failed PUT skips the read. Only S3Location and ExpiresAt are kept; Used is never trusted
+# from here — origin-response's conditional update decides whether the upload counts.
+VALIDATED_LINK_TTL_SECONDS = 10
+VALIDATED_LINK_MAX_ENTRIES = 256
+VALIDATED_LINK_FIELDS = ("S3Location", "ExpiresAt")
+VALIDATED_LINKS = ttl_cache.TTLCache(VALIDATED_LINK_MAX_ENTRIES, VALIDATED_LINK_TTL_SECONDS)
+
 
 def error_response(status_code: int, status_desc: str, body: str, error_type: str = None) -> dict:
     headers = {
@@ -46,13 +99,51 @@ def _parse_params(qs: str):
     return mno_id, broadcast_id
 
 
+def _parse_multipart_params(qs: str):
+    params = parse_qs(qs)
+    action = params.get("action", [None])[0]
+    upload_id = params.get("upload_id", [None])[0]
+    part_number = params.get("part_number", [None])[0]
+    return action, upload_id, part_number
+
+
+def _origin_querystring(action: str, upload_id: str, part_number: str):
+    """Returns (S3 querystring, error_response) for an upload action."""
+    if action in (None, "presign"):
+        return "", None
+    if action == "initiate":
+        return "uploads", None
+    if not upload_id:
+        return None, error_response(400, "Bad Request", "Missing upload_id parameter", "missing_upload_id")
+    upload_id_param = f"uploadId={quote(upload_id, safe='')}"
+    if action != "part":
+        return upload_id_param, None
+    if not (part_number or "").isdigit() or not 1 <= int(part_number) <= MAX_PART_NUMBER:
+        return None, error_response(
+            400, "Bad Request", f"part_number must be between 1 and {MAX_PART_NUMBER}", "invalid_part_number"
+        )
+    return f"partNumber={int(part_number)}&{upload_id_param}", None
+
+
+def _is_single_put(request: dict) -> bool:
+    """
+    True for the one origin request whose 2xx response means the object exists; every
+    multipart step carries an S3 querystring (see _origin_querystring). A complete's 200
+    is sent once S3 starts assembling the object, with any failure reported in the body,
+    so origin-response cannot tell whether it succeeded.
+    """
+    return not request.get("querystring")
+
+
 def _get_tracking_record(composite_key: str):
     try:
-        resp = ddb.get_item(TableName=TRACK_TABLE, Key={"RequestId": {"S": composite_key}})
+        resp = ddb_routing.call(
+            DDB_ROUTES["read"], "get_item", TableName=TRACK_TABLE, Key={"RequestId": {"S": composite_key}}
+        )
         return resp.get("Item"), None
     except Exception as e:
         logger.error("DynamoDB get_item failed for %s: %s", composite_key, e)
-        return None, error_response(403, "Forbidden", "Invalid request", "invalid_request")
+        return None, error_response(500, "Internal Server Error", "Processing error", "internal_error")
 
 
 def _check_expiry(item: dict):
@@ -72,7 +163,8 @@ def _check_expiry(item: dict):
 
 def _mark_used(composite_key: str):
     try:
-        ddb.update_item(
+        ddb_routing.call(
+            DDB_ROUTES["write"], "update_item",
             TableName=TRACK_TABLE,
             Key={"RequestId": {"S": composite_key}},
             UpdateExpression="SET #u = :true, UsedAt = :now",
@@ -92,15 +184,7 @@ def _mark_used(composite_key: str):
         return error_response(500, "Internal Server Error", "Processing error", "internal_error")
 
 
-def _validate_request(mno_id: str, broadcast_id: str):
-    """Returns (item, error_response) — exactly one of the pair will be None."""
-    if not mno_id:
-        return None, error_response(400, "Bad Request", "Missing mno parameter", "missing_mno")
-    if not broadcast_id:
-        return None, error_response(400, "Bad Request", "Missing broadcast_id parameter", "missing_broadcast_id")
-
-    composite_key = f"{mno_id}#{broadcast_id}"
-
+def _check_link(composite_key: str, mno_id: str, broadcast_id: str):
     item, err = _get_tracking_record(composite_key)
     if err:
         return None, err
@@ -118,13 +202,115 @@ def _validate_request(mno_id: str, broadcast_id: str):
     return item, None
 
 
+def _is_cacheable_rejection(response: dict) -> bool:
+    error_type = response["headers"].get("x-error-type", [{}])[0].get("value")
+    return response["status"] == "403" and error_type in NEGATIVE_CACHE_ERROR_TYPES
+
+
+def _remember_rejection(composite_key: str, err: dict):
+    err["headers"]["cache-control"] = [
+        {"key": "Cache-Control", "value": f"max-age={NEGATIVE_CACHE_TTL_SECONDS}"}
+    ]
+    NEGATIVE_CACHE.put(composite_key, copy.deepcopy(err))
+    VALIDATED_LINKS.discard(composite_key)
+
+
+def _check_link_cached(composite_key: str, mno_id: str, broadcast_id: str):
+    """_check_link, skipping the read for a link validated in the last few seconds."""
+    item = VALIDATED_LINKS.get(composite_key)
+    if item is not None:
+        logger.info("Upload link served from validated-link cache: mno=%s broadcast_id=%s", mno_id, broadcast_id)
+        return item, _check_expiry(item)
+
+    item, err = _check_link(composite_key, mno_id, broadcast_id)
+    if not err:
+        VALIDATED_LINKS.put(composite_key, {field: item[field] for field in VALIDATED_LINK_FIELDS if field in item})
+    return item, err
+
+
+def _validate_request(mno_id: str, broadcast_id: str):
+    """Returns (item, error_response) — exactly one of the pair will be None."""
+    if not mno_id:
+        return None, error_response(400, "Bad Request", "Missing mno parameter", "missing_mno")
+    if not broadcast_id:
+        return None, error_response(400, "Bad Request", "Missing broadcast_id parameter", "missing_broadcast_id")
+
+    composite_key = f"{mno_id}#{broadcast_id}"
+    cached = NEGATIVE_CACHE.get(composite_key)
+    if cached is not None:
+        logger.info("Rejected from negative cache: %s", cached["headers"]["x-error-type"][0]["value"])
+        return None, copy.deepcopy(cached)
+
+    item, err = _check_link_cached(composite_key, mno_id, broadcast_id)
+    if err:
+        if _is_cacheable_rejection(err):
+            _remember_rejection(composite_key, err)
+        return None, err
+    return item, None
+
+
+def _s3_client():
+    return aws_clients.get_client("s3", region_name=UPLOAD_CONFIG.get("region"))
+
+
+def _issue_presigned_upload(composite_key: str, s3_location: str):
+    """
+    Hand back a short-lived presigned PUT for the link's S3Location, so the archive itself
+    goes straight to S3 rather than through CloudFront and this function. Issuing a URL
+    does not consume the link: after a failed PUT or an expired URL the client can ask for
+    another, until lambda-log-download consumes the link once the object is created. The
+    URL requires If-None-Match: *, so S3 accepts at most one write however many are issued.
+    """
+    expires_in = int(UPLOAD_CONFIG.get("presign_expiry_seconds", DEFAULT_PRESIGN_EXPIRY_SECONDS))
+    try:
+        url = _s3_client().generate_presigned_url(
+            "put_object",
+            Params={
+                "Bucket": UPLOAD_CONFIG["bucket"],
+                "Key": s3_location.lstrip("/"),
+                "ContentType": "application/zip",
+                "IfNoneMatch": "*",
+            },
+            ExpiresIn=expires_in,
+        )
+    except Exception as e:
+        logger.error("Could not presign upload for %s: %s", composite_key, e)
+        return error_response(500, "Internal Server Error", "Processing error", "internal_error")
+
+    body = {
+        "url": url,
+        "method": "PUT",
+        "headers": {"Content-Type": "application/zip", "If-None-Match": "*"},
+        "expires_in": expires_in,
+    }
+    return {
+        "status": "200",
+        "statusDescription": "OK",
+        "body": json.dumps(body),
+        "bodyEncoding": "text",
+        "headers": {
+            "cache-control": [{"key": "Cache-Control", "value": "no-store"}],
+            "content-type": [{"key": "Content-Type", "value": "application/json"}]
+        }
+    }
+
+
 def _handle_viewer_request(req):
     logger.info("Lambda@Edge invoked: method=%s uri=%s", req.get("method"), req.get("uri"))
 
-    if req.get("method") != "PUT":
-        return error_response(403, "Forbidden", "Only PUT is allowed", "method_not_allowed")
+    qs = req.get("querystring", "")
+    action, upload_id, part_number = _parse_multipart_params(qs)
+    if action not in UPLOAD_ACTION_METHODS or (action == "presign" and not UPLOAD_CONFIG.get("bucket")):
+        return error_response(400, "Bad Request", "Unknown upload action", "invalid_action")
+    expected_method = UPLOAD_ACTION_METHODS[action]
+    if req.get("method") != expected_method:
+        return error_response(403, "Forbidden", f"Only {expected_method} is allowed", "method_not_allowed")
 
-    mno_id, broadcast_id = _parse_params(req.get("querystring", ""))
+    origin_qs, err = _origin_querystring(action, upload_id, part_number)
+    if err:
+        return err
+
+    mno_id, broadcast_id = _parse_params(qs)
     item, err = _validate_request(mno_id, broadcast_id)
     if err:
         return err
@@ -134,14 +320,18 @@ def _handle_viewer_request(req):
         logger.error("No S3Location in tracking record for %s#%s", mno_id, broadcast_id)
         return error_response(500, "Internal Server Error", "Missing upload destination", "internal_error")
 
+    if action == "presign":
+        logger.info("Issuing presigned upload: mno=%s broadcast_id=%s", mno_id, broadcast_id)
+        return _issue_presigned_upload(f"{mno_id}#{broadcast_id}", s3_location)
+
     req["uri"] = s3_location
-    req["querystring"] = ""
+    req["querystring"] = origin_qs
     req.setdefault("headers", {})[MNO_ID_HEADER_NAME] = [
         {"key": "X-Upload-Token", "value": mno_id}
     ]
     logger.info(
-        "Upload validated, forwarding to origin: uri=%s (mno=%s, broadcast_id=%s)",
-        req["uri"], mno_id, broadcast_id
+        "Upload validated, forwarding to origin: uri=%s action=%s (mno=%s, broadcast_id=%s)",
+        req["uri"], action or "put", mno_id, broadcast_id
     )
     return req
 
@@ -167,15 +357,44 @@ def _handle_origin_response(request, response):
         )
         return response
 
+    if not _is_single_put(request):
+        logger.info(
+            "Multipart step accepted (status=%s) for mno=%s broadcast_id=%s; link left for the object-created event",
+            status, mno_id, broadcast_id
+        )
+        return response
+
     err = _mark_used(composite_key)
     if err:
         logger.error("Failed to mark upload link used after successful write for %s", composite_key)
     else:
         logger.info("Upload confirmed, link marked used: mno=%s broadcast_id=%s", mno_id, broadcast_id)
+    if not err or _is_cacheable_rejection(err):
+        _remember_rejection(
+            composite_key, error_response(403, "Forbidden", "This link has already been used", "already_used")
+        )
     return response
 
 
+def _response_outcome(response: dict) -> str:
+    """
+    Metrics outcome: "forwarded" for a rewritten viewer request, the error type for a
+    generated response, and the origin's status code at origin-response.
+    """
+    if "status" not in response:
+        return "forwarded"
+    return response.get("headers", {}).get("x-error-type", [{}])[0].get("value") or response["status"]
+
+
 def lambda_handler(event, context):
+    event_type = event["Records"][0]["cf"]["config"]["eventType"]
+    with metrics.timed(event_type) as result:
+        response = _dispatch(event)
+        result["outcome"] = _response_outcome(response)
+    return response
+
+
+def _dispatch(event):
     cf = event["Records"][0]["cf"]
     event_type = cf["config"]["eventType"]
 
@@ -26,16 +26,30 @@ resource "aws_iam_role_policy" "edge_policy" {
 
   policy = jsonencode({
     Version = "2012-10-17",
-    Statement = [
+    Statement = concat([
       {
         Effect = "Allow",
         Action = [
           "dynamodb:GetItem",
           "dynamodb:UpdateItem"
         ],
-        Resource = aws_dynamodb_table.log_upload_tracking.arn
+        Resource = concat(
+          [aws_dynamodb_table.log_upload_tracking.arn],
+          [
+            for region in var.dynamodb_replica_regions :
+            "arn:aws:dynamodb:${region}:${data.aws_caller_identity.current.account_id}:table/${aws_dynamodb_table.log_upload_tracking.name}"
+          ]
+        )
       }
-    ]
+      ],
+      # Presigned uploads are signed with this role's credentials.
+      [
+        for bucket in compact([var.upload_bucket_name]) : {
+          Effect   = "Allow",
+          Action   = ["s3:PutObject"],
+          Resource = "arn:aws:s3:::${bucket}/received/logs/*"
+        }
+    ])
   })
 }
 
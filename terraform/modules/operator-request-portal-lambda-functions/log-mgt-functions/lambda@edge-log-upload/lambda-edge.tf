@@ -3,7 +3,62 @@ data "aws_caller_identity" "current" {}
 data "archive_file" "log_upload_edge_zip" {
   type        = "zip"
   output_path = format("%s/.terraform-assets/lambda_zip_file_log_upload_edge.zip", path.root)
-  source_file = format("%s/files/edge-log-upload.py", path.module)
+
+  source {
+    content  = file(format("%s/files/edge-log-upload.py", path.module))
+    filename = "edge-log-upload.py"
+  }
+
+  source {
+    content  = file(format("%s/../../common/files/aws_clients.py", path.module))
+    filename = "aws_clients.py"
+  }
+
+  source {
+    content  = file(format("%s/../../common/files/metrics.py", path.module))
+    filename = "metrics.py"
+  }
+
+  source {
+    content  = file(format("%s/../../common/files/ddb_routing.py", path.module))
+    filename = "ddb_routing.py"
+  }
+
+  source {
+    content  = file(format("%s/../../common/files/ddb_lite.py", path.module))
+    filename = "ddb_lite.py"
+  }
+
+  source {
+    content  = file(format("%s/../../common/files/ttl_cache.py", path.module))
+    filename = "ttl_cache.py"
+  }
+
+  source {
+    content = jsonencode({
+      home_region                = var.dynamodb_region
+      replica_regions            = var.dynamodb_replica_regions
+      routes                     = var.dynamodb_replica_routes
+      strongly_consistent_writes = var.dynamodb_strongly_consistent_writes
+      client                     = var.dynamodb_client
+    })
+    filename = "dynamodb_routing.json"
+  }
+
+  # Lambda@Edge has no environment variables, so the client mode is embedded.
+  source {
+    content  = jsonencode({ lazy_init = var.lazy_init })
+    filename = "aws_clients.json"
+  }
+
+  source {
+    content = jsonencode({
+      bucket                 = var.upload_bucket_name
+      region                 = var.upload_bucket_region
+      presign_expiry_seconds = var.presigned_upload_expiry_seconds
+    })
+    filename = "upload_config.json"
+  }
 }
 
 resource "aws_lambda_function" "log_upload_edge" {
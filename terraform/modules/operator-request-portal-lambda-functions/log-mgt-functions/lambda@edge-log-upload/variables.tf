@@ -15,3 +15,56 @@ variable "cloudfront_distribution_id" {
   description = "The ID of the CloudFront distribution that will invoke this Lambda@Edge"
   type        = string
 }
+
+variable "dynamodb_replica_regions" {
+  description = "Regions holding global-table replicas of the tracking table; edges read from the nearest one"
+  type        = list(string)
+  default     = []
+}
+
+variable "dynamodb_replica_routes" {
+  description = "Executing edge region => nearest replica region, for edge regions that have no replica of their own"
+  type        = map(string)
+  default     = {}
+}
+
+variable "dynamodb_strongly_consistent_writes" {
+  description = "Set when the replicas use multi-region strong consistency, so conditional updates can also go to the nearest replica"
+  type        = bool
+  default     = false
+}
+
+variable "upload_bucket_name" {
+  description = "Bucket that uploaded logs land in; setting it enables presigned uploads (?action=presign)"
+  type        = string
+  default     = ""
+}
+
+variable "upload_bucket_region" {
+  description = "Region of upload_bucket_name, used to sign presigned upload URLs"
+  type        = string
+  default     = "eu-west-2"
+}
+
+variable "presigned_upload_expiry_seconds" {
+  description = "Lifetime of a presigned upload URL"
+  type        = number
+  default     = 900
+}
+
+variable "dynamodb_client" {
+  description = "DynamoDB client the edge function uses (embedded in dynamodb_routing.json): boto3, or the dependency-free ddb_lite client"
+  type        = string
+  default     = "boto3"
+
+  validation {
+    condition     = contains(["boto3", "lite"], var.dynamodb_client)
+    error_message = "dynamodb_client must be \"boto3\" or \"lite\"."
+  }
+}
+
+variable "lazy_init" {
+  description = "Build AWS clients (and import boto3) on first use rather than at cold start (embedded as aws_clients.json)"
+  type        = bool
+  default     = false
+}
@@ -1,17 +1,47 @@
 import json
-import boto3
 import logging
 import os
-from notifications_python_client.notifications import NotificationsAPIClient
+import time
+
+import metrics
+from aws_clients import LAZY_INIT, get_client
 
 # Configure logging
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
 
-# Initialize SSM client
-ssm = boto3.client('ssm')
+# Initialize SSM client (built on first use in lazy-init mode)
+ssm = get_client("ssm")
+
+# Bound by _load_notify_api: at import time, or on first use in lazy-init mode, since
+# notifications_python_client brings in requests and PyJWT.
+APIError = NotificationsAPIClient = None
+
+
+def _load_notify_api():
+    global APIError, NotificationsAPIClient
+    if NotificationsAPIClient is None:
+        from notifications_python_client.errors import APIError
+        from notifications_python_client.notifications import NotificationsAPIClient
+
+
+if not LAZY_INIT:
+    _load_notify_api()
 
 NOTIFY_PARAM_NAME = os.environ.get("NOTIFY_API_KEY_PARAM")
+NOTIFY_API_KEY_TTL_SECONDS = int(os.environ.get("NOTIFY_API_KEY_TTL_SECONDS", "300"))
+# Notify answers 403 when the API key has been revoked or rotated.
+NOTIFY_AUTH_ERROR_STATUS = 403
+# Per-request timeout for Notify API calls (the client library's default is 30 seconds).
+NOTIFY_REQUEST_TIMEOUT_SECONDS = float(os.environ.get("NOTIFY_REQUEST_TIMEOUT_SECONDS", "5"))
+# A batch recipient is only started with time left for the sent-check, the send and its
+# retry with a refreshed key; the rest are deferred to Lambda's asynchronous retry.
+RECIPIENT_TIME_RESERVE_MS = 3 * NOTIFY_REQUEST_TIMEOUT_SECONDS * 1000 + 1000
+# Notify statuses after which a recipient has not been emailed and can be sent to again.
+NOTIFY_FAILED_STATUSES = ("permanent-failure", "temporary-failure", "technical-failure")
+
+# Reused by warm invocations until the TTL lapses or Notify rejects the key.
+_notify_client_cache = {"api_key": None, "client": None, "loaded_at": 0.0}
 
 
 def get_notify_api_key():
@@ -27,6 +57,147 @@ def get_notify_api_key():
         raise
 
 
+def get_notify_client(force_refresh: bool = False):
+    """
+    Return the cached Notify client, re-reading the API key from Parameter Store once
+    NOTIFY_API_KEY_TTL_SECONDS have passed (or when forced). A new client is only built
+    when the key value has actually changed.
+    """
+    now = time.monotonic()
+    cache = _notify_client_cache
+    if force_refresh or cache["client"] is None or now - cache["loaded_at"] >= NOTIFY_API_KEY_TTL_SECONDS:
+        api_key = get_notify_api_key()
+        if api_key != cache["api_key"] or cache["client"] is None:
+            _load_notify_api()
+            cache["client"] = NotificationsAPIClient(api_key, timeout=NOTIFY_REQUEST_TIMEOUT_SECONDS)
+            cache["api_key"] = api_key
+        cache["loaded_at"] = now
+    return cache["client"]
+
+
+def _send_notify_email(notify_client, email_address, template_id, personalisation, reference=None):
+    with metrics.timed("notify.SendEmail") as result:
+        try:
+            return notify_client.send_email_notification(
+                email_address=email_address,
+                template_id=template_id,
+                personalisation=personalisation,
+                reference=reference
+            )
+        except APIError as e:
+            result["outcome"] = f"http_{e.status_code}"
+            raise
+
+
+def _send_email(email_address, template_id, personalisation, reference=None):
+    """Send one email, refreshing the API key and retrying once if Notify rejects it."""
+    notify_client = get_notify_client()
+    try:
+        return _send_notify_email(notify_client, email_address, template_id, personalisation, reference)
+    except APIError as e:
+        if e.status_code != NOTIFY_AUTH_ERROR_STATUS:
+            raise
+        refreshed_client = get_notify_client(force_refresh=True)
+        if refreshed_client is notify_client:
+            raise
+        logger.warning("Notify rejected the cached API key, retrying with the refreshed key")
+        return _send_notify_email(refreshed_client, email_address, template_id, personalisation, reference)
+
+
+class BatchDeferred(Exception):
+    """Raised so Lambda retries a batch the invocation did not have time to finish."""
+
+
+def _mask_email(email: str) -> str:
+    local, _, domain = str(email).partition("@")
+    if not domain:
+        return "***"
+    masked_local = f"{local[0]}***" if local else "***"
+    return f"{masked_local}@{domain}"
+
+
+def _previous_notification(reference):
+    """
+    The notification an earlier attempt at this invocation already sent under reference,
+    if any. A lookup failure is logged and treated as none, so the email is still sent.
+    """
+    try:
+        notifications = get_notify_client().get_all_notifications(reference=reference)["notifications"]
+    except Exception as e:
+        logger.warning(f"Could not check Notify for reference {reference}: {str(e)}")
+        return None
+    return next((n for n in notifications if n.get("status") not in NOTIFY_FAILED_STATUSES), None)
+
+
+def _send_recipient(recipient, template_id, shared, reference):
+    email = recipient.get("email_address") if isinstance(recipient, dict) else None
+    if not email:
+        return {"status": "invalid", "error": "Missing email_address"}
+    previous = _previous_notification(reference) if reference else None
+    if previous:
+        logger.info(f"Notification to {_mask_email(email)} already sent. ID: {previous.get('id')}")
+        return {"status": "sent", "notification_id": previous.get("id")}
+    try:
+        response = _send_email(
+            email, template_id, {**shared, **(recipient.get("personalisation") or {})}, reference
+        )
+        logger.info(f"Notification sent to {_mask_email(email)}. ID: {response.get('id')}")
+        return {"status": "sent", "notification_id": response.get("id")}
+    except Exception as e:
+        logger.error(f"Error sending Notify email to {_mask_email(email)}: {str(e)}")
+        return {"status": "failed", "error": str(e)}
+
+
+def _send_batch(event, context=None):
+    """
+    Send one email per entry in event["recipients"], merging each recipient's own
+    personalisation over the shared event["personalisation"]. A failure for one
+    recipient does not stop the rest; the outcome of each is reported in order.
+
+    Each email carries a Notify reference made from the invocation's request ID, which
+    an asynchronous retry keeps, and the recipient's position; a recipient whose
+    reference Notify already holds is not emailed again. Recipients that the remaining
+    invocation time cannot cover are reported as "deferred".
+    """
+    shared = event.get("personalisation") or {}
+    reference_prefix = getattr(context, "aws_request_id", None)
+    results = []
+    for index, recipient in enumerate(event["recipients"]):
+        if context is not None and context.get_remaining_time_in_millis() < RECIPIENT_TIME_RESERVE_MS:
+            results.append({"status": "deferred"})
+            continue
+        reference = f"{reference_prefix}-{index}" if reference_prefix else None
+        results.append(_send_recipient(recipient, event["template_id"], shared, reference))
+    return results
+
+
+def _batch_response(results):
+    sent = sum(1 for result in results if result["status"] == "sent")
+    if sent == len(results):
+        status_code = 200
+    elif sent:
+        status_code = 207
+    else:
+        status_code = 500
+    return {
+        "statusCode": status_code,
+        "body": json.dumps({
+            "message": f"Sent {sent} of {len(results)} Notify emails.",
+            "results": results
+        })
+    }
+
+
+def _handle_batch(event, context):
+    if not isinstance(event["recipients"], list):
+        raise ValueError("recipients must be a list")
+    results = _send_batch(event, context)
+    deferred = sum(1 for result in results if result["status"] == "deferred")
+    if deferred:
+        raise BatchDeferred(f"{deferred} of {len(results)} recipient(s) deferred to the retry")
+    return _batch_response(results)
+
+
 def lambda_handler(event, context):
     """
     This is a 'middleman' function for sending emails via GOV.UK Notify.
@@ -38,13 +209,30 @@ def lambda_handler(event, context):
             --- personalisation key/values ---
         }
     }
+    or, to send one template to several recipients in a single invocation:
+    {
+        "template_id": "template-id-guid",
+        "personalisation": {
+            --- personalisation shared by every recipient ---
+        },
+        "recipients": [
+            {"email_address": "mno@example.com", "personalisation": {--- optional overrides ---}}
+        ]
+    }
     It acts as a 'middleman' by forwarding this payload to Notify and returning a response.
+    A batch response reports a status for each recipient, in the order given. If the
+    invocation runs short of time, the batch raises once the recipients it could reach
+    are sent, so Lambda's asynchronous retry sends the rest.
     """
     logger.info(f"Received notify request for template_id={event.get('template_id')}")
 
     try:
         # Validate required fields
-        required_fields = ["email_address", "template_id", "personalisation"]
+        is_batch = "recipients" in event
+        if is_batch:
+            required_fields = ["recipients", "template_id"]
+        else:
+            required_fields = ["email_address", "template_id", "personalisation"]
         missing_fields = [field for field in required_fields if field not in event]
 
         if missing_fields:
@@ -54,16 +242,11 @@ def lambda_handler(event, context):
                 "statusCode": 400,
                 "body": json.dumps({"error": error_message})
             }
-
-        # Initialize the Notify client for each invocation
-        notify_client = NotificationsAPIClient(get_notify_api_key())
+        if is_batch:
+            return _handle_batch(event, context)
 
         # Send the notification
-        response = notify_client.send_email_notification(
-            email_address=event["email_address"],
-            template_id=event["template_id"],
-            personalisation=event["personalisation"]
-        )
+        response = _send_email(event["email_address"], event["template_id"], event["personalisation"])
 
         logger.info(f"Notification sent successfully. ID: {response.get('id')}")
 
@@ -75,6 +258,8 @@ def lambda_handler(event, context):
             })
         }
 
+    except BatchDeferred:
+        raise
     except ValueError as e:
         # Handle JSON parsing errors or validation errors
         logger.error(f"Validation error: {str(e)}")
@@ -1,7 +1,21 @@
 data "archive_file" "notify_service_zip" {
   type        = "zip"
-  source_file = format("%s/files/notify-service-lambda.py", path.module)
   output_path = format("%s/.terraform-assets/notify_email.zip", path.root)
+
+  source {
+    content  = file(format("%s/files/notify-service-lambda.py", path.module))
+    filename = "notify-service-lambda.py"
+  }
+
+  source {
+    content  = file(format("%s/../common/files/aws_clients.py", path.module))
+    filename = "aws_clients.py"
+  }
+
+  source {
+    content  = file(format("%s/../common/files/metrics.py", path.module))
+    filename = "metrics.py"
+  }
 }
 
 resource "aws_lambda_function" "notify_service_lambda" {
@@ -12,14 +26,17 @@ resource "aws_lambda_function" "notify_service_lambda" {
 
   filename         = data.archive_file.notify_service_zip.output_path
   source_code_hash = data.archive_file.notify_service_zip.output_base64sha256
-  timeout          = 30
+  timeout          = var.lambda_timeout_seconds
   memory_size      = 128
   layers           = [aws_lambda_layer_version.notify_layer.arn]
 
   environment {
     variables = {
-      LOG_LEVEL            = "INFO"
-      NOTIFY_API_KEY_PARAM = var.notify_api_key_parameter
+      LOG_LEVEL                      = "INFO"
+      NOTIFY_API_KEY_PARAM           = var.notify_api_key_parameter
+      NOTIFY_API_KEY_TTL_SECONDS     = var.notify_api_key_ttl_seconds
+      NOTIFY_REQUEST_TIMEOUT_SECONDS = var.notify_request_timeout_seconds
+      AWS_CLIENTS_LAZY_INIT          = tostring(var.lazy_init)
     }
   }
 
@@ -3,7 +3,31 @@ variable "notify_api_key_parameter" {
   type        = string
 }
 
+variable "notify_api_key_ttl_seconds" {
+  description = "How long a warm Notify lambda reuses the API key before re-reading it from SSM"
+  type        = number
+  default     = 300
+}
+
+variable "notify_request_timeout_seconds" {
+  description = "Timeout for each request the Notify lambda makes to the Notify API"
+  type        = number
+  default     = 5
+}
+
+variable "lambda_timeout_seconds" {
+  description = "Notify lambda timeout: one invocation sends a whole batch of recipients, each costing up to a sent-check, a send and a retried send at notify_request_timeout_seconds"
+  type        = number
+  default     = 120
+}
+
 variable "environment" {
   description = "Environment (e.g. dev, staging, prod)."
   type        = string
 }
+
+variable "lazy_init" {
+  description = "Build AWS clients (and import boto3) on first use rather than at cold start (AWS_CLIENTS_LAZY_INIT)"
+  type        = bool
+  default     = false
+}
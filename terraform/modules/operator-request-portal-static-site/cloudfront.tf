@@ -19,11 +19,26 @@ resource "aws_cloudfront_origin_request_policy" "upload_token_header" {
     }
   }
 
+  # Rewritten by the log-upload Lambda@Edge for S3 multipart uploads.
   query_strings_config {
-    query_string_behavior = "none"
+    query_string_behavior = "whitelist"
+    query_strings {
+      items = ["uploads", "uploadId", "partNumber"]
+    }
   }
 }
 
+resource "aws_cloudfront_function" "asset_encoding" {
+  name    = format("%s-asset-encoding", local.bucket_name)
+  runtime = "cloudfront-js-2.0"
+  comment = "Serve the precompressed copy of an asset to viewers that accept it"
+  publish = true
+  code = templatefile("${path.module}/files/templates/asset-encoding.js.tpl", {
+    encodings  = local.site_manifest.encodings
+    extensions = local.site_manifest.compressible_extensions
+  })
+}
+
 resource "aws_cloudfront_distribution" "cdn" {
   enabled             = true
   comment             = format("CloudFront distribution for %s", local.bucket_name)
@@ -164,6 +179,25 @@ resource "aws_cloudfront_distribution" "cdn" {
     }
   }
 
+  # Behavior for fingerprinted assets: cached for as long as their Cache-Control allows
+  # (a year), with the Brotli or gzip copy served to viewers that accept it.
+  ordered_cache_behavior {
+    path_pattern           = "assets/*"
+    target_origin_id       = "S3-Endpoint"
+    viewer_protocol_policy = "https-only"
+
+    allowed_methods = ["GET", "HEAD"]
+    cached_methods  = ["GET", "HEAD"]
+
+    compress        = true
+    cache_policy_id = data.aws_cloudfront_cache_policy.caching_optimized.id
+
+    function_association {
+      event_type   = "viewer-request"
+      function_arn = aws_cloudfront_function.asset_encoding.arn
+    }
+  }
+
   # Behavior for *.html: using S3-Endpoint with caching enabled.
   ordered_cache_behavior {
     path_pattern           = "*.html"
@@ -38,7 +38,8 @@ data "aws_iam_policy_document" "static_site_policy_doc" {
       identifiers = ["cloudfront.amazonaws.com"]
     }
     actions = [
-      "s3:PutObject"
+      "s3:PutObject",
+      "s3:AbortMultipartUpload"
     ]
     resources = [
       format("arn:aws:s3:::%s/received/*", aws_s3_bucket.static_site.bucket)
@@ -0,0 +1,307 @@
+"""
+Build the operator portal's static site into dist/ for upload to S3.
+
+Runs after gulp has built assets/ (see null_resource.build_assets). It:
+
+- renders every page in templates/pages.json from page.html.tpl and footer.html.tpl,
+  filling the same ${...} placeholders Terraform's templatefile did;
+- renames every file under assets/ to include a hash of its content (e.g.
+  assets/stylesheets/all.3f2a1b9c0d.css) and rewrites the references to it in the
+  stylesheets and pages, so browsers and CloudFront can cache it for a year without
+  revalidating: a changed file is a new URL;
+- inlines into each page the stylesheet rules that can apply to it (its critical CSS)
+  and loads the full stylesheet without blocking rendering, provided the page still
+  fits in the first round trip of a new connection (INITIAL_WINDOW_BYTES compressed);
+- writes Brotli (if the brotli package is installed) and gzip copies of each
+  compressible asset, which the asset-encoding CloudFront Function serves to viewers
+  that accept them;
+- writes dist/manifest.json, from which Terraform uploads every object with its
+  content type, Cache-Control and Content-Encoding.
+
+Pages keep their URLs, so they are served with Cache-Control: no-cache and revalidated
+on every load; everything they reference is immutable.
+
+Usage: python build_site.py [--site-dir DIR] [--output DIR]
+"""
+
+import argparse
+import gzip
+import hashlib
+import json
+import posixpath
+import re
+import shutil
+import string
+from datetime import datetime, timezone
+from pathlib import Path
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+SITE_DIR = Path(__file__).resolve().parent
+
+PAGE_CACHE_CONTROL = "no-cache"
+ASSET_CACHE_CONTROL = "public, max-age=31536000, immutable"
+HASH_LENGTH = 10
+# Roughly what a new TCP connection can deliver in its first round trip (an initial
+# congestion window of 10 segments).
+INITIAL_WINDOW_BYTES = 14 * 1024
+
+CONTENT_TYPES = {
+    ".css": "text/css",
+    ".js": "application/javascript",
+    ".json": "application/json",
+    ".svg": "image/svg+xml",
+    ".png": "image/png",
+    ".jpg": "image/jpeg",
+    ".jpeg": "image/jpeg",
+    ".gif": "image/gif",
+    ".ico": "image/x-icon",
+    ".woff": "font/woff",
+    ".woff2": "font/woff2",
+    ".ttf": "font/ttf",
+    ".eot": "application/vnd.ms-fontobject",
+}
+# Text-like types worth precompressing; images and WOFF fonts are compressed already.
+COMPRESSIBLE_EXTENSIONS = (".css", ".js", ".json", ".svg", ".ico", ".ttf", ".eot")
+ENCODING_SUFFIXES = {"br": ".br", "gzip": ".gz"}
+
+PAGE_REFERENCE_RE = re.compile(r'(?P<attr>(?:href|src)=")(?P<url>/?assets/[^"#?]+)')
+CSS_URL_RE = re.compile(r"url\(\s*(?P<quote>['\"]?)(?P<url>[^'\")]+?)(?P<suffix>[?#][^'\")]*)?(?P=quote)\s*\)")
+STYLESHEET_LINK_RE = re.compile(r'<link rel="stylesheet" href="(?P<href>[^"]+)">')
+# Anything in a page that could be a class name or id, including those set from scripts.
+PAGE_TOKEN_SPLIT_RE = re.compile(r"[\s\"'`<>=(),;{}]+")
+
+
+def content_type(path: str) -> str:
+    return CONTENT_TYPES.get(posixpath.splitext(path)[1].lower(), "application/octet-stream")
+
+
+def hashed_name(path: str, content: bytes) -> str:
+    """path with a hash of content before its extension: a/b.css -> a/b.<hash>.css."""
+    stem, extension = posixpath.splitext(path)
+    return f"{stem}.{hashlib.sha256(content).hexdigest()[:HASH_LENGTH]}{extension}"
+
+
+def render_pages(site_dir: Path, year: int) -> dict:
+    """Page name -> HTML, rendered as Terraform's templatefile rendered them."""
+    templates = site_dir / "templates"
+    page_template = string.Template((templates / "page.html.tpl").read_text(encoding="utf-8"))
+    footer = string.Template((templates / "footer.html.tpl").read_text(encoding="utf-8")).substitute(year=year)
+    pages = json.loads((templates / "pages.json").read_text(encoding="utf-8"))
+    return {
+        name: page_template.substitute(
+            title=config["title"],
+            content=(site_dir / "content" / config["content_file"]).read_text(encoding="utf-8"),
+            footer=footer,
+        )
+        for name, config in pages.items()
+    }
+
+
+def _resolve_css_url(stylesheet: str, url: str) -> str | None:
+    """The asset path a url() in stylesheet refers to, or None for data:, external or fragment URLs."""
+    if re.match(r"^(?:[a-z]+:|//|#)", url):
+        return None
+    if url.startswith("/"):
+        return url.lstrip("/")
+    return posixpath.normpath(posixpath.join(posixpath.dirname(stylesheet), url))
+
+
+def rewrite_css(stylesheet: str, css: str, asset_paths: dict) -> str:
+    """Point every url() in stylesheet at the hashed asset, by absolute path."""
+
+    def replace(match):
+        path = _resolve_css_url(stylesheet, match["url"])
+        if path not in asset_paths:
+            return match[0]
+        quote = match["quote"]
+        return f"url({quote}/{asset_paths[path]}{match['suffix'] or ''}{quote})"
+
+    return CSS_URL_RE.sub(replace, css)
+
+
+def rewrite_page(html: str, asset_paths: dict) -> str:
+    """Point every href/src into assets/ at the hashed asset, keeping the URL's form."""
+
+    def replace(match):
+        url = match["url"]
+        path = asset_paths.get(url.lstrip("/"))
+        if path is None:
+            return match[0]
+        return match["attr"] + ("/" if url.startswith("/") else "") + path
+
+    return PAGE_REFERENCE_RE.sub(replace, html)
+
+
+def fingerprint_assets(assets_dir: Path) -> dict:
+    """
+    Asset path (e.g. "assets/fonts/x.woff2") -> (hashed path, content). Stylesheets are
+    hashed last, after their url()s are rewritten to the other assets' hashed paths.
+    """
+    sources = sorted(path for path in assets_dir.rglob("*") if path.is_file())
+    paths, hashed = {}, {}
+    for source in sorted(sources, key=lambda path: path.suffix == ".css"):
+        path = f"assets/{source.relative_to(assets_dir).as_posix()}"
+        content = source.read_bytes()
+        if source.suffix == ".css":
+            content = rewrite_css(path, content.decode("utf-8"), paths).encode("utf-8")
+        paths[path] = hashed_name(path, content)
+        hashed[path] = (paths[path], content)
+    return hashed
+
+
+def _split_rules(css: str) -> list[tuple[str, str | None]]:
+    """Top-level (prelude, block body) pairs; body is None for a statement like @charset."""
+    rules, depth, start, prelude_end = [], 0, 0, 0
+    for i, char in enumerate(css):
+        if char == "{":
+            if depth == 0:
+                prelude_end = i
+            depth += 1
+        elif char == "}":
+            depth -= 1
+            if depth == 0:
+                rules.append((css[start:prelude_end].strip(), css[prelude_end + 1:i]))
+                start = i + 1
+        elif char == ";" and depth == 0:
+            rules.append((css[start:i].strip(), None))
+            start = i + 1
+    return rules
+
+
+def _selector_may_match(selector: str, tokens: set) -> bool:
+    """False only if selector needs a class or id that appears nowhere in the page."""
+    required = re.sub(r"\[[^\]]*\]", "", selector)
+    while "(" in required:
+        # Classes inside :not(...) and friends are not required to be present.
+        stripped = re.sub(r"\([^()]*\)", "", required)
+        if stripped == required:
+            break
+        required = stripped
+    names = re.findall(r"[.#]((?:[\w-]|\\.)+)", required)
+    return all(name.replace("\\", "") in tokens for name in names)
+
+
+def _critical_rule(prelude: str, body: str | None, tokens: set) -> str:
+    if body is None or prelude.startswith(("@keyframes", "@-webkit-keyframes", "@page")):
+        return ""
+    if prelude.startswith("@font-face"):
+        return f"{prelude}{{{body}}}"
+    if prelude.startswith(("@media", "@supports")):
+        inner = critical_css(body, tokens)
+        return f"{prelude}{{{inner}}}" if inner else ""
+    selectors = [s.strip() for s in re.split(r",(?![^()]*\))", prelude)]
+    kept = [s for s in selectors if _selector_may_match(s, tokens)]
+    return f"{','.join(kept)}{{{body}}}" if kept else ""
+
+
+def critical_css(css: str, tokens: set) -> str:
+    """The rules of css whose selectors could match a page containing tokens, minified."""
+    css = re.sub(r"/\*.*?\*/", "", css, flags=re.S)
+    critical = "".join(_critical_rule(prelude, body, tokens) for prelude, body in _split_rules(css))
+    return re.sub(r"\s*([{};])\s*", r"\1", re.sub(r"\s+", " ", critical)).strip()
+
+
+def inline_critical_css(html: str, stylesheets: dict) -> str:
+    """
+    Inline the critical CSS of the page's first stylesheet (found in stylesheets by URL)
+    and preload the stylesheet itself, if the page then fits in INITIAL_WINDOW_BYTES.
+    """
+    link = STYLESHEET_LINK_RE.search(html)
+    if link is None or link["href"].lstrip("/") not in stylesheets:
+        return html
+    tokens = set(PAGE_TOKEN_SPLIT_RE.split(html))
+    critical = critical_css(stylesheets[link["href"].lstrip("/")], tokens)
+    href = link["href"]
+    inlined = html.replace(link[0], (
+        f"<style>{critical}</style>\n"
+        f'    <link rel="preload" href="{href}" as="style" onload="this.onload=null;this.rel=\'stylesheet\'">\n'
+        f'    <noscript><link rel="stylesheet" href="{href}"></noscript>'
+    ), 1)
+    if len(gzip.compress(inlined.encode("utf-8"))) > INITIAL_WINDOW_BYTES:
+        return html
+    return inlined
+
+
+def encodings() -> list[str]:
+    """Precompressed encodings this build writes, in order of preference."""
+    return (["br"] if brotli else []) + ["gzip"]
+
+
+def _compress(content: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(content, quality=11)
+    # mtime=0 keeps the output, and so its upload, identical between builds.
+    return gzip.compress(content, compresslevel=9, mtime=0)
+
+
+def _write(output: Path, key: str, content: bytes):
+    path = output / key
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(content)
+
+
+def _write_asset(output: Path, key: str, content: bytes) -> dict:
+    """Write an asset and its precompressed copies; returns their manifest entries."""
+    _write(output, key, content)
+    objects = {key: {
+        "source": key, "content_type": content_type(key), "cache_control": ASSET_CACHE_CONTROL, "content_encoding": None
+    }}
+    if posixpath.splitext(key)[1] in COMPRESSIBLE_EXTENSIONS:
+        for encoding in encodings():
+            variant = key + ENCODING_SUFFIXES[encoding]
+            _write(output, variant, _compress(content, encoding))
+            objects[variant] = {**objects[key], "source": variant, "content_encoding": encoding}
+    return objects
+
+
+def build(site_dir: Path, output: Path, year: int = None) -> dict:
+    """Build the site from site_dir into output and return the manifest (also written there)."""
+    if output.exists():
+        shutil.rmtree(output)
+    output.mkdir(parents=True)
+    assets_dir = site_dir / "assets"
+    hashed = fingerprint_assets(assets_dir) if assets_dir.is_dir() else {}
+    asset_paths = {path: hashed_path for path, (hashed_path, _) in hashed.items()}
+    stylesheets = {
+        hashed_path: content.decode("utf-8") for hashed_path, content in hashed.values() if hashed_path.endswith(".css")
+    }
+
+    objects, pages = {}, {}
+    for hashed_path, content in hashed.values():
+        objects.update(_write_asset(output, hashed_path, content))
+    for name, html in render_pages(site_dir, year or datetime.now(timezone.utc).year).items():
+        _write(output, name, inline_critical_css(rewrite_page(html, asset_paths), stylesheets).encode("utf-8"))
+        pages[name] = {"source": name, "content_type": "text/html", "cache_control": PAGE_CACHE_CONTROL}
+
+    manifest = {
+        "encodings": encodings(),
+        "compressible_extensions": list(COMPRESSIBLE_EXTENSIONS),
+        "asset_paths": asset_paths,
+        "pages": pages,
+        "assets": objects,
+    }
+    (output / "manifest.json").write_text(json.dumps(manifest, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+    return manifest
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the static site into a directory for upload to S3.")
+    parser.add_argument("--site-dir", type=Path, default=SITE_DIR, help="directory holding content/, templates/ "
+                        "and the gulp-built assets/")
+    parser.add_argument("--output", type=Path, help="build directory (default: <site-dir>/dist)")
+    args = parser.parse_args()
+
+    output = args.output or args.site_dir / "dist"
+    manifest = build(args.site_dir, output)
+    print(
+        f"Built {len(manifest['pages'])} pages and {len(manifest['asset_paths'])} assets into {output} "
+        f"(precompressed: {', '.join(manifest['encodings'])})"
+    )
+
+
+if __name__ == "__main__":
+    main()
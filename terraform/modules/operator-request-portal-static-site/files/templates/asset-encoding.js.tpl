@@ -0,0 +1,39 @@
+// Viewer-request function for assets/*: serves the Brotli or gzip copy that
+// build_site.py wrote alongside each compressible asset (uploaded with its
+// Content-Encoding) to viewers that accept it. Rendered from the build manifest.
+var ENCODINGS = ${jsonencode(encodings)};
+var EXTENSIONS = ${jsonencode(extensions)};
+var SUFFIXES = { br: ".br", gzip: ".gz" };
+
+function acceptedEncodings(header) {
+  var accepted = {};
+  header.split(",").forEach(function (part) {
+    var params = part.trim().toLowerCase().split(";");
+    var quality = 1;
+    params.slice(1).forEach(function (param) {
+      var pair = param.trim().split("=");
+      if (pair[0] === "q") {
+        quality = parseFloat(pair[1]);
+      }
+    });
+    accepted[params[0].trim()] = quality > 0;
+  });
+  return accepted;
+}
+
+function handler(event) {
+  var request = event.request;
+  var header = request.headers["accept-encoding"];
+  var extension = request.uri.slice(request.uri.lastIndexOf("."));
+  if (!header || EXTENSIONS.indexOf(extension) === -1) {
+    return request;
+  }
+  var accepted = acceptedEncodings(header.value);
+  for (var i = 0; i < ENCODINGS.length; i++) {
+    if (accepted[ENCODINGS[i]]) {
+      request.uri += SUFFIXES[ENCODINGS[i]];
+      break;
+    }
+  }
+  return request;
+}
@@ -5,20 +5,17 @@ locals {
     year = formatdate("YYYY", timestamp())
   })
 
-  page_configs = {
-    "automate-upload.html"    = { title = "Automated Log Uploads - Operator Portal", content_file = "automate-upload.html" }
-    "download-logs.html"      = { title = "Download Logs - Operator Portal", content_file = "download-logs.html" }
-    "download-success.html"   = { title = "Download Success - Operator Portal", content_file = "download-success.html" }
-    "error.html"              = { title = "Error - Operator Portal", content_file = "error.html" }
-    "index.html"              = { title = "Welcome to the Operator Portal", content_file = "index.html" }
-    "invalid-request.html"    = { title = "Invalid Request - Operator Portal", content_file = "invalid-request.html" }
-    "link-expired.html"       = { title = "Link Expired - Operator Portal", content_file = "link-expired.html" }
-    "link-invalid.html"       = { title = "Link Invalid - Operator Portal", content_file = "link-invalid.html" }
-    "max-limit.html"          = { title = "Maximum Limit Reached - Operator Portal", content_file = "max-limit.html" }
-    "method-not-allowed.html" = { title = "Method Not Allowed - Operator Portal", content_file = "method-not-allowed.html" }
-    "upload-logs.html"        = { title = "Upload Logs - Operator Portal", content_file = "upload-logs.html" }
-    "upload-success.html"     = { title = "Upload Success - Operator Portal", content_file = "upload-success.html" }
-    "upload.html"             = { title = "Upload CSR - Operator Portal", content_file = "upload.html" }
+  page_configs = jsondecode(file("${path.module}/files/templates/pages.json"))
+
+  # Written by files/build_site.py: the rendered pages and the fingerprinted, precompressed
+  # assets to upload. It must exist before planning (the workflows' "Build Static Assets"
+  # step, or `npm run build && python3 build_site.py` in files/); without it the plan
+  # would delete every asset and point the pages at unhashed paths, so it fails instead.
+  site_manifest = jsondecode(file("${path.module}/files/dist/manifest.json"))
+
+  built_html_files_map = {
+    for key, page in local.site_manifest.pages :
+    key => file("${path.module}/files/dist/${page.source}")
   }
 
   default_html_files_map = {
@@ -30,5 +27,9 @@ locals {
     })
   }
 
-  resolved_html_files_map = length(var.html_files_map) > 0 ? var.html_files_map : local.default_html_files_map
+  resolved_html_files_map = (
+    length(var.html_files_map) > 0 ? var.html_files_map :
+    length(local.built_html_files_map) > 0 ? local.built_html_files_map :
+    local.default_html_files_map
+  )
 }
\ No newline at end of file
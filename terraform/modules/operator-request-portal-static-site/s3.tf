@@ -25,6 +25,36 @@ resource "aws_s3_bucket_public_access_block" "static_site_block" {
   restrict_public_buckets = false
 }
 
+# Presigned log uploads go from the portal page straight to the bucket.
+resource "aws_s3_bucket_cors_configuration" "static_site" {
+  bucket = aws_s3_bucket.static_site.id
+
+  cors_rule {
+    allowed_methods = ["PUT"]
+    allowed_origins = [format("https://%s", var.domain_name)]
+    allowed_headers = ["Content-Type", "If-None-Match"]
+    expose_headers  = ["ETag"]
+    max_age_seconds = 3000
+  }
+}
+
+resource "aws_s3_bucket_lifecycle_configuration" "static_site" {
+  bucket = aws_s3_bucket.static_site.id
+
+  rule {
+    id     = "abort-incomplete-log-uploads"
+    status = "Enabled"
+
+    filter {
+      prefix = "received/"
+    }
+
+    abort_incomplete_multipart_upload {
+      days_after_initiation = var.incomplete_upload_expiry_days
+    }
+  }
+}
+
 resource "aws_s3_bucket_policy" "static_site_policy" {
   bucket = aws_s3_bucket.static_site.id
   policy = data.aws_iam_policy_document.static_site_policy_doc.json
@@ -37,6 +67,10 @@ resource "aws_s3_object" "html_files" {
   content      = each.value
   content_type = "text/html"
   etag         = md5(each.value)
+
+  # Pages keep their URLs, so are revalidated on every load; what they reference is
+  # fingerprinted and immutable.
+  cache_control = "no-cache"
 }
 
 resource "null_resource" "build_assets" {
@@ -44,37 +78,30 @@ resource "null_resource" "build_assets" {
     gulpfile     = filesha1("${path.module}/files/gulpfile.js")
     package_json = filesha1("${path.module}/files/package.json")
     package_lock = fileexists("${path.module}/files/package-lock.json") ? filesha1("${path.module}/files/package-lock.json") : ""
+    build_site   = filesha1("${path.module}/files/build_site.py")
+    pages = sha1(join("", [
+      for f in sort(setunion(fileset("${path.module}/files", "content/*.html"), fileset("${path.module}/files", "templates/*"))) :
+      filesha1("${path.module}/files/${f}")
+    ]))
   }
 
   provisioner "local-exec" {
-    command = "cd ${path.module}/files && npm install && npm run build"
+    command = "cd ${path.module}/files && npm install && npm run build && python3 build_site.py"
   }
 }
 
+# Fingerprinted assets (and their Brotli/gzip copies) from the build manifest, cached
+# by browsers and CloudFront for a year.
 resource "aws_s3_object" "assets" {
-  for_each = toset(try(fileset("${path.module}/files/assets", "**/*"), []))
-
-  bucket      = aws_s3_bucket.static_site.bucket
-  key         = "assets/${each.value}"
-  source      = "${path.module}/files/assets/${each.value}"
-  source_hash = filemd5("${path.module}/files/assets/${each.value}")
-  content_type = lookup(
-    {
-      "css"   = "text/css"
-      "js"    = "application/javascript"
-      "svg"   = "image/svg+xml"
-      "png"   = "image/png"
-      "jpg"   = "image/jpeg"
-      "jpeg"  = "image/jpeg"
-      "gif"   = "image/gif"
-      "woff"  = "font/woff"
-      "woff2" = "font/woff2"
-      "ttf"   = "font/ttf"
-      "eot"   = "application/vnd.ms-fontobject"
-    },
-    element(split(".", each.value), length(split(".", each.value)) - 1),
-    "application/octet-stream"
-  )
+  for_each = local.site_manifest.assets
+
+  bucket           = aws_s3_bucket.static_site.bucket
+  key              = each.key
+  source           = "${path.module}/files/dist/${each.value.source}"
+  source_hash      = filemd5("${path.module}/files/dist/${each.value.source}")
+  content_type     = each.value.content_type
+  cache_control    = each.value.cache_control
+  content_encoding = each.value.content_encoding
 
   depends_on = [null_resource.build_assets]
 }
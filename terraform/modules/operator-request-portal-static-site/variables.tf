@@ -52,3 +52,9 @@ variable "lambda_log_download_arn" {
   type        = string
   default     = ""
 }
+
+variable "incomplete_upload_expiry_days" {
+  description = "Days after which the parts of an unfinished multipart log upload are discarded"
+  type        = number
+  default     = 3
+}
@@ -0,0 +1,114 @@
+"""
+Real boto3 clients answered by latency-injecting Stubbers, for the handler benchmarks.
+
+Handlers are imported through load_lambda_module with a StubbedAWS instance as the
+client factory, so every client they build (including the edge DynamoDB routes and the
+aws_clients registry) is a real, metrics-instrumented client whose calls still go through
+parameter validation, serialisation and the botocore event hooks. Only the HTTP round
+trip is replaced: by a sleep of ROUND_TRIP_SECONDS[service] and a canned response.
+
+Set BENCHMARK_AWS_LATENCY_SCALE=0 to measure handler CPU cost alone.
+"""
+
+import copy
+import os
+import sys
+import time
+
+import boto3
+from botocore.awsrequest import AWSResponse
+from botocore.stub import Stubber, UnStubbedResponseError
+
+from tests.unit._lambda_loader import load_lambda_module
+
+REGION = "eu-west-2"
+
+# Typical in-region round trips for the calls the handlers make.
+ROUND_TRIP_SECONDS = {"dynamodb": 0.004, "s3": 0.012, "ssm": 0.008, "lambda": 0.015}
+LATENCY_SCALE = float(os.environ.get("BENCHMARK_AWS_LATENCY_SCALE", "1"))
+
+
+class LatencyStubber(Stubber):
+    """
+    A Stubber that answers every call to an operation with the same response after a
+    fixed delay, rather than expecting a queue of calls in order.
+    """
+
+    def __init__(self, client, latency_seconds: float):
+        super().__init__(client)
+        self.latency_seconds = latency_seconds
+        self._responders = {}
+
+    def respond(self, method: str, response):
+        """
+        Answer method (e.g. "get_item") with response: a parsed response dict, validated
+        against the service model, or a callable returning one from the call's params.
+        """
+        operation_name = self.client.meta.method_to_api_mapping[method]
+        if not callable(response):
+            self._validate_operation_response(operation_name, response)
+        self._responders[operation_name] = response
+
+    def respond_error(self, method: str, code: str, http_status_code: int = 400, **fields):
+        """Answer method with a service error, e.g. ConditionalCheckFailedException."""
+        error = {"ResponseMetadata": {"HTTPStatusCode": http_status_code}, "Error": {"Code": code, "Message": code}}
+        self._responders[self.client.meta.method_to_api_mapping[method]] = {**error, **fields}
+
+    def _assert_expected_params(self, model, params, context, **kwargs):
+        # before-call only sees the serialised request, so keep the call's own params.
+        context["stubbed_params"] = params
+
+    def _get_response_handler(self, model, params, context, **kwargs):
+        responder = self._responders.get(model.name)
+        if responder is None:
+            raise UnStubbedResponseError(operation_name=model.name, reason="No response configured")
+        time.sleep(self.latency_seconds)
+        # A fresh copy per call, as botocore's response parser would build.
+        parsed = responder(context["stubbed_params"]) if callable(responder) else copy.deepcopy(responder)
+        status = parsed.get("ResponseMetadata", {}).get("HTTPStatusCode", 200)
+        return AWSResponse(None, status, {}, None), parsed
+
+
+class StubbedAWS:
+    """
+    Stand-in for boto3.client while a handler is imported: builds a real client with
+    fake credentials and activates a LatencyStubber on it.
+    """
+
+    def __init__(self, latency_scale: float = LATENCY_SCALE):
+        self.latency_scale = latency_scale
+        self.stubbers = []
+        self._session = boto3.session.Session(
+            aws_access_key_id="testing", aws_secret_access_key="testing", region_name=REGION
+        )
+
+    def __call__(self, service_name: str, region_name: str = None, config=None, **kwargs):
+        client = self._session.client(service_name, region_name=region_name, config=config)
+        stubber = LatencyStubber(client, ROUND_TRIP_SECONDS.get(service_name, 0) * self.latency_scale)
+        stubber.activate()
+        self.stubbers.append(stubber)
+        return client
+
+    def _stubbers_for(self, service_name: str) -> list[LatencyStubber]:
+        stubbers = [s for s in self.stubbers if s.client.meta.service_model.service_name == service_name]
+        assert stubbers, f"the handler built no {service_name} client"
+        return stubbers
+
+    def respond(self, service_name: str, method: str, response):
+        """Answer method on every client built for service_name (in any region)."""
+        for stubber in self._stubbers_for(service_name):
+            stubber.respond(method, response)
+
+    def respond_error(self, service_name: str, method: str, code: str, **kwargs):
+        for stubber in self._stubbers_for(service_name):
+            stubber.respond_error(method, code, **kwargs)
+
+
+def load_handler(rel_path: str, aws: StubbedAWS, env: dict = None):
+    """
+    Import the handler at rel_path with aws as boto3.client. Returns (module, its metrics
+    module), the latter for recording the per-stage latencies the handler emits.
+    """
+    module = load_lambda_module(rel_path, f"bench_{id(aws)}", env=env, client_factory=aws)
+    # The shared modules the handler imported stay registered until the next load.
+    return module, sys.modules["metrics"]
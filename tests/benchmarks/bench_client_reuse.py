@@ -0,0 +1,34 @@
+"""
+Per-invocation boto3 client cost for the log-mgt Lambdas.
+
+Run with `make benchmark`. "per_call" is what prepare_folder/send_invite used to do
+(build a client on every call); "shared" is the aws_clients registry after the first
+invocation has warmed it.
+"""
+
+import boto3
+
+from tests.unit._lambda_loader import load_shared_module
+
+REGION = "eu-west-2"
+# An invite for one MNO touches S3 once and invokes the Notify lambda once per email.
+INVITE_CLIENTS = ("s3", "lambda", "lambda")
+
+
+def test_per_call_clients(benchmark):
+    def invite():
+        for service in INVITE_CLIENTS:
+            boto3.client(service, region_name=REGION)
+
+    benchmark(invite)
+
+
+def test_shared_clients(benchmark):
+    aws_clients = load_shared_module("aws_clients")
+
+    def invite():
+        for service in INVITE_CLIENTS:
+            aws_clients.get_client(service, region_name=REGION)
+
+    invite()
+    benchmark(invite)
@@ -0,0 +1,109 @@
+"""
+Viewer-request latency of the download Lambda@Edge function on the lite DynamoDB
+client, against a local HTTP server that stands in for DynamoDB.
+
+The server delays each request by the DynamoDB round trip, and the first request on
+each new connection by two more, for the TCP and TLS 1.3 handshakes a real endpoint
+would cost. "pooled" is the default: the connection opened at init is reused by every
+invocation. "reconnecting" treats every pooled connection as idle for too long, as
+after a freeze, so each invocation pays the handshakes; the gap between the two
+dynamodb.UpdateItem p99s is what pooling saves.
+"""
+
+import json
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from tests.benchmarks._stubbed_aws import (
+    LATENCY_SCALE,
+    ROUND_TRIP_SECONDS,
+    StubbedAWS,
+    load_handler,
+)
+
+EDGE_DOWNLOAD_PATH = (
+    "terraform/modules/operator-request-portal-lambda-functions/log-mgt-functions/"
+    "lambda@edge-log-download/files/edge-log-download.py"
+)
+
+KEY_SET = {"active_kid": "2025-06", "keys": {"2025-06": b"bench-signing-key-0123456789abcd"}}
+ROUND_TRIP = ROUND_TRIP_SECONDS["dynamodb"] * LATENCY_SCALE
+RESPONSE = json.dumps({"Attributes": {"DownloadCount": {"N": "1"}}}).encode()
+
+
+class _DynamoDBEndpoint(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # The headers and body go out in separate writes, which Nagle's algorithm would
+    # hold back for a delayed ACK on a reused connection.
+    disable_nagle_algorithm = True
+
+    def setup(self):
+        super().setup()
+        time.sleep(2 * ROUND_TRIP)
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers["Content-Length"]))
+        time.sleep(ROUND_TRIP)
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-amz-json-1.0")
+        self.send_header("Content-Length", str(len(RESPONSE)))
+        self.end_headers()
+        self.wfile.write(RESPONSE)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def endpoint():
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), _DynamoDBEndpoint)
+    httpd.daemon_threads = True
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{httpd.server_port}"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+@pytest.fixture
+def edge_download(endpoint):
+    # The lite client reads the session's fake credentials from the environment.
+    module, metrics = load_handler(EDGE_DOWNLOAD_PATH, StubbedAWS(), env={
+        "AWS_REGION": "eu-west-2",
+        "DYNAMODB_CLIENT": "lite",
+        "DYNAMODB_ENDPOINT_URL": endpoint,
+    })
+    module.SIGNING_KEYS = KEY_SET
+    yield module, metrics
+    module.ddb.close()
+
+
+def _event(module) -> dict:
+    expiry = (datetime.now(timezone.utc) + timedelta(days=1)).strftime("%Y%m%d%H%M")
+    params = {"alert": "alert-1", "mno": "MNO1", "expiry": expiry, "reference": "alert-1-abc123"}
+    token = module.download_tokens.build_signed_token(params, KEY_SET)
+    return {"Records": [{"cf": {"request": {"method": "GET", "querystring": f"data={token}"}}}]}
+
+
+def test_pooled(profile_handler, edge_download):
+    module, metrics = edge_download
+    event = _event(module)
+
+    response = profile_handler(metrics, lambda: module.lambda_handler(event, None))
+
+    assert response["uri"].startswith("/received/logs/alert-1/")
+    assert module.ddb.reuse_ratio() > 0.99
+
+
+def test_reconnecting(profile_handler, edge_download):
+    module, metrics = edge_download
+    module.ddb.max_idle_seconds = 0
+    event = _event(module)
+
+    response = profile_handler(metrics, lambda: module.lambda_handler(event, None))
+
+    assert response["uri"].startswith("/received/logs/alert-1/")
+    assert module.ddb.reuse_ratio() == 0.0
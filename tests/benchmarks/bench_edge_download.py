@@ -0,0 +1,75 @@
+"""
+Viewer-request latency of the download Lambda@Edge function, with DynamoDB stubbed.
+
+"signed" verifies the token's signature locally and makes the single conditional
+update; "unsigned" matches the token inside that update's condition; "replayed" is a
+used link answered from the negative cache after its first rejection.
+"""
+
+import base64
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from tests.benchmarks._stubbed_aws import StubbedAWS, load_handler
+
+EDGE_DOWNLOAD_PATH = (
+    "terraform/modules/operator-request-portal-lambda-functions/log-mgt-functions/"
+    "lambda@edge-log-download/files/edge-log-download.py"
+)
+
+KEY_SET = {"active_kid": "2025-06", "keys": {"2025-06": b"bench-signing-key-0123456789abcd"}}
+
+
+def _params() -> dict:
+    expiry = (datetime.now(timezone.utc) + timedelta(days=1)).strftime("%Y%m%d%H%M")
+    return {"alert": "alert-1", "mno": "MNO1", "expiry": expiry, "reference": "alert-1-abc123"}
+
+
+def _unsigned_token() -> str:
+    return base64.urlsafe_b64encode("&".join(f"{k}={v}" for k, v in _params().items()).encode()).decode()
+
+
+def _event(token: str) -> dict:
+    return {"Records": [{"cf": {"request": {"method": "GET", "querystring": f"data={token}"}}}]}
+
+
+@pytest.fixture
+def edge_download():
+    aws = StubbedAWS()
+    module, metrics = load_handler(EDGE_DOWNLOAD_PATH, aws, env={"AWS_REGION": "eu-west-2"})
+    module.SIGNING_KEYS = KEY_SET
+    return aws, module, metrics
+
+
+def test_signed_token(profile_handler, edge_download):
+    aws, module, metrics = edge_download
+    aws.respond("dynamodb", "update_item", {"Attributes": {"DownloadCount": {"N": "1"}}})
+    token = module.download_tokens.build_signed_token(_params(), KEY_SET)
+
+    response = profile_handler(metrics, lambda: module.lambda_handler(_event(token), None))
+
+    assert response["uri"].startswith("/received/logs/alert-1/")
+
+
+def test_unsigned_token(profile_handler, edge_download):
+    aws, module, metrics = edge_download
+    aws.respond("dynamodb", "update_item", {"Attributes": {"DownloadCount": {"N": "1"}}})
+    token = _unsigned_token()
+
+    response = profile_handler(metrics, lambda: module.lambda_handler(_event(token), None))
+
+    assert "uri" in response
+
+
+def test_replayed_token(profile_handler, edge_download):
+    aws, module, metrics = edge_download
+    token = _unsigned_token()
+    aws.respond_error(
+        "dynamodb", "update_item", "ConditionalCheckFailedException",
+        Item={"RequestId": {"S": "alert-1-abc123"}, "RawDownloadToken": {"S": token}, "Used": {"BOOL": True}},
+    )
+
+    response = profile_handler(metrics, lambda: module.lambda_handler(_event(token), None))
+
+    assert response["headers"]["x-error-type"][0]["value"] == "already_used"
@@ -0,0 +1,78 @@
+"""
+Latency of the upload Lambda@Edge function, with DynamoDB stubbed.
+
+"first_put" validates a link with one tracking-record read; "retried_put" is a retry
+answered from the validated-link cache; "origin_response" marks the link used after
+the origin accepted the upload.
+"""
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from tests.benchmarks._stubbed_aws import StubbedAWS, load_handler
+
+EDGE_UPLOAD_PATH = (
+    "terraform/modules/operator-request-portal-lambda-functions/log-mgt-functions/"
+    "lambda@edge-log-upload/files/edge-log-upload.py"
+)
+
+MNO_ID = "MNO1"
+BROADCAST_ID = "broadcast-123"
+S3_URI = f"/received/logs/{BROADCAST_ID}/CBC_THREE_20250512-0900Z_{BROADCAST_ID}.zip"
+
+
+def _viewer_request() -> dict:
+    request = {"method": "PUT", "uri": "/log-upload", "querystring": f"mno={MNO_ID}&broadcast_id={BROADCAST_ID}"}
+    return {"Records": [{"cf": {"config": {"eventType": "viewer-request"}, "request": request}}]}
+
+
+def _origin_response() -> dict:
+    request = {
+        "method": "PUT",
+        "uri": S3_URI,
+        "querystring": "",
+        "headers": {"x-upload-token": [{"key": "X-Upload-Token", "value": MNO_ID}]},
+    }
+    return {"Records": [{"cf": {"config": {"eventType": "origin-response"}, "request": request,
+                                "response": {"status": "200"}}}]}
+
+
+@pytest.fixture
+def edge_upload():
+    aws = StubbedAWS()
+    module, metrics = load_handler(EDGE_UPLOAD_PATH, aws, env={"AWS_REGION": "eu-west-2"})
+    expires_at = (datetime.now(timezone.utc) + timedelta(days=1)).isoformat()
+    aws.respond("dynamodb", "get_item", {
+        "Item": {"Used": {"BOOL": False}, "S3Location": {"S": S3_URI}, "ExpiresAt": {"S": expires_at}}
+    })
+    aws.respond("dynamodb", "update_item", {})
+    return module, metrics
+
+
+def test_first_put(profile_handler, edge_upload):
+    module, metrics = edge_upload
+
+    def invoke():
+        module.VALIDATED_LINKS.discard(f"{MNO_ID}#{BROADCAST_ID}")
+        return module.lambda_handler(_viewer_request(), None)
+
+    response = profile_handler(metrics, invoke)
+
+    assert response["uri"] == S3_URI
+
+
+def test_retried_put(profile_handler, edge_upload):
+    module, metrics = edge_upload
+
+    response = profile_handler(metrics, lambda: module.lambda_handler(_viewer_request(), None))
+
+    assert response["uri"] == S3_URI
+
+
+def test_origin_response(profile_handler, edge_upload):
+    module, metrics = edge_upload
+
+    response = profile_handler(metrics, lambda: module.lambda_handler(_origin_response(), None))
+
+    assert response["status"] == "200"
@@ -0,0 +1,66 @@
+"""
+Warm-invocation latency of the log-upload invite handler fanning out to four MNOs,
+with SSM, DynamoDB, S3 and Lambda stubbed.
+
+"serial" processes the MNOs one after another (INVITE_MAX_WORKERS=1); "pooled" runs
+them on the handler's thread pool.
+"""
+
+import pytest
+
+from tests.benchmarks._stubbed_aws import StubbedAWS, load_handler
+
+INVITE_HANDLER_PATH = (
+    "terraform/modules/operator-request-portal-lambda-functions/log-mgt-functions/"
+    "lambda-log-upload/files/log-upload-handler.py"
+)
+
+ENV = {
+    "LOG_BUCKET_NAME": "log-bucket",
+    "UPLOAD_DOMAIN": "portal.example.gov.uk",
+    "NOTIFY_LAMBDA_ARN": "arn:aws:lambda:eu-west-2:123456789012:function:notify",
+    "NOTIFY_LOG_TEMPLATE_ID": "template-id",
+    "LOG_INVITE_TRACKING_TABLE": "invite-tracking",
+    "LOG_UPLOAD_TRACKING_TABLE": "upload-tracking",
+    "MNO_ID_SSM_PREFIX": "/ids",
+    "MNO_EMAIL_SSM_PREFIX": "/emails",
+}
+
+MNOS = ("ee", "o2", "three", "vodafone")
+EVENT = {
+    "alert_reference": "alert-1",
+    "broadcast_start": "2025-05-12T09:00:00Z",
+    "mnos": [{"mno_id": mno, "provider_message_id": f"{mno}-message-1"} for mno in MNOS],
+}
+
+
+def _parameters_by_path(params: dict) -> dict:
+    path = params["Path"]
+    value = "a@{mno}.example,b@{mno}.example" if path == ENV["MNO_EMAIL_SSM_PREFIX"] else "PORTALID{mno}"
+    return {
+        "Parameters": [
+            {"Name": f"{path}/{mno}", "Type": "SecureString", "Value": value.format(mno=mno)} for mno in MNOS
+        ]
+    }
+
+
+@pytest.fixture
+def invite_handler():
+    aws = StubbedAWS()
+    module, metrics = load_handler(INVITE_HANDLER_PATH, aws, env=ENV)
+    aws.respond("ssm", "get_parameters_by_path", _parameters_by_path)
+    aws.respond("dynamodb", "batch_get_item", {"Responses": {ENV["LOG_INVITE_TRACKING_TABLE"]: []}})
+    aws.respond("dynamodb", "transact_write_items", {})
+    aws.respond("s3", "put_object", {})
+    aws.respond("lambda", "invoke", {"StatusCode": 202})
+    return module, metrics
+
+
+@pytest.mark.parametrize("workers", [1, 4], ids=["serial", "pooled"])
+def test_invite_fanout(profile_handler, invite_handler, workers):
+    module, metrics = invite_handler
+    module.INVITE_MAX_WORKERS = workers
+
+    response = profile_handler(metrics, lambda: module.lambda_handler(EVENT, None))
+
+    assert '"links_generated": 4' in response["body"]
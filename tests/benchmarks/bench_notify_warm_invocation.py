@@ -0,0 +1,56 @@
+"""
+Warm-invocation latency of the Notify lambda with a stubbed Notify API.
+
+"uncached" re-reads the API key and rebuilds NotificationsAPIClient on every
+invocation, as the lambda used to; "cached" is a warm container reusing both.
+SSM is stubbed with a fixed round-trip delay so the saving is visible locally.
+"""
+
+import time
+from unittest import mock
+
+import pytest
+
+from tests.unit._lambda_loader import load_lambda_module
+
+NOTIFY_PATH = (
+    "terraform/modules/operator-request-portal-lambda-functions/notify-email-communications/"
+    "files/notify-service-lambda.py"
+)
+
+# Typical in-region SSM GetParameter (WithDecryption) round trip.
+SSM_LATENCY_SECONDS = 0.008
+# NotificationsAPIClient validates the key format: "<name>-<service id>-<secret>".
+API_KEY = "bench-26785a09-ab16-4eb0-8407-a37497a57506-3d844edf-8d35-48ac-975b-e847b4f122b0"
+EVENT = {"email_address": "a@three.example", "template_id": "template-id", "personalisation": {}}
+
+
+def _get_parameter(**kwargs):
+    time.sleep(SSM_LATENCY_SECONDS)
+    return {"Parameter": {"Value": API_KEY}}
+
+
+@pytest.fixture
+def notify_module():
+    module = load_lambda_module(NOTIFY_PATH, f"notify_service_{id(object())}", env={"NOTIFY_API_KEY_PARAM": "/key"})
+    module.ssm.get_parameter.side_effect = _get_parameter
+    with mock.patch(
+        "notifications_python_client.notifications.NotificationsAPIClient.send_email_notification",
+        return_value={"id": "notification-id"},
+    ):
+        yield module
+
+
+def test_uncached_invocation(benchmark, notify_module):
+    def invoke():
+        notify_module._notify_client_cache["client"] = None
+        notify_module._notify_client_cache["api_key"] = None
+        notify_module.lambda_handler(EVENT, None)
+
+    benchmark(invoke)
+
+
+def test_cached_invocation(benchmark, notify_module):
+    notify_module.lambda_handler(EVENT, None)
+
+    benchmark(notify_module.lambda_handler, EVENT, None)
@@ -0,0 +1,84 @@
+"""
+Latency of the log-download handler validating one uploaded archive and notifying the
+team, with S3, DynamoDB and Lambda stubbed.
+
+The archive is larger than the EOCD search window, so "suffix" makes one suffix-range
+GET and "head" makes head_object plus two ranged GETs.
+"""
+
+import io
+import random
+import zipfile
+
+import pytest
+from botocore.response import StreamingBody
+
+from tests.benchmarks._stubbed_aws import StubbedAWS, load_handler
+
+LOG_DOWNLOAD_PATH = (
+    "terraform/modules/operator-request-portal-lambda-functions/log-mgt-functions/"
+    "lambda-log-download/files/lambda-log-download.py"
+)
+
+ENV = {
+    "GDS_AWS_PROFILE": "emergency-alerts-test",
+    "NOTIFY_LAMBDA_ARN": "arn:aws:lambda:eu-west-2:123456789012:function:notify",
+    "NOTIFY_TEMPLATE_ID": "template-id",
+    "LOG_INVITE_TRACKING_TABLE": "invite-tracking",
+    "ALERTS_TEAM_EMAILS": "alerts@example.gov.uk",
+    "RECORD_MAX_WORKERS": "1",
+}
+
+KEY = "received/logs/alert-1/CBC_THREE_20250512-0900Z_alert-1.zip"
+
+
+def _archive(entries: int = 200, entry_bytes: int = 1024) -> bytes:
+    content = random.Random(0)
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_STORED) as archive:
+        for n in range(entries):
+            archive.writestr(f"cbc-{n:04d}.log", content.randbytes(entry_bytes))
+    return buffer.getvalue()
+
+
+ARCHIVE = _archive()
+
+
+def _get_object(params: dict) -> dict:
+    first, _, last = params["Range"].removeprefix("bytes=").partition("-")
+    if first:
+        start, end = int(first), min(int(last), len(ARCHIVE) - 1)
+    else:
+        start, end = max(0, len(ARCHIVE) - int(last)), len(ARCHIVE) - 1
+    body = ARCHIVE[start:end + 1]
+    return {
+        "Body": StreamingBody(io.BytesIO(body), len(body)),
+        "ContentLength": len(body),
+        "ContentRange": f"bytes {start}-{end}/{len(ARCHIVE)}",
+    }
+
+
+EVENT = {"Records": [{"s3": {"bucket": {"name": "log-bucket"}, "object": {
+    "key": KEY, "size": len(ARCHIVE), "eTag": "9e107d9d372bb6826bd81d3542a419d6"
+}}}]}
+
+
+@pytest.fixture
+def log_download():
+    aws = StubbedAWS()
+    module, metrics = load_handler(LOG_DOWNLOAD_PATH, aws, env=ENV)
+    aws.respond("s3", "get_object", _get_object)
+    aws.respond("s3", "head_object", {"ContentLength": len(ARCHIVE)})
+    aws.respond("dynamodb", "update_item", {"Attributes": {"MnoName": {"S": "Three"}, "AlertTime": {"S": ""}}})
+    aws.respond("lambda", "invoke", {"StatusCode": 202})
+    return module, metrics
+
+
+@pytest.mark.parametrize("mode", ["suffix", "head"])
+def test_zip_validation(profile_handler, log_download, mode):
+    module, metrics = log_download
+    module.ZIP_VALIDATION_MODE = mode
+
+    response = profile_handler(metrics, lambda: module.lambda_handler(EVENT, None))
+
+    assert response == {"status": "ok"}
@@ -0,0 +1,114 @@
+import tracemalloc
+from collections import defaultdict
+
+import pytest
+
+# Invocations traced, after the timed rounds, to measure memory allocated per invocation.
+ALLOCATION_ROUNDS = 20
+
+# Every AWS call is stubbed or served locally, but clients still need credentials and a
+# region to build and sign requests.
+AWS_ENVIRONMENT = {
+    "AWS_ACCESS_KEY_ID": "testing",
+    "AWS_SECRET_ACCESS_KEY": "testing",
+    "AWS_DEFAULT_REGION": "eu-west-2",
+}
+
+_profiles = []
+
+
+@pytest.fixture(scope="session", autouse=True)
+def shared_config():
+    """
+    Session setup for the benchmarks, in place of tests/conftest.py's, which loads the
+    end-to-end test configuration from deployment environment variables: fake AWS
+    credentials and a default region for the whole session.
+    """
+    with pytest.MonkeyPatch.context() as patch:
+        for name, value in AWS_ENVIRONMENT.items():
+            patch.setenv(name, value)
+        yield
+
+
+def _percentile(samples: list[float], fraction: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def _summarise_stages(stages: dict, invocations: int) -> dict:
+    return {
+        stage: {
+            "per_invocation": round(len(samples) / invocations, 2),
+            "median_ms": round(_percentile(samples, 0.5), 3),
+            "p99_ms": round(_percentile(samples, 0.99), 3),
+        }
+        for stage, samples in sorted(stages.items())
+    }
+
+
+def _allocations(invoke) -> dict:
+    invoke()
+    tracemalloc.start()
+    try:
+        baseline = tracemalloc.get_traced_memory()[0]
+        peak = 0
+        for _ in range(ALLOCATION_ROUNDS):
+            tracemalloc.reset_peak()
+            before = tracemalloc.get_traced_memory()[0]
+            invoke()
+            peak = max(peak, tracemalloc.get_traced_memory()[1] - before)
+        retained = tracemalloc.get_traced_memory()[0] - baseline
+    finally:
+        tracemalloc.stop()
+    return {"peak_bytes": peak, "retained_bytes_per_invocation": retained // ALLOCATION_ROUNDS}
+
+
+@pytest.fixture
+def profile_handler(benchmark, monkeypatch, request):
+    """
+    Benchmark invoke() (pytest-benchmark's OPS column is invocations/sec), recording in
+    the saved results' extra_info the latency of every metrics stage the handler emitted
+    and the memory it allocates per invocation.
+    """
+
+    def run(metrics, invoke):
+        stages = defaultdict(list)
+        invocations = 0
+        emit = metrics.emit
+
+        def record(stage, duration_ms, outcome="ok", **properties):
+            stages[stage].append(duration_ms)
+            emit(stage, duration_ms, outcome, **properties)
+
+        def counted():
+            nonlocal invocations
+            invocations += 1
+            return invoke()
+
+        monkeypatch.setattr(metrics, "emit", record)
+        result = benchmark(counted)
+        monkeypatch.setattr(metrics, "emit", emit)
+
+        benchmark.extra_info["stages"] = _summarise_stages(stages, invocations)
+        benchmark.extra_info["allocations"] = _allocations(invoke)
+        _profiles.append((request.node.nodeid, benchmark.extra_info))
+        return result
+
+    return run
+
+
+def pytest_terminal_summary(terminalreporter):
+    if not _profiles:
+        return
+    terminalreporter.section("per-stage latency and allocations")
+    for nodeid, info in _profiles:
+        allocations = info["allocations"]
+        terminalreporter.line(
+            f"{nodeid}: peak {allocations['peak_bytes'] / 1024:.1f} KiB/invocation, "
+            f"retained {allocations['retained_bytes_per_invocation']} B/invocation"
+        )
+        for stage, summary in info["stages"].items():
+            terminalreporter.line(
+                f"    {stage:<32} x{summary['per_invocation']:<6} "
+                f"median {summary['median_ms']:.3f} ms  p99 {summary['p99_ms']:.3f} ms"
+            )
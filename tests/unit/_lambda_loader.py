@@ -5,6 +5,7 @@ terraform/modules/.../files/*.py.
 
 import importlib.util
 import os
+import sys
 from contextlib import contextmanager
 from pathlib import Path
 from types import ModuleType
@@ -12,6 +13,10 @@ from unittest import mock
 
 REPO_ROOT = Path(__file__).resolve().parents[2]
 
+# Modules packaged alongside every handler (see the archive_file source blocks).
+SHARED_MODULE_DIR = REPO_ROOT / "terraform/modules/operator-request-portal-lambda-functions/common/files"
+SHARED_MODULES = ("aws_clients", "ddb_lite", "ddb_routing", "download_tokens", "metrics", "ttl_cache")
+
 
 @contextmanager
 def _temporary_env(env: dict):
@@ -28,12 +33,40 @@ def _temporary_env(env: dict):
                 os.environ[key] = old_value
 
 
-def load_lambda_module(rel_path: str, module_name: str, env: dict = None) -> ModuleType:
+@contextmanager
+def _shared_modules_on_path():
+    """
+    Make the shared modules importable, as they are inside the deployed zip, and drop any
+    copy cached by a previous load so each handler module gets its own client registry.
+    """
+    for name in SHARED_MODULES:
+        sys.modules.pop(name, None)
+    sys.path.insert(0, str(SHARED_MODULE_DIR))
+    try:
+        yield
+    finally:
+        sys.path.remove(str(SHARED_MODULE_DIR))
+
+
+def load_lambda_module(rel_path: str, module_name: str, env: dict = None, client_factory=None) -> ModuleType:
+    """
+    Import a handler with boto3.client replaced by client_factory (called with the same
+    arguments) for the duration of the import, or by MagicMock clients if none is given.
+    """
     full_path = REPO_ROOT / rel_path
-    with _temporary_env(env or {}), mock.patch(
-        "boto3.client", side_effect=lambda *args, **kwargs: mock.MagicMock()
+    with _temporary_env(env or {}), _shared_modules_on_path(), mock.patch(
+        "boto3.client", side_effect=client_factory or (lambda *args, **kwargs: mock.MagicMock())
     ):
         spec = importlib.util.spec_from_file_location(module_name, full_path)
         module = importlib.util.module_from_spec(spec)
         spec.loader.exec_module(module)
     return module
+
+
+def load_shared_module(name: str, env: dict = None) -> ModuleType:
+    """Load a fresh copy of one of the shared modules in SHARED_MODULES."""
+    with _temporary_env(env or {}), _shared_modules_on_path():
+        spec = importlib.util.spec_from_file_location(name, SHARED_MODULE_DIR / f"{name}.py")
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+    return module
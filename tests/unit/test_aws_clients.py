@@ -0,0 +1,70 @@
+"""
+boto3 clients are built once per container by the shared aws_clients registry and
+reused by every invocation, instead of per call in prepare_folder/send_invite.
+"""
+
+from unittest import mock
+
+from tests.unit._lambda_loader import load_lambda_module, load_shared_module
+
+MODULE_PATH = (
+    "terraform/modules/operator-request-portal-lambda-functions/log-mgt-functions/"
+    "lambda-log-upload/files/log-upload-handler.py"
+)
+
+ENV = {
+    "LOG_BUCKET_NAME": "log-bucket",
+    "UPLOAD_DOMAIN": "upload.example.gov.uk",
+    "NOTIFY_LAMBDA_ARN": "arn:aws:lambda:eu-west-2:123456789012:function:notify",
+    "NOTIFY_LOG_TEMPLATE_ID": "template-id",
+    "LOG_INVITE_TRACKING_TABLE": "invite-tracking",
+    "LOG_UPLOAD_TRACKING_TABLE": "upload-tracking",
+}
+
+
+def test_client_is_built_once_per_service_and_region():
+    aws_clients = load_shared_module("aws_clients")
+
+    with mock.patch("boto3.client", side_effect=lambda *a, **k: mock.MagicMock()) as client:
+        first = aws_clients.get_client("s3")
+        assert aws_clients.get_client("s3") is first
+        assert aws_clients.get_client("dynamodb", region_name="us-east-1") is not first
+        aws_clients.get_client("dynamodb", region_name="us-east-1")
+
+    assert client.call_count == 2
+    assert all(call.kwargs["config"] is aws_clients.client_config() for call in client.call_args_list)
+
+
+def test_reset_clients_forces_a_rebuild():
+    aws_clients = load_shared_module("aws_clients")
+
+    with mock.patch("boto3.client", side_effect=lambda *a, **k: mock.MagicMock()) as client:
+        aws_clients.get_client("s3")
+        aws_clients.reset_clients()
+        aws_clients.get_client("s3")
+
+    assert client.call_count == 2
+
+
+def test_client_config_is_tuned_from_the_environment():
+    aws_clients = load_shared_module(
+        "aws_clients", env={"AWS_CLIENT_MAX_POOL_CONNECTIONS": "25", "AWS_CLIENT_MAX_ATTEMPTS": "5"}
+    )
+
+    config = aws_clients.client_config()
+    assert config.max_pool_connections == 25
+    assert config.tcp_keepalive is True
+    assert config.retries == {"mode": "adaptive", "max_attempts": 5}
+
+
+def test_invite_path_builds_no_clients_per_call():
+    module = load_lambda_module(MODULE_PATH, f"log_upload_handler_{id(object())}", env=ENV)
+
+    with mock.patch("boto3.client") as client:
+        module.prepare_folder("broadcast-1")
+        module.send_invite(["a@three.example", "b@three.example"], "broadcast-1", "three", "PORTAL1")
+        module.send_invite(["c@three.example"], "broadcast-2", "three", "PORTAL1")
+
+    client.assert_not_called()
+    module.s3.put_object.assert_called_once()
+    assert module.lambda_cli.invoke.call_count == 2
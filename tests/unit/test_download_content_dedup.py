@@ -0,0 +1,142 @@
+"""
+An uploaded archive's content fingerprint (S3 event ETag and size) is recorded on the
+invite tracking record for mno#broadcast_id, so a re-upload of the same content skips
+validation and the notification fan-out. The claim is only kept once the team has been
+notified, so a rejected archive or a failed invocation's retry is processed again.
+"""
+
+from unittest import mock
+
+import pytest
+
+from tests.unit._lambda_loader import load_lambda_module
+
+MODULE_PATH = (
+    "terraform/modules/operator-request-portal-lambda-functions/log-mgt-functions/"
+    "lambda-log-download/files/lambda-log-download.py"
+)
+
+ENV = {
+    "GDS_AWS_PROFILE": "emergency-alerts-test",
+    "NOTIFY_LAMBDA_ARN": "arn:aws:lambda:eu-west-2:123456789012:function:notify",
+    "NOTIFY_TEMPLATE_ID": "template-id",
+    "LOG_INVITE_TRACKING_TABLE": "invite-tracking",
+    "ALERTS_TEAM_EMAILS": "alerts@example.gov.uk",
+}
+
+BUCKET = "log-bucket"
+KEY = "received/logs/alert-1/CBC_THREE_20250512-0900Z_alert-1.zip"
+FINGERPRINT = "9e107d9d372bb6826bd81d3542a419d6:1024"
+
+
+class _FakeConditionalCheckFailedException(Exception):
+    def __init__(self, old_item: dict = None):
+        super().__init__("The conditional request failed")
+        self.response = {"Error": {"Code": "ConditionalCheckFailedException"}}
+        if old_item is not None:
+            self.response["Item"] = old_item
+
+
+def _load():
+    module = load_lambda_module(MODULE_PATH, f"lambda_log_download_{id(object())}", env=ENV)
+    module.ddb.exceptions.ConditionalCheckFailedException = _FakeConditionalCheckFailedException
+    module._is_zip_content = mock.MagicMock(return_value=True)
+    return module
+
+
+def _event(etag: str = '"9e107d9d372bb6826bd81d3542a419d6"') -> dict:
+    obj = {"key": KEY, "size": 1024}
+    if etag:
+        obj["eTag"] = etag
+    return {"Records": [{"s3": {"bucket": {"name": BUCKET}, "object": obj}}]}
+
+
+def test_first_upload_claims_the_content_and_notifies_without_another_read():
+    module = _load()
+    module.ddb.update_item.return_value = {
+        "Attributes": {"MnoName": {"S": "Three"}, "AlertTime": {"S": ""}, "ProcessedContent": {"S": FINGERPRINT}}
+    }
+
+    response = module.lambda_handler(_event(), None)
+
+    assert response == {"status": "ok"}
+    claim = module.ddb.update_item.call_args.kwargs
+    assert claim["Key"] == {"AlertRef": {"S": "THREE#alert-1"}}
+    assert claim["ExpressionAttributeValues"][":fp"] == {"S": FINGERPRINT}
+    assert "attribute_exists(AlertRef)" in claim["ConditionExpression"]
+    module._is_zip_content.assert_called_once_with(BUCKET, KEY)
+    module.lambda_cli.invoke.assert_called_once()
+    module.ddb.get_item.assert_not_called()
+    module.ddb.update_item.assert_called_once()
+
+
+def test_duplicate_content_skips_validation_and_notification():
+    module = _load()
+    module.ddb.update_item.side_effect = _FakeConditionalCheckFailedException(
+        {"AlertRef": {"S": "THREE#alert-1"}, "ProcessedContent": {"S": FINGERPRINT}}
+    )
+
+    response = module.lambda_handler(_event(), None)
+
+    assert response == {"status": "ok"}
+    module._is_zip_content.assert_not_called()
+    module.lambda_cli.invoke.assert_not_called()
+
+
+def test_upload_without_an_invite_record_is_still_processed():
+    module = _load()
+    module.ddb.update_item.side_effect = _FakeConditionalCheckFailedException()
+    module.ddb.get_item.return_value = {}
+
+    module.lambda_handler(_event(), None)
+
+    module._is_zip_content.assert_called_once()
+    module.lambda_cli.invoke.assert_called_once()
+
+
+def test_event_without_an_etag_is_processed_without_a_claim():
+    module = _load()
+    module.ddb.get_item.return_value = {}
+
+    module.lambda_handler(_event(etag=None), None)
+
+    module.ddb.update_item.assert_not_called()
+    module.lambda_cli.invoke.assert_called_once()
+
+
+def test_failed_processing_releases_the_claim_for_the_retry():
+    module = _load()
+    module.ddb.update_item.return_value = {"Attributes": {"MnoName": {"S": "Three"}}}
+    module.lambda_cli.invoke.side_effect = Exception("Lambda invoke throttled")
+
+    with pytest.raises(RuntimeError):
+        module.lambda_handler(_event(), None)
+
+    release = module.ddb.update_item.call_args_list[-1].kwargs
+    assert release["UpdateExpression"] == "REMOVE ProcessedContent, ProcessedAt"
+    assert release["ExpressionAttributeValues"] == {":fp": {"S": FINGERPRINT}}
+
+
+def test_rejected_archive_releases_the_claim():
+    module = _load()
+    module.ddb.update_item.return_value = {"Attributes": {"MnoName": {"S": "Three"}}}
+    module._is_zip_content.return_value = False
+
+    response = module.lambda_handler(_event(), None)
+
+    assert response == {"status": "ok"}
+    module.lambda_cli.invoke.assert_not_called()
+    release = module.ddb.update_item.call_args_list[-1].kwargs
+    assert release["UpdateExpression"] == "REMOVE ProcessedContent, ProcessedAt"
+    assert release["ConditionExpression"] == "ProcessedContent = :fp"
+
+
+def test_dynamodb_failure_does_not_block_processing():
+    module = _load()
+    module.ddb.update_item.side_effect = Exception("ProvisionedThroughputExceededException")
+    module.ddb.get_item.return_value = {}
+
+    response = module.lambda_handler(_event(), None)
+
+    assert response == {"status": "ok"}
+    module.lambda_cli.invoke.assert_called_once()
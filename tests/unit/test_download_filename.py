@@ -65,7 +65,7 @@ def test_upload_writes_self_descriptive_s3_key_without_portal_id_and_invite_reco
     module = _load_upload()
     module._get_mno_identifier = lambda mno_id: PORTAL_ID
     module._get_mno_emails = lambda mno_id: ["mno@example.gov.uk"]
-    module.ddb.get_item.return_value = {}
+    module.ddb.batch_get_item.return_value = {"Responses": {"invite-tracking": []}}
 
     event = {
         "alert_reference": "ref-1",
@@ -75,23 +75,21 @@ def test_upload_writes_self_descriptive_s3_key_without_portal_id_and_invite_reco
     with mock.patch("boto3.client", side_effect=lambda *a, **k: mock.MagicMock()):
         module.lambda_handler(event, None)
 
-    upload_calls = [
-        call for call in module.ddb.put_item.call_args_list
-        if call.kwargs["TableName"] == "upload-tracking"
-    ]
-    assert len(upload_calls) == 1
-    upload_item = upload_calls[0].kwargs["Item"]
+    module.ddb.put_item.assert_not_called()
+    (transaction_call,) = module.ddb.transact_write_items.call_args_list
+    puts = [item["Put"] for item in transaction_call.kwargs["TransactItems"]]
+
+    upload_puts = [put for put in puts if put["TableName"] == "upload-tracking"]
+    assert len(upload_puts) == 1
+    upload_item = upload_puts[0]["Item"]
     assert upload_item["RequestId"] == {"S": f"{PORTAL_ID}#{BROADCAST_ID}"}
     assert upload_item["S3Location"] == {
         "S": f"/received/logs/{BROADCAST_ID}/CBC_{MNO_LABEL}_20250512-0900Z_{BROADCAST_ID}.zip"
     }
 
-    invite_calls = [
-        call for call in module.ddb.put_item.call_args_list
-        if call.kwargs["TableName"] == "invite-tracking"
-    ]
-    assert len(invite_calls) == 1
-    invite_item = invite_calls[0].kwargs["Item"]
+    invite_puts = [put for put in puts if put["TableName"] == "invite-tracking"]
+    assert len(invite_puts) == 1
+    invite_item = invite_puts[0]["Item"]
     assert invite_item["AlertRef"] == {"S": f"{MNO_LABEL}#{BROADCAST_ID}"}
     assert invite_item["MnoName"] == {"S": "three"}
 
@@ -0,0 +1,94 @@
+"""
+S3 event records are validated and notified concurrently, and a failure in one
+record fails the invocation, for Lambda's asynchronous retry, only after the others
+have been processed.
+"""
+
+import threading
+from unittest import mock
+
+import pytest
+
+from tests.unit._lambda_loader import load_lambda_module
+
+MODULE_PATH = (
+    "terraform/modules/operator-request-portal-lambda-functions/log-mgt-functions/"
+    "lambda-log-download/files/lambda-log-download.py"
+)
+
+ENV = {
+    "GDS_AWS_PROFILE": "emergency-alerts-test",
+    "NOTIFY_LAMBDA_ARN": "arn:aws:lambda:eu-west-2:123456789012:function:notify",
+    "NOTIFY_TEMPLATE_ID": "template-id",
+    "LOG_INVITE_TRACKING_TABLE": "invite-tracking",
+    "ALERTS_TEAM_EMAILS": "alerts@example.gov.uk",
+}
+
+BUCKET = "log-bucket"
+MNO_LABELS = ("EE", "VODAFONE", "THREE", "O2")
+
+
+def _load(max_workers: int = 4):
+    module = load_lambda_module(
+        MODULE_PATH, f"lambda_log_download_{id(object())}", env={**ENV, "RECORD_MAX_WORKERS": str(max_workers)}
+    )
+    module._is_zip_content = mock.MagicMock(return_value=True)
+    module.send_notification = mock.MagicMock()
+    return module
+
+
+def _key(mno_label: str) -> str:
+    return f"received/logs/alert-1/CBC_{mno_label}_20250512-0900Z_alert-1.zip"
+
+
+def _event(*keys: str) -> dict:
+    return {"Records": [{"s3": {"bucket": {"name": BUCKET}, "object": {"key": key}}} for key in keys]}
+
+
+def test_records_are_processed_concurrently():
+    module = _load(max_workers=len(MNO_LABELS))
+    # Every record must be in flight at once for the barrier to release; a serial
+    # loop would time out here instead.
+    barrier = threading.Barrier(len(MNO_LABELS), timeout=5)
+    module._is_zip_content = lambda bucket, key: barrier.wait() is not None
+
+    response = module.lambda_handler(_event(*(_key(label) for label in MNO_LABELS)), None)
+
+    assert response == {"status": "ok"}
+    assert module.send_notification.call_count == len(MNO_LABELS)
+
+
+def test_failed_record_fails_the_invocation_without_blocking_the_others():
+    module = _load()
+
+    def _notify(broadcast_id, mno_label, bucket, key, record=None):
+        if mno_label == "THREE":
+            raise Exception("Lambda invoke throttled")
+
+    module.send_notification.side_effect = _notify
+
+    with pytest.raises(RuntimeError, match="1 of 4 upload record"):
+        module.lambda_handler(_event(*(_key(label) for label in MNO_LABELS)), None)
+
+    assert module.send_notification.call_count == len(MNO_LABELS)
+
+
+def test_rejected_uploads_are_not_retried():
+    module = _load()
+    module._is_zip_content.return_value = False
+
+    response = module.lambda_handler(_event(_key("EE"), "received/logs/alert-1/not-a-log-upload.txt"), None)
+
+    assert response == {"status": "ok"}
+    module.send_notification.assert_not_called()
+
+
+def test_single_worker_runs_serially_without_a_pool():
+    module = _load(max_workers=1)
+
+    with mock.patch.object(module, "ThreadPoolExecutor") as pool:
+        response = module.lambda_handler(_event(*(_key(label) for label in MNO_LABELS)), None)
+
+    pool.assert_not_called()
+    assert response == {"status": "ok"}
+    assert module.send_notification.call_count == len(MNO_LABELS)
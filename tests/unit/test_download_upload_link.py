@@ -0,0 +1,122 @@
+"""
+The upload link is consumed when S3 reports the object created, using the UploadRef the
+invite record holds for it. A multipart complete's 200 can arrive before the object is
+assembled, so the edge function leaves the link for this event.
+"""
+
+from unittest import mock
+
+import pytest
+
+from tests.unit._lambda_loader import load_lambda_module
+
+MODULE_PATH = (
+    "terraform/modules/operator-request-portal-lambda-functions/log-mgt-functions/"
+    "lambda-log-download/files/lambda-log-download.py"
+)
+
+ENV = {
+    "GDS_AWS_PROFILE": "emergency-alerts-test",
+    "NOTIFY_LAMBDA_ARN": "arn:aws:lambda:eu-west-2:123456789012:function:notify",
+    "NOTIFY_TEMPLATE_ID": "template-id",
+    "LOG_INVITE_TRACKING_TABLE": "invite-tracking",
+    "LOG_UPLOAD_TRACKING_TABLE": "upload-tracking",
+    "ALERTS_TEAM_EMAILS": "alerts@example.gov.uk",
+}
+
+BUCKET = "log-bucket"
+KEY = "received/logs/alert-1/CBC_THREE_20250512-0900Z_alert-1.zip"
+UPLOAD_REF = "PORTAL1#alert-1"
+INVITE = {"MnoName": {"S": "Three"}, "AlertTime": {"S": ""}, "UploadRef": {"S": UPLOAD_REF}}
+
+
+class _FakeConditionalCheckFailedException(Exception):
+    pass
+
+
+def _load():
+    module = load_lambda_module(MODULE_PATH, f"lambda_log_download_{id(object())}", env=ENV)
+    module.ddb.exceptions.ConditionalCheckFailedException = _FakeConditionalCheckFailedException
+    module._is_zip_content = mock.MagicMock(return_value=True)
+    return module
+
+
+def _event() -> dict:
+    obj = {"key": KEY, "size": 1024, "eTag": '"9e107d9d372bb6826bd81d3542a419d6-3"'}
+    return {"Records": [{"s3": {"bucket": {"name": BUCKET}, "object": obj}}]}
+
+
+def _upload_table_updates(module) -> list[dict]:
+    return [
+        call.kwargs for call in module.ddb.update_item.call_args_list
+        if call.kwargs["TableName"] == "upload-tracking"
+    ]
+
+
+def test_multipart_object_assembled_after_the_complete_consumes_the_link():
+    module = _load()
+    module.ddb.update_item.side_effect = [{"Attributes": INVITE}, {}]
+
+    response = module.lambda_handler(_event(), None)
+
+    assert response == {"status": "ok"}
+    (consume,) = _upload_table_updates(module)
+    assert consume["Key"] == {"RequestId": {"S": UPLOAD_REF}}
+    assert consume["ConditionExpression"] == "S3Location = :loc"
+    assert consume["ExpressionAttributeValues"][":loc"] == {"S": f"/{KEY}"}
+    assert consume["ExpressionAttributeValues"][":true"] == {"BOOL": True}
+    module.lambda_cli.invoke.assert_called_once()
+
+
+def test_link_is_consumed_even_when_the_content_claim_is_not_made():
+    module = _load()
+    module.ddb.update_item.side_effect = [Exception("ProvisionedThroughputExceededException"), {}]
+    module.ddb.get_item.return_value = {"Item": INVITE}
+
+    module.lambda_handler(_event(), None)
+
+    (consume,) = _upload_table_updates(module)
+    assert consume["Key"] == {"RequestId": {"S": UPLOAD_REF}}
+
+
+def test_rejected_archive_still_consumes_the_link():
+    module = _load()
+    module.ddb.update_item.side_effect = [{"Attributes": INVITE}, {}, {}]
+    module._is_zip_content.return_value = False
+
+    module.lambda_handler(_event(), None)
+
+    assert len(_upload_table_updates(module)) == 1
+    module.lambda_cli.invoke.assert_not_called()
+
+
+def test_a_newer_link_for_the_same_broadcast_is_left_alone():
+    module = _load()
+    module.ddb.update_item.side_effect = [{"Attributes": INVITE}, _FakeConditionalCheckFailedException()]
+
+    response = module.lambda_handler(_event(), None)
+
+    assert response == {"status": "ok"}
+    module.lambda_cli.invoke.assert_called_once()
+
+
+def test_failure_to_consume_the_link_is_retried():
+    module = _load()
+    module.ddb.update_item.side_effect = [{"Attributes": INVITE}, Exception("InternalServerError"), {}]
+
+    with pytest.raises(RuntimeError):
+        module.lambda_handler(_event(), None)
+
+    module._is_zip_content.assert_not_called()
+    release = module.ddb.update_item.call_args_list[-1].kwargs
+    assert release["UpdateExpression"] == "REMOVE ProcessedContent, ProcessedAt"
+
+
+def test_invite_without_an_upload_reference_is_still_notified():
+    module = _load()
+    module.ddb.update_item.return_value = {"Attributes": {"MnoName": {"S": "Three"}}}
+
+    module.lambda_handler(_event(), None)
+
+    assert _upload_table_updates(module) == []
+    module.lambda_cli.invoke.assert_called_once()
@@ -0,0 +1,204 @@
+"""
+ddb_lite, the edge functions' stdlib-only DynamoDB client: SigV4 signing matches
+botocore's, calls reuse one keep-alive connection, and error responses are raised the
+way boto3 raises them. Connections are pooled, kept alive and can be opened ahead of the
+first call. Calls go to a local HTTP server through the endpoint override.
+"""
+
+import json
+import socket
+import sys
+import threading
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock
+
+import pytest
+from botocore.auth import SigV4Auth
+from botocore.awsrequest import AWSRequest
+from botocore.credentials import Credentials
+
+from tests.unit._lambda_loader import SHARED_MODULE_DIR, load_shared_module
+
+CREDENTIALS = {"access_key": "AKIDEXAMPLE", "secret_key": "secret", "token": "session-token"}
+ITEM = {"RequestId": {"S": "alert-1-abc"}, "Used": {"BOOL": False}}
+
+
+class _FakeDynamoDB(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # The headers and body go out in separate writes, which Nagle's algorithm would
+    # hold back for a delayed ACK on a reused connection.
+    disable_nagle_algorithm = True
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers["Content-Length"]))
+        self.server.requests.append(
+            {"headers": dict(self.headers), "body": json.loads(body), "peer": self.client_address}
+        )
+        status, payload, close = self.server.responses.pop(0)
+        encoded = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/x-amz-json-1.0")
+        self.send_header("Content-Length", str(len(encoded)))
+        self.send_header("x-amzn-RequestId", "request-1")
+        if close:
+            self.send_header("Connection", "close")
+            self.close_connection = True
+        self.end_headers()
+        self.wfile.write(encoded)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), _FakeDynamoDB)
+    httpd.requests, httpd.responses = [], []
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+
+@pytest.fixture
+def ddb_lite():
+    return load_shared_module("ddb_lite")
+
+
+@pytest.fixture
+def client(ddb_lite, server):
+    client = ddb_lite.DynamoDBClient(
+        "eu-west-2", endpoint_url=f"http://127.0.0.1:{server.server_port}", credentials=lambda: CREDENTIALS
+    )
+    yield client
+    client.close()
+
+
+def test_signature_matches_botocore(ddb_lite):
+    now = datetime(2026, 10, 18, 12, 30, tzinfo=timezone.utc)
+    body = json.dumps({"TableName": "t", "Key": {"RequestId": {"S": "ref"}}}).encode()
+    headers = {
+        "Host": "dynamodb.eu-west-2.amazonaws.com",
+        "Content-Type": "application/x-amz-json-1.0",
+        "X-Amz-Target": "DynamoDB_20120810.GetItem",
+    }
+    ddb_lite.sign(headers, body, "eu-west-2", CREDENTIALS, now)
+
+    request = AWSRequest(
+        method="POST", url="https://dynamodb.eu-west-2.amazonaws.com/", data=body,
+        headers={name: value for name, value in headers.items() if name in ("Content-Type", "X-Amz-Target")},
+    )
+    with mock.patch("botocore.auth.get_current_datetime", return_value=now.replace(tzinfo=None)):
+        SigV4Auth(Credentials("AKIDEXAMPLE", "secret", "session-token"), "dynamodb", "eu-west-2").add_auth(request)
+
+    assert headers["Authorization"] == request.headers["Authorization"]
+    assert headers["X-Amz-Security-Token"] == "session-token"
+
+
+def test_calls_reuse_one_keep_alive_connection(client, server):
+    server.responses += [(200, {"Item": ITEM}, False), (200, {"Attributes": ITEM}, False)]
+
+    assert client.get_item(TableName="t", Key={"RequestId": {"S": "alert-1-abc"}}) == {"Item": ITEM}
+    assert client.update_item(TableName="t", Key={"RequestId": {"S": "alert-1-abc"}}) == {"Attributes": ITEM}
+
+    first, second = server.requests
+    assert first["headers"]["X-Amz-Target"] == "DynamoDB_20120810.GetItem"
+    assert second["headers"]["X-Amz-Target"] == "DynamoDB_20120810.UpdateItem"
+    assert first["body"] == {"TableName": "t", "Key": {"RequestId": {"S": "alert-1-abc"}}}
+    assert first["headers"]["Authorization"].startswith("AWS4-HMAC-SHA256 Credential=AKIDEXAMPLE/")
+    assert first["peer"] == second["peer"]
+
+
+def test_connection_closed_by_the_server_is_reopened(client, server):
+    server.responses += [(200, {"Item": ITEM}, True), (200, {"Item": ITEM}, False)]
+
+    client.get_item(TableName="t", Key={})
+    client.get_item(TableName="t", Key={})
+
+    assert server.requests[0]["peer"] != server.requests[1]["peer"]
+
+
+def test_failed_condition_raises_the_modelled_exception(client, server):
+    server.responses.append((400, {
+        "__type": "com.amazonaws.dynamodb.v20120810#ConditionalCheckFailedException",
+        "message": "The conditional request failed",
+        "Item": ITEM,
+    }, False))
+
+    with pytest.raises(client.exceptions.ConditionalCheckFailedException) as raised:
+        client.update_item(TableName="t", Key={}, ReturnValuesOnConditionCheckFailure="ALL_OLD")
+
+    assert raised.value.response["Error"] == {
+        "Code": "ConditionalCheckFailedException", "Message": "The conditional request failed"
+    }
+    assert raised.value.response["Item"] == ITEM
+    assert raised.value.response["ResponseMetadata"]["RequestId"] == "request-1"
+    assert len(server.requests) == 1
+
+
+def test_throttling_is_retried(ddb_lite, client, server):
+    throttled = {"__type": "com.amazonaws.dynamodb.v20120810#ProvisionedThroughputExceededException"}
+    server.responses += [(400, throttled, False), (200, {"Item": ITEM}, False)]
+
+    with mock.patch.object(ddb_lite.time, "sleep") as sleep:
+        assert client.get_item(TableName="t", Key={}) == {"Item": ITEM}
+
+    sleep.assert_called_once()
+    assert len(server.requests) == 2
+
+
+def test_lite_routing_uses_the_endpoint_override():
+    ddb_routing = load_shared_module("ddb_routing")
+    routing = dict(ddb_routing.load_routing("/nonexistent.json"), client="lite")
+
+    # ddb_routing imports ddb_lite on first use, from the deployed zip's root.
+    with mock.patch.dict("os.environ", {"DYNAMODB_ENDPOINT_URL": "http://localhost:8000"}), \
+            mock.patch.dict("sys.modules"), mock.patch("sys.path", [str(SHARED_MODULE_DIR), *sys.path]):
+        sys.modules.pop("ddb_lite", None)
+        route = ddb_routing.routes(routing, "us-east-1")["read"]
+
+    assert route["client"]._host_header == "localhost:8000"
+    assert route["client"] is route["home_client"]
+    assert route["client"].exceptions.ConditionalCheckFailedException is not None
+
+
+def test_preconnected_connection_is_reused_by_the_first_call(client, server, capsys):
+    server.responses.append((200, {"Item": ITEM}, False))
+
+    client.preconnect()
+    connection, _ = client._idle[0]
+    assert connection.sock.getsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE)
+    client.get_item(TableName="t", Key={})
+
+    assert client.stats == {"requests": 1, "reused": 1, "connections_opened": 1}
+    assert client.reuse_ratio() == 1.0
+    lines = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    assert [line["Stage"] for line in lines] == ["dynamodb.connect", "dynamodb.GetItem"]
+    assert lines[1]["ConnectionReused"] is True
+
+
+def test_connection_idle_for_too_long_is_replaced(client, server):
+    server.responses += [(200, {"Item": ITEM}, False), (200, {"Item": ITEM}, False)]
+    client.max_idle_seconds = 0
+
+    client.get_item(TableName="t", Key={})
+    client.get_item(TableName="t", Key={})
+
+    assert server.requests[0]["peer"] != server.requests[1]["peer"]
+    assert client.stats["connections_opened"] == 2
+    assert client.reuse_ratio() == 0.0
+
+
+def test_pre_connect_failure_at_init_is_logged(caplog):
+    ddb_routing = load_shared_module("ddb_routing")
+    unreachable = mock.MagicMock(region_name="us-east-1")
+    unreachable.preconnect.side_effect = ConnectionRefusedError("refused")
+    route = {"client": unreachable, "home_client": unreachable}
+
+    ddb_routing.preconnect(dict(ddb_routing.load_routing("/nonexistent.json"), client="lite"), {"read": route})
+    ddb_routing.preconnect(ddb_routing.load_routing("/nonexistent.json"), {"read": route})
+
+    unreachable.preconnect.assert_called_once()
+    assert "Could not pre-connect to DynamoDB in us-east-1" in caplog.text
@@ -0,0 +1,101 @@
+"""
+An unsigned download token is checked and consumed by a single conditional UpdateItem:
+the RawDownloadToken match is part of the condition, and the old item returned on a
+failed condition tells invalid_token and already_used apart.
+"""
+
+import base64
+import logging
+from datetime import datetime, timedelta, timezone
+
+from tests.unit._lambda_loader import load_lambda_module
+
+MODULE_PATH = (
+    "terraform/modules/operator-request-portal-lambda-functions/log-mgt-functions/"
+    "lambda@edge-log-download/files/edge-log-download.py"
+)
+
+REFERENCE = "alert-1-abc123"
+
+
+class _FakeConditionalCheckFailedException(Exception):
+    """Carries the old item like botocore does with ReturnValuesOnConditionCheckFailure=ALL_OLD."""
+
+    def __init__(self, old_item: dict = None):
+        super().__init__("The conditional request failed")
+        self.response = {"Error": {"Code": "ConditionalCheckFailedException"}}
+        if old_item is not None:
+            self.response["Item"] = old_item
+
+
+def _load():
+    module = load_lambda_module(MODULE_PATH, f"edge_log_download_{id(object())}", env={})
+    module.ddb.exceptions.ConditionalCheckFailedException = _FakeConditionalCheckFailedException
+    return module
+
+
+def _token() -> str:
+    expiry = (datetime.now(timezone.utc) + timedelta(days=1)).strftime("%Y%m%d%H%M")
+    params = f"alert=alert-1&mno=MNO1&expiry={expiry}&reference={REFERENCE}"
+    return base64.urlsafe_b64encode(params.encode()).decode()
+
+
+def _event(token: str) -> dict:
+    return {"Records": [{"cf": {"request": {"method": "GET", "querystring": f"data={token}"}}}]}
+
+
+def _error_type(response: dict) -> str:
+    return response["headers"]["x-error-type"][0]["value"]
+
+
+def test_download_is_authorised_with_exactly_one_dynamodb_call(caplog):
+    module = _load()
+    token = _token()
+    module.ddb.update_item.return_value = {"Attributes": {"DownloadCount": {"N": "3"}, "Used": {"BOOL": True}}}
+
+    with caplog.at_level(logging.INFO):
+        response = module.lambda_handler(_event(token), None)
+
+    assert response["uri"] == "/received/logs/alert-1/CBC_alert-1_MNO1.zip"
+    module.ddb.get_item.assert_not_called()
+    kwargs = module.ddb.update_item.call_args.kwargs
+    assert kwargs["ConditionExpression"].startswith("RawDownloadToken = :token AND ")
+    assert kwargs["ExpressionAttributeValues"][":token"] == {"S": token}
+    assert kwargs["ReturnValues"] == "ALL_NEW"
+    assert kwargs["ReturnValuesOnConditionCheckFailure"] == "ALL_OLD"
+    assert "count=3" in caplog.text
+
+
+def test_wrong_token_is_classified_from_the_returned_old_item():
+    module = _load()
+    module.ddb.update_item.side_effect = _FakeConditionalCheckFailedException(
+        {"RawDownloadToken": {"S": "some-other-token"}, "Used": {"BOOL": False}}
+    )
+
+    response = module.lambda_handler(_event(_token()), None)
+
+    assert _error_type(response) == "invalid_token"
+    module.ddb.get_item.assert_not_called()
+
+
+def test_used_link_is_classified_from_the_returned_old_item():
+    module = _load()
+    token = _token()
+    module.ddb.update_item.side_effect = _FakeConditionalCheckFailedException(
+        {"RawDownloadToken": {"S": token}, "Used": {"BOOL": True}}
+    )
+
+    response = module.lambda_handler(_event(token), None)
+
+    assert _error_type(response) == "already_used"
+    module.ddb.get_item.assert_not_called()
+
+
+def test_missing_record_is_invalid_token():
+    module = _load()
+    module.ddb.update_item.side_effect = _FakeConditionalCheckFailedException()
+    module.ddb.get_item.return_value = {}
+
+    response = module.lambda_handler(_event(_token()), None)
+
+    assert _error_type(response) == "invalid_token"
@@ -0,0 +1,138 @@
+"""
+Lambda@Edge DynamoDB calls are routed by executing region: reads go to the nearest
+global-table replica, conditional writes stay in the home region, and a replica that
+fails for any reason other than a failed condition falls back to the home region.
+"""
+
+import base64
+import json
+import logging
+from datetime import datetime, timedelta, timezone
+from unittest import mock
+
+import pytest
+
+from tests.unit._lambda_loader import load_lambda_module, load_shared_module
+
+MODULE_PATH = (
+    "terraform/modules/operator-request-portal-lambda-functions/log-mgt-functions/"
+    "lambda@edge-log-download/files/edge-log-download.py"
+)
+
+ROUTING = {
+    "home_region": "eu-west-2",
+    "replica_regions": ["us-east-1", "ap-southeast-2"],
+    "routes": {"us-east-2": "us-east-1", "ap-southeast-1": "ap-southeast-2"},
+    "strongly_consistent_writes": False,
+    "client": "boto3",
+}
+
+
+class _FakeClientError(Exception):
+    def __init__(self, code: str):
+        super().__init__(code)
+        self.response = {"Error": {"Code": code}}
+
+
+def _route(region: str) -> dict:
+    return {"client": mock.MagicMock(), "region": region, "home_client": mock.MagicMock(), "home_region": "eu-west-2"}
+
+
+@pytest.fixture
+def ddb_routing():
+    return load_shared_module("ddb_routing")
+
+
+@pytest.mark.parametrize(
+    "executing_region, expected",
+    [
+        ("us-east-1", "us-east-1"),
+        ("us-east-2", "us-east-1"),
+        ("ap-southeast-1", "ap-southeast-2"),
+        ("sa-east-1", "eu-west-2"),
+        ("eu-west-2", "eu-west-2"),
+    ],
+)
+def test_reads_go_to_the_nearest_replica(ddb_routing, executing_region, expected):
+    assert ddb_routing.read_region(ROUTING, executing_region) == expected
+
+
+def test_routes_to_a_region_without_a_replica_fall_back_to_home(ddb_routing):
+    routing = dict(ROUTING, routes={"us-east-2": "us-west-2"})
+
+    assert ddb_routing.read_region(routing, "us-east-2") == "eu-west-2"
+
+
+def test_writes_stay_in_the_home_region_unless_replicas_are_strongly_consistent(ddb_routing):
+    assert ddb_routing.write_region(ROUTING, "us-east-1") == "eu-west-2"
+    strong = dict(ROUTING, strongly_consistent_writes=True)
+    assert ddb_routing.write_region(strong, "us-east-1") == "us-east-1"
+
+
+def test_absent_routing_file_uses_the_home_region_everywhere(ddb_routing, tmp_path):
+    routing = ddb_routing.load_routing(str(tmp_path / "missing.json"))
+
+    assert routing["replica_regions"] == []
+    assert ddb_routing.read_region(routing, "us-east-1") == routing["home_region"]
+
+
+def test_routing_file_is_read(ddb_routing, tmp_path):
+    path = tmp_path / "dynamodb_routing.json"
+    path.write_text(json.dumps(ROUTING))
+
+    assert ddb_routing.load_routing(str(path)) == ROUTING
+
+
+def test_replica_failure_is_retried_in_the_home_region(ddb_routing, caplog):
+    route = _route("us-east-1")
+    route["client"].get_item.side_effect = _FakeClientError("InternalServerError")
+    route["home_client"].get_item.return_value = {"Item": {"RequestId": {"S": "ref"}}}
+
+    with caplog.at_level(logging.INFO):
+        resp = ddb_routing.call(route, "get_item", TableName="t", Key={"RequestId": {"S": "ref"}})
+
+    assert resp == {"Item": {"RequestId": {"S": "ref"}}}
+    route["home_client"].get_item.assert_called_once_with(TableName="t", Key={"RequestId": {"S": "ref"}})
+    assert "retrying in home region eu-west-2" in caplog.text
+    assert "DynamoDB get_item in us-east-1 took" in caplog.text
+    assert "DynamoDB get_item in eu-west-2 took" in caplog.text
+
+
+def test_failed_condition_on_a_replica_is_not_retried(ddb_routing):
+    route = _route("us-east-1")
+    route["client"].update_item.side_effect = _FakeClientError("ConditionalCheckFailedException")
+
+    with pytest.raises(_FakeClientError):
+        ddb_routing.call(route, "update_item", TableName="t")
+
+    route["home_client"].update_item.assert_not_called()
+
+
+def test_home_region_failure_is_not_retried(ddb_routing):
+    client = mock.MagicMock()
+    client.get_item.side_effect = _FakeClientError("InternalServerError")
+    route = {"client": client, "region": "eu-west-2", "home_client": client, "home_region": "eu-west-2"}
+
+    with pytest.raises(_FakeClientError):
+        ddb_routing.call(route, "get_item", TableName="t")
+
+    client.get_item.assert_called_once()
+
+
+def test_edge_handler_reads_from_replica_and_writes_to_home():
+    module = load_lambda_module(MODULE_PATH, f"edge_log_download_{id(object())}", env={})
+    read_route, write_route = _route("us-east-1"), _route("eu-west-2")
+    write_route["client"] = write_route["home_client"]
+    module.DDB_ROUTES = {"read": read_route, "write": write_route}
+    expiry = (datetime.now(timezone.utc) + timedelta(days=1)).strftime("%Y%m%d%H%M")
+    token = base64.urlsafe_b64encode(
+        f"alert=alert-1&mno=MNO1&expiry={expiry}&reference=alert-1-abc".encode()
+    ).decode()
+    read_route["client"].get_item.return_value = {"Item": {"RawDownloadToken": {"S": token}}}
+    write_route["client"].update_item.return_value = {"Attributes": {"DownloadCount": {"N": "1"}}}
+
+    assert module._get_tracking_record("alert-1-abc", token) == ({"RawDownloadToken": {"S": token}}, None)
+    module._record_download("alert-1-abc", token)
+
+    read_route["home_client"].get_item.assert_not_called()
+    write_route["client"].update_item.assert_called_once()
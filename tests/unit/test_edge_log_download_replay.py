@@ -15,7 +15,11 @@ MODULE_PATH = (
 
 
 class _FakeConditionalCheckFailedException(Exception):
-    pass
+    def __init__(self, old_item: dict = None):
+        super().__init__("The conditional request failed")
+        self.response = {"Error": {"Code": "ConditionalCheckFailedException"}}
+        if old_item is not None:
+            self.response["Item"] = old_item
 
 
 def _load():
@@ -42,7 +46,7 @@ def test_first_download_is_recorded_successfully():
     module = _load()
     module.ddb.update_item.return_value = {}
 
-    err = module._increment_download("alert-1-abc123")
+    _, err = module._record_download("alert-1-abc123")
 
     assert err is None
     module.ddb.update_item.assert_called_once()
@@ -52,9 +56,11 @@ def test_first_download_is_recorded_successfully():
 
 def test_replayed_token_is_rejected_with_already_used():
     module = _load()
-    module.ddb.update_item.side_effect = module.ddb.exceptions.ConditionalCheckFailedException()
+    module.ddb.update_item.side_effect = module.ddb.exceptions.ConditionalCheckFailedException(
+        {"RequestId": {"S": "alert-1-abc123"}, "Used": {"BOOL": True}}
+    )
 
-    err = module._increment_download("alert-1-abc123")
+    _, err = module._record_download("alert-1-abc123")
 
     assert err is not None
     assert err["status"] == "403"
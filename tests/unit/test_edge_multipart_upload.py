@@ -0,0 +1,140 @@
+"""
+Multipart uploads: initiate, part, complete and abort are each authorised against the
+same mno#broadcast_id link and rewritten to the S3 multipart API. A single PUT marks
+the link used at origin-response; a multipart upload leaves it to lambda-log-download,
+once S3 reports the object created.
+"""
+
+from unittest import mock
+
+import pytest
+
+from tests.unit._lambda_loader import load_lambda_module
+
+MODULE_PATH = (
+    "terraform/modules/operator-request-portal-lambda-functions/log-mgt-functions/"
+    "lambda@edge-log-upload/files/edge-log-upload.py"
+)
+
+MNO_ID = "MNO1"
+BROADCAST_ID = "broadcast-123"
+S3_URI = f"/received/logs/{BROADCAST_ID}/CBC_THREE_20250512-0900Z_{BROADCAST_ID}.zip"
+MNO_HEADER = {"x-upload-token": [{"key": "X-Upload-Token", "value": MNO_ID}]}
+BUCKET = "portal-dev-static"
+
+
+def _load():
+    module = load_lambda_module(MODULE_PATH, f"edge_log_upload_{id(object())}", env={})
+    module.ddb.get_item.return_value = {"Item": {"Used": {"BOOL": False}, "S3Location": {"S": S3_URI}}}
+    module.UPLOAD_CONFIG = {"bucket": BUCKET, "region": "eu-west-2"}
+    return module
+
+
+def _request(method: str, extra_qs: str = "") -> dict:
+    return {"method": method, "querystring": f"mno={MNO_ID}&broadcast_id={BROADCAST_ID}{extra_qs}"}
+
+
+@pytest.mark.parametrize(
+    "method, extra_qs, origin_qs",
+    [
+        ("PUT", "", ""),
+        ("POST", "&action=initiate", "uploads"),
+        ("PUT", "&action=part&upload_id=abc.def&part_number=3", "partNumber=3&uploadId=abc.def"),
+        ("POST", "&action=complete&upload_id=abc.def", "uploadId=abc.def"),
+        ("DELETE", "&action=abort&upload_id=abc.def", "uploadId=abc.def"),
+    ],
+)
+def test_actions_are_rewritten_to_the_s3_multipart_api(method, extra_qs, origin_qs):
+    module = _load()
+
+    result = module._handle_viewer_request(_request(method, extra_qs))
+
+    assert result["uri"] == S3_URI
+    assert result["querystring"] == origin_qs
+    assert result["headers"]["x-upload-token"][0]["value"] == MNO_ID
+
+
+def test_upload_id_is_encoded_for_the_origin():
+    module = _load()
+
+    result = module._handle_viewer_request(_request("PUT", "&action=part&upload_id=a%2Bb%26c&part_number=1"))
+
+    assert result["querystring"] == "partNumber=1&uploadId=a%2Bb%26c"
+
+
+@pytest.mark.parametrize(
+    "method, extra_qs, error_type",
+    [
+        ("PUT", "&action=initiate", "method_not_allowed"),
+        ("POST", "", "method_not_allowed"),
+        ("PUT", "&action=resume", "invalid_action"),
+        ("PUT", "&action=part&part_number=1", "missing_upload_id"),
+        ("PUT", "&action=part&upload_id=abc&part_number=0", "invalid_part_number"),
+        ("PUT", "&action=part&upload_id=abc&part_number=10001", "invalid_part_number"),
+        ("PUT", "&action=part&upload_id=abc", "invalid_part_number"),
+    ],
+)
+def test_malformed_multipart_requests_are_rejected_without_a_lookup(method, extra_qs, error_type):
+    module = _load()
+
+    result = module._handle_viewer_request(_request(method, extra_qs))
+
+    assert result["headers"]["x-error-type"][0]["value"] == error_type
+    module.ddb.get_item.assert_not_called()
+
+
+def test_parts_are_refused_once_the_link_is_used():
+    module = _load()
+    module.ddb.get_item.return_value = {"Item": {"Used": {"BOOL": True}, "S3Location": {"S": S3_URI}}}
+
+    result = module._handle_viewer_request(_request("PUT", "&action=part&upload_id=abc&part_number=2"))
+
+    assert result["headers"]["x-error-type"][0]["value"] == "already_used"
+
+
+@pytest.mark.parametrize(
+    "method, origin_qs",
+    [("POST", "uploads"), ("PUT", "partNumber=1&uploadId=abc"), ("DELETE", "uploadId=abc")],
+)
+def test_intermediate_multipart_steps_leave_the_link_unused(method, origin_qs):
+    module = _load()
+    request = {"method": method, "uri": S3_URI, "querystring": origin_qs, "headers": MNO_HEADER}
+
+    module._handle_origin_response(request, {"status": "200"})
+
+    module.ddb.update_item.assert_not_called()
+
+
+def test_complete_leaves_the_link_for_the_object_created_event():
+    module = _load()
+    request = {"method": "POST", "uri": S3_URI, "querystring": "uploadId=abc", "headers": MNO_HEADER}
+
+    # The 200 arrives while S3 may still be assembling the object (or before it reports an
+    # error in the body), so lambda-log-download consumes the link once the object exists.
+    with mock.patch.object(module, "_s3_client") as s3_client:
+        module._handle_origin_response(request, {"status": "200"})
+
+    s3_client.assert_not_called()
+    module.ddb.update_item.assert_not_called()
+    assert module.NEGATIVE_CACHE.get(f"{MNO_ID}#{BROADCAST_ID}") is None
+
+
+def test_single_put_marks_the_link_used():
+    module = _load()
+    request = {"method": "PUT", "uri": S3_URI, "querystring": "", "headers": MNO_HEADER}
+
+    with mock.patch.object(module, "_s3_client") as s3_client:
+        module._handle_origin_response(request, {"status": "200"})
+
+    s3_client.assert_not_called()
+    module.ddb.update_item.assert_called_once()
+    assert module.ddb.update_item.call_args.kwargs["Key"] == {"RequestId": {"S": f"{MNO_ID}#{BROADCAST_ID}"}}
+
+
+def test_failed_complete_leaves_the_link_unused():
+    module = _load()
+    request = {"method": "POST", "uri": S3_URI, "querystring": "uploadId=abc", "headers": MNO_HEADER}
+
+    module._handle_origin_response(request, {"status": "400"})
+
+    module.ddb.update_item.assert_not_called()
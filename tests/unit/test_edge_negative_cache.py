@@ -0,0 +1,151 @@
+"""
+Both Lambda@Edge handlers remember definitive rejections (invalid, expired, already used)
+per container, so a repeated bad or replayed link is answered without DynamoDB. Transient
+lookup failures are never remembered.
+"""
+
+import base64
+from datetime import datetime, timedelta, timezone
+
+from tests.unit._lambda_loader import load_lambda_module, load_shared_module
+
+DOWNLOAD_MODULE_PATH = (
+    "terraform/modules/operator-request-portal-lambda-functions/log-mgt-functions/"
+    "lambda@edge-log-download/files/edge-log-download.py"
+)
+UPLOAD_MODULE_PATH = (
+    "terraform/modules/operator-request-portal-lambda-functions/log-mgt-functions/"
+    "lambda@edge-log-upload/files/edge-log-upload.py"
+)
+
+
+class _FakeConditionalCheckFailedException(Exception):
+    def __init__(self, old_item: dict = None):
+        super().__init__("The conditional request failed")
+        self.response = {"Error": {"Code": "ConditionalCheckFailedException"}}
+        if old_item is not None:
+            self.response["Item"] = old_item
+
+
+class _FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def _download_module():
+    module = load_lambda_module(DOWNLOAD_MODULE_PATH, f"edge_log_download_{id(object())}", env={})
+    module.ddb.exceptions.ConditionalCheckFailedException = _FakeConditionalCheckFailedException
+    return module
+
+
+def _upload_module():
+    return load_lambda_module(UPLOAD_MODULE_PATH, f"edge_log_upload_{id(object())}", env={})
+
+
+def _download_event(reference: str = "alert-1-abc123") -> dict:
+    expiry = (datetime.now(timezone.utc) + timedelta(days=1)).strftime("%Y%m%d%H%M")
+    params = f"alert=alert-1&mno=MNO1&expiry={expiry}&reference={reference}"
+    token = base64.urlsafe_b64encode(params.encode()).decode()
+    return {"Records": [{"cf": {"request": {"method": "GET", "querystring": f"data={token}"}}}]}
+
+
+def _upload_request() -> dict:
+    return {"method": "PUT", "querystring": "mno=MNO1&broadcast_id=broadcast-123"}
+
+
+def _error_type(response: dict) -> str:
+    return response["headers"]["x-error-type"][0]["value"]
+
+
+def test_ttl_cache_expires_entries():
+    ttl_cache = load_shared_module("ttl_cache")
+    clock = _FakeClock()
+    cache = ttl_cache.TTLCache(max_entries=10, ttl_seconds=60, clock=clock)
+    cache.put("key", "value")
+
+    clock.now = 59
+    assert cache.get("key") == "value"
+    clock.now = 60
+    assert cache.get("key") is None
+    assert len(cache) == 0
+
+
+def test_ttl_cache_evicts_least_recently_used():
+    ttl_cache = load_shared_module("ttl_cache")
+    cache = ttl_cache.TTLCache(max_entries=2, ttl_seconds=60)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    cache.get("a")
+    cache.put("c", 3)
+
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
+
+
+def test_replayed_download_link_is_answered_from_memory():
+    module = _download_module()
+    module.ddb.update_item.side_effect = _FakeConditionalCheckFailedException(
+        {"RawDownloadToken": {"S": "other-token"}}
+    )
+    event = _download_event()
+
+    first = module.lambda_handler(event, None)
+    second = module.lambda_handler(event, None)
+
+    assert _error_type(first) == _error_type(second) == "invalid_token"
+    assert second == first
+    assert module.ddb.update_item.call_count == 1
+    assert first["headers"]["cache-control"][0]["value"] == f"max-age={module.NEGATIVE_CACHE_TTL_SECONDS}"
+
+
+def test_download_cache_entry_is_keyed_by_token_hash():
+    module = _download_module()
+    module.ddb.update_item.side_effect = _FakeConditionalCheckFailedException({"Used": {"BOOL": True}})
+
+    module.lambda_handler(_download_event(), None)
+
+    token = _download_event()["Records"][0]["cf"]["request"]["querystring"][len("data="):]
+    assert token not in module.NEGATIVE_CACHE._entries
+    assert len(module.NEGATIVE_CACHE) == 1
+
+
+def test_failed_download_tracking_is_not_remembered():
+    module = _download_module()
+    module.ddb.update_item.side_effect = [Exception("ProvisionedThroughputExceededException"), {
+        "Attributes": {"DownloadCount": {"N": "1"}}
+    }]
+    event = _download_event()
+
+    first = module.lambda_handler(event, None)
+    second = module.lambda_handler(event, None)
+
+    assert first["status"] == "500"
+    assert first["headers"]["cache-control"][0]["value"] == "no-cache"
+    assert second["uri"] == "/received/logs/alert-1/CBC_alert-1_MNO1.zip"
+
+
+def test_repeated_upload_to_a_used_link_skips_dynamodb():
+    module = _upload_module()
+    module.ddb.get_item.return_value = {"Item": {"Used": {"BOOL": True}}}
+
+    first = module._handle_viewer_request(_upload_request())
+    second = module._handle_viewer_request(_upload_request())
+
+    assert _error_type(first) == _error_type(second) == "already_used"
+    module.ddb.get_item.assert_called_once()
+
+
+def test_upload_lookup_failure_is_not_remembered():
+    module = _upload_module()
+    module.ddb.get_item.side_effect = Exception("ProvisionedThroughputExceededException")
+
+    first = module._handle_viewer_request(_upload_request())
+    second = module._handle_viewer_request(_upload_request())
+
+    assert first["status"] == second["status"] == "500"
+    assert module.ddb.get_item.call_count == 2
+    assert len(module.NEGATIVE_CACHE) == 0
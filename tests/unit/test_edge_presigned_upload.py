@@ -0,0 +1,126 @@
+"""
+?action=presign checks the tracking record once and returns a short-lived presigned S3
+PUT for its S3Location so the archive bypasses CloudFront and Lambda@Edge. The link is
+left unused, so a failed or expired PUT can be presigned again; lambda-log-download
+consumes it once the object is created.
+"""
+
+import json
+from unittest import mock
+from urllib.parse import parse_qs, urlsplit
+
+import boto3
+
+from tests.unit._lambda_loader import load_lambda_module
+
+MODULE_PATH = (
+    "terraform/modules/operator-request-portal-lambda-functions/log-mgt-functions/"
+    "lambda@edge-log-upload/files/edge-log-upload.py"
+)
+
+MNO_ID = "MNO1"
+BROADCAST_ID = "broadcast-123"
+S3_URI = f"/received/logs/{BROADCAST_ID}/CBC_THREE_20250512-0900Z_{BROADCAST_ID}.zip"
+UPLOAD_CONFIG = {"bucket": "portal-dev-static", "region": "eu-west-2", "presign_expiry_seconds": 300}
+
+
+def _load(upload_config: dict = None):
+    module = load_lambda_module(MODULE_PATH, f"edge_log_upload_{id(object())}", env={})
+    module.ddb.get_item.return_value = {"Item": {"Used": {"BOOL": False}, "S3Location": {"S": S3_URI}}}
+    module.UPLOAD_CONFIG = UPLOAD_CONFIG if upload_config is None else upload_config
+    return module
+
+
+def _presign_request() -> dict:
+    return {"method": "POST", "querystring": f"mno={MNO_ID}&broadcast_id={BROADCAST_ID}&action=presign"}
+
+
+def _fake_s3():
+    s3 = mock.MagicMock()
+    s3.generate_presigned_url.return_value = "https://portal-dev-static.s3.eu-west-2.amazonaws.com/signed"
+    return s3
+
+
+def test_presign_returns_a_put_url_for_the_tracked_location_without_consuming_the_link():
+    module = _load()
+    s3 = _fake_s3()
+
+    with mock.patch.object(module, "_s3_client", return_value=s3):
+        response = module._handle_viewer_request(_presign_request())
+
+    assert response["status"] == "200"
+    body = json.loads(response["body"])
+    assert body == {
+        "url": "https://portal-dev-static.s3.eu-west-2.amazonaws.com/signed",
+        "method": "PUT",
+        "headers": {"Content-Type": "application/zip", "If-None-Match": "*"},
+        "expires_in": 300,
+    }
+    params = s3.generate_presigned_url.call_args.kwargs["Params"]
+    assert params["Bucket"] == "portal-dev-static"
+    assert params["Key"] == S3_URI.lstrip("/")
+    assert params["IfNoneMatch"] == "*"
+    module.ddb.update_item.assert_not_called()
+
+
+def test_link_can_be_presigned_again_after_a_failed_or_expired_put():
+    module = _load()
+    s3 = _fake_s3()
+
+    with mock.patch.object(module, "_s3_client", return_value=s3):
+        first = module._handle_viewer_request(_presign_request())
+        second = module._handle_viewer_request(_presign_request())
+
+    assert first["status"] == second["status"] == "200"
+    assert s3.generate_presigned_url.call_count == 2
+    module.ddb.update_item.assert_not_called()
+
+
+def test_presign_is_refused_once_the_object_has_consumed_the_link():
+    module = _load()
+    module.ddb.get_item.return_value = {"Item": {"Used": {"BOOL": True}, "S3Location": {"S": S3_URI}}}
+    s3 = _fake_s3()
+
+    with mock.patch.object(module, "_s3_client", return_value=s3):
+        response = module._handle_viewer_request(_presign_request())
+
+    assert response["status"] == "403"
+    assert response["headers"]["x-error-type"][0]["value"] == "already_used"
+    s3.generate_presigned_url.assert_not_called()
+
+
+def test_presign_failure_leaves_the_link_unused():
+    module = _load()
+    s3 = _fake_s3()
+    s3.generate_presigned_url.side_effect = Exception("no credentials")
+
+    with mock.patch.object(module, "_s3_client", return_value=s3):
+        response = module._handle_viewer_request(_presign_request())
+
+    assert response["status"] == "500"
+    module.ddb.update_item.assert_not_called()
+
+
+def test_presign_is_unavailable_without_a_configured_bucket():
+    module = _load(upload_config={})
+
+    response = module._handle_viewer_request(_presign_request())
+
+    assert response["headers"]["x-error-type"][0]["value"] == "invalid_action"
+    module.ddb.get_item.assert_not_called()
+
+
+def test_presigned_url_signs_the_write_once_condition(monkeypatch):
+    monkeypatch.setenv("AWS_ACCESS_KEY_ID", "AKIDEXAMPLE")
+    monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "wJalrXUtnFEMI/K7MDENG+bPxRfiCYEXAMPLEKEY")
+    module = _load()
+    s3 = boto3.client("s3", region_name="eu-west-2")
+
+    with mock.patch.object(module, "_s3_client", return_value=s3):
+        body = json.loads(module._handle_viewer_request(_presign_request())["body"])
+
+    url = urlsplit(body["url"])
+    query = parse_qs(url.query)
+    assert url.path == S3_URI
+    assert query["X-Amz-Expires"] == ["300"]
+    assert "if-none-match" in query["X-Amz-SignedHeaders"][0].split(";")
@@ -0,0 +1,153 @@
+"""
+Signed download tokens are verified at the edge with no DynamoDB read: forged and
+expired tokens never leave the edge, and a valid one costs a single conditional update.
+"""
+
+import base64
+import json
+from datetime import datetime, timedelta, timezone
+
+from tests.unit._lambda_loader import load_lambda_module, load_shared_module
+
+MODULE_PATH = (
+    "terraform/modules/operator-request-portal-lambda-functions/log-mgt-functions/"
+    "lambda@edge-log-download/files/edge-log-download.py"
+)
+
+OLD_KEY = b"old-signing-key-0123456789abcdef"
+NEW_KEY = b"new-signing-key-0123456789abcdef"
+KEY_SET = {"active_kid": "2025-06", "keys": {"2025-01": OLD_KEY, "2025-06": NEW_KEY}}
+
+
+class _FakeConditionalCheckFailedException(Exception):
+    def __init__(self, old_item: dict = None):
+        super().__init__("The conditional request failed")
+        self.response = {"Error": {"Code": "ConditionalCheckFailedException"}}
+        if old_item is not None:
+            self.response["Item"] = old_item
+
+
+def _load():
+    module = load_lambda_module(MODULE_PATH, f"edge_log_download_{id(object())}", env={})
+    module.ddb.exceptions.ConditionalCheckFailedException = _FakeConditionalCheckFailedException
+    module.SIGNING_KEYS = KEY_SET
+    module.ddb.update_item.return_value = {"Attributes": {"DownloadCount": {"N": "1"}}}
+    return module
+
+
+def _params(days: int = 1, **overrides) -> dict:
+    expiry = (datetime.now(timezone.utc) + timedelta(days=days)).strftime("%Y%m%d%H%M")
+    return {"alert": "alert-1", "mno": "MNO1", "expiry": expiry, "reference": "alert-1-abc123", **overrides}
+
+
+def _signed_token(params: dict, key_set: dict = KEY_SET) -> str:
+    return load_shared_module("download_tokens").build_signed_token(params, key_set)
+
+
+def _tamper(token: str, **changes) -> str:
+    decoded = base64.urlsafe_b64decode(token).decode()
+    fields = dict(pair.split("=", 1) for pair in decoded.split("&"))
+    fields.update(changes)
+    return base64.urlsafe_b64encode("&".join(f"{k}={v}" for k, v in fields.items()).encode()).decode()
+
+
+def _event(token: str) -> dict:
+    return {"Records": [{"cf": {"request": {"method": "GET", "querystring": f"data={token}"}}}]}
+
+
+def _error_type(response: dict) -> str:
+    return response["headers"]["x-error-type"][0]["value"]
+
+
+def test_valid_signed_token_needs_only_the_conditional_update():
+    module = _load()
+
+    response = module.lambda_handler(_event(_signed_token(_params())), None)
+
+    assert response["uri"] == "/received/logs/alert-1/CBC_alert-1_MNO1.zip"
+    module.ddb.get_item.assert_not_called()
+    module.ddb.update_item.assert_called_once()
+    condition = module.ddb.update_item.call_args.kwargs["ConditionExpression"]
+    assert condition.startswith("attribute_exists(RequestId) AND ")
+
+
+def test_token_signed_with_a_retired_but_still_listed_key_is_accepted():
+    module = _load()
+    token = _signed_token(_params(), {"active_kid": "2025-01", "keys": {"2025-01": OLD_KEY}})
+
+    assert "uri" in module.lambda_handler(_event(token), None)
+
+
+def test_tampered_token_is_rejected_without_any_dynamodb_call():
+    module = _load()
+    token = _tamper(_signed_token(_params()), mno="MNO2")
+
+    response = module.lambda_handler(_event(token), None)
+
+    assert response["status"] == "403"
+    assert _error_type(response) == "invalid_token"
+    module.ddb.get_item.assert_not_called()
+    module.ddb.update_item.assert_not_called()
+
+
+def test_token_signed_with_an_unknown_key_is_rejected():
+    module = _load()
+    token = _signed_token(_params(), {"active_kid": "rogue", "keys": {"rogue": b"attacker-chosen-key"}})
+
+    response = module.lambda_handler(_event(token), None)
+
+    assert _error_type(response) == "invalid_token"
+    module.ddb.update_item.assert_not_called()
+
+
+def test_expired_signed_token_is_rejected_without_any_dynamodb_call():
+    module = _load()
+
+    response = module.lambda_handler(_event(_signed_token(_params(days=-1))), None)
+
+    assert _error_type(response) == "expired_link"
+    module.ddb.update_item.assert_not_called()
+
+
+def test_replayed_signed_token_is_rejected_by_the_conditional_update():
+    module = _load()
+    module.ddb.update_item.side_effect = _FakeConditionalCheckFailedException(
+        {"RequestId": {"S": "alert-1-abc123"}, "Used": {"BOOL": True}}
+    )
+
+    response = module.lambda_handler(_event(_signed_token(_params())), None)
+
+    assert _error_type(response) == "already_used"
+
+
+def test_signed_token_for_an_unknown_reference_is_rejected():
+    module = _load()
+    # No tracking record, so the update's attribute_exists check fails with no old item.
+    module.ddb.update_item.side_effect = _FakeConditionalCheckFailedException()
+
+    response = module.lambda_handler(_event(_signed_token(_params(reference="alert-1-unknown"))), None)
+
+    assert response["status"] == "403"
+    assert _error_type(response) == "invalid_token"
+    module.ddb.get_item.assert_not_called()
+
+
+def test_unsigned_tokens_are_still_checked_against_the_tracking_record():
+    module = _load()
+    token = base64.urlsafe_b64encode("&".join(f"{k}={v}" for k, v in _params().items()).encode()).decode()
+
+    assert "uri" in module.lambda_handler(_event(token), None)
+    values = module.ddb.update_item.call_args.kwargs["ExpressionAttributeValues"]
+    assert values[":token"] == {"S": token}
+
+
+def test_embedded_key_file_is_decoded(tmp_path):
+    download_tokens = load_shared_module("download_tokens")
+    keys_file = tmp_path / "download_token_keys.json"
+    keys_file.write_text(json.dumps({
+        "active_kid": "2025-06",
+        "keys": {"2025-06": base64.urlsafe_b64encode(NEW_KEY).decode().rstrip("=")},
+    }))
+
+    assert download_tokens.load_keys(str(keys_file)) == {"active_kid": "2025-06", "keys": {"2025-06": NEW_KEY}}
+    assert download_tokens.load_keys(str(tmp_path / "missing.json")) == {"active_kid": None, "keys": {}}
@@ -0,0 +1,142 @@
+"""
+A retried PUT within a few seconds reuses the link validated by the previous attempt
+instead of reading the tracking record again. The Used flag stays authoritative at
+origin-response.
+"""
+
+from datetime import datetime, timedelta, timezone
+
+from tests.unit._lambda_loader import load_lambda_module
+
+MODULE_PATH = (
+    "terraform/modules/operator-request-portal-lambda-functions/log-mgt-functions/"
+    "lambda@edge-log-upload/files/edge-log-upload.py"
+)
+
+MNO_ID = "MNO1"
+BROADCAST_ID = "broadcast-123"
+S3_URI = f"/received/logs/{BROADCAST_ID}/CBC_THREE_20250512-0900Z_{BROADCAST_ID}.zip"
+
+
+class _FakeConditionalCheckFailedException(Exception):
+    pass
+
+
+class _FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def _load():
+    module = load_lambda_module(MODULE_PATH, f"edge_log_upload_{id(object())}", env={})
+    module.ddb.exceptions.ConditionalCheckFailedException = _FakeConditionalCheckFailedException
+    return module
+
+
+def _item(expires_at: datetime = None) -> dict:
+    expires_at = expires_at or datetime.now(timezone.utc) + timedelta(days=1)
+    return {
+        "Item": {
+            "Used": {"BOOL": False},
+            "S3Location": {"S": S3_URI},
+            "ExpiresAt": {"S": expires_at.isoformat()},
+            "MnoName": {"S": "Three"},
+        }
+    }
+
+
+def _put():
+    return {"method": "PUT", "querystring": f"mno={MNO_ID}&broadcast_id={BROADCAST_ID}"}
+
+
+def _origin_response(module, status: str = "200"):
+    request = {"uri": S3_URI, "headers": {"x-upload-token": [{"key": "X-Upload-Token", "value": MNO_ID}]}}
+    return module._handle_origin_response(request, {"status": status})
+
+
+def test_retried_put_skips_the_tracking_read():
+    module = _load()
+    module.ddb.get_item.return_value = _item()
+
+    first = module._handle_viewer_request(_put())
+    second = module._handle_viewer_request(_put())
+
+    assert first["uri"] == second["uri"] == S3_URI
+    module.ddb.get_item.assert_called_once()
+
+
+def test_only_location_and_expiry_are_cached():
+    module = _load()
+    module.ddb.get_item.return_value = _item()
+
+    module._handle_viewer_request(_put())
+
+    assert set(module.VALIDATED_LINKS.get(f"{MNO_ID}#{BROADCAST_ID}")) == {"S3Location", "ExpiresAt"}
+
+
+def test_cached_link_is_read_again_after_the_ttl():
+    module = _load()
+    clock = _FakeClock()
+    module.VALIDATED_LINKS = module.ttl_cache.TTLCache(16, module.VALIDATED_LINK_TTL_SECONDS, clock=clock)
+    module.ddb.get_item.return_value = _item()
+
+    module._handle_viewer_request(_put())
+    clock.now = module.VALIDATED_LINK_TTL_SECONDS
+    module._handle_viewer_request(_put())
+
+    assert module.ddb.get_item.call_count == 2
+
+
+def test_cached_link_still_honours_its_expiry():
+    module = _load()
+    module.ddb.get_item.return_value = _item()
+    module._handle_viewer_request(_put())
+    expired = (datetime.now(timezone.utc) - timedelta(seconds=1)).isoformat()
+    module.VALIDATED_LINKS.put(f"{MNO_ID}#{BROADCAST_ID}", {"S3Location": {"S": S3_URI}, "ExpiresAt": {"S": expired}})
+
+    result = module._handle_viewer_request(_put())
+
+    assert result["headers"]["x-error-type"][0]["value"] == "expired_link"
+
+
+def test_successful_upload_replaces_the_cached_link_with_a_rejection():
+    module = _load()
+    module.ddb.get_item.return_value = _item()
+    module._handle_viewer_request(_put())
+
+    _origin_response(module)
+    result = module._handle_viewer_request(_put())
+
+    assert result["headers"]["x-error-type"][0]["value"] == "already_used"
+    module.ddb.get_item.assert_called_once()
+
+
+def test_used_flag_is_still_enforced_at_origin_response():
+    """A retry served from the cache can still reach S3, but origin-response's conditional
+    update is what decides whether the link was consumed."""
+    module = _load()
+    module.ddb.get_item.return_value = _item()
+    module._handle_viewer_request(_put())
+    module.ddb.update_item.side_effect = _FakeConditionalCheckFailedException()
+
+    _origin_response(module)
+
+    module.ddb.update_item.assert_called_once()
+    assert "ConditionExpression" in module.ddb.update_item.call_args.kwargs
+    assert module.VALIDATED_LINKS.get(f"{MNO_ID}#{BROADCAST_ID}") is None
+
+
+def test_failed_write_keeps_the_link_cached_for_the_retry():
+    module = _load()
+    module.ddb.get_item.return_value = _item()
+    module._handle_viewer_request(_put())
+
+    _origin_response(module, status="503")
+    result = module._handle_viewer_request(_put())
+
+    assert result["uri"] == S3_URI
+    module.ddb.get_item.assert_called_once()
+    module.ddb.update_item.assert_not_called()
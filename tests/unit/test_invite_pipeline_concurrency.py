@@ -0,0 +1,195 @@
+"""
+The per-MNO invite pipeline runs MNOs concurrently, but each MNO's own steps must
+still happen in order and a repeated MNO entry must not be invited twice.
+"""
+
+import json
+import threading
+from unittest import mock
+
+from tests.unit._lambda_loader import load_lambda_module
+
+MODULE_PATH = (
+    "terraform/modules/operator-request-portal-lambda-functions/log-mgt-functions/"
+    "lambda-log-upload/files/log-upload-handler.py"
+)
+
+ENV = {
+    "LOG_BUCKET_NAME": "log-bucket",
+    "UPLOAD_DOMAIN": "upload.example.gov.uk",
+    "NOTIFY_LAMBDA_ARN": "arn:aws:lambda:eu-west-2:123456789012:function:notify",
+    "NOTIFY_LOG_TEMPLATE_ID": "template-id",
+    "LOG_INVITE_TRACKING_TABLE": "invite-tracking",
+    "LOG_UPLOAD_TRACKING_TABLE": "upload-tracking",
+}
+
+MNO_IDS = ("ee", "vodafone", "three", "o2")
+
+# Position of broadcast_id in each pipeline step's arguments (1 unless listed).
+BROADCAST_ID_ARG = {"prepare_folder": 0, "register_invite_transaction": 2, "mark_invited": 2}
+
+
+def _load(max_workers: int = 4, write_mode: str = "sequential"):
+    module = load_lambda_module(
+        MODULE_PATH,
+        f"log_upload_handler_{id(object())}",
+        env={**ENV, "INVITE_MAX_WORKERS": str(max_workers), "INVITE_WRITE_MODE": write_mode},
+    )
+    module._get_mno_identifier = lambda mno_id: f"PORTAL-{mno_id.upper()}"
+    module._get_mno_emails = lambda mno_id: [f"ops@{mno_id}.example"]
+    module.ddb.batch_get_item.return_value = {"Responses": {"invite-tracking": []}, "UnprocessedKeys": {}}
+    return module
+
+
+def _event(*mno_ids: str) -> dict:
+    return {
+        "alert_reference": "ref-1",
+        "broadcast_start": "2025-05-12T09:00:00Z",
+        "mnos": [{"mno_id": mno_id, "provider_message_id": f"broadcast-{mno_id}"} for mno_id in mno_ids],
+    }
+
+
+def _record_steps(module) -> list[tuple[str, str]]:
+    """Replace each pipeline step with a recorder of (step, broadcast_id)."""
+    steps = []
+    lock = threading.Lock()
+
+    def recorder(step, result=None):
+        def _record(*args, **kwargs):
+            broadcast_id = args[BROADCAST_ID_ARG.get(step, 1)]
+            with lock:
+                steps.append((step, broadcast_id))
+            return result
+        return _record
+
+    module.already_invited = recorder("already_invited", False)
+    module.register_upload_reference = recorder("register_upload_reference", True)
+    module.mark_invited = recorder("mark_invited")
+    module.register_invite_transaction = recorder("register_invite_transaction", module.INVITE_REGISTERED)
+    module.prepare_folder = recorder("prepare_folder")
+    module.send_invite = recorder("send_invite")
+    return steps
+
+
+def test_mnos_are_processed_concurrently():
+    module = _load(max_workers=len(MNO_IDS))
+    # Every worker must be inside the pipeline at the same time for the barrier to
+    # release; a serial loop would time out here instead.
+    barrier = threading.Barrier(len(MNO_IDS), timeout=5)
+    module.register_upload_reference = lambda *args: barrier.wait() and True
+    module.prepare_folder = mock.MagicMock()
+    module.mark_invited = mock.MagicMock()
+    module.send_invite = mock.MagicMock()
+
+    response = module.lambda_handler(_event(*MNO_IDS), None)
+
+    assert json.loads(response["body"])["links_generated"] == len(MNO_IDS)
+    assert module.send_invite.call_count == len(MNO_IDS)
+
+
+def test_each_mno_pipeline_keeps_its_step_order():
+    module = _load()
+    steps = _record_steps(module)
+
+    module.lambda_handler(_event(*MNO_IDS), None)
+
+    expected = ["register_upload_reference", "mark_invited", "prepare_folder", "send_invite"]
+    for mno_id in MNO_IDS:
+        mno_steps = [step for step, broadcast_id in steps if broadcast_id == f"broadcast-{mno_id}"]
+        assert mno_steps == expected
+
+
+def test_each_mno_pipeline_checks_unresolved_invites_individually():
+    module = _load()
+    module.ddb.batch_get_item.side_effect = Exception("ProvisionedThroughputExceededException")
+    steps = _record_steps(module)
+
+    module.lambda_handler(_event(*MNO_IDS), None)
+
+    expected = ["already_invited", "register_upload_reference", "mark_invited", "prepare_folder", "send_invite"]
+    for mno_id in MNO_IDS:
+        mno_steps = [step for step, broadcast_id in steps if broadcast_id == f"broadcast-{mno_id}"]
+        assert mno_steps == expected
+
+
+def test_each_mno_pipeline_keeps_its_step_order_in_transaction_mode():
+    module = _load(write_mode="transaction")
+    steps = _record_steps(module)
+
+    module.lambda_handler(_event(*MNO_IDS), None)
+
+    expected = ["register_invite_transaction", "prepare_folder", "send_invite"]
+    for mno_id in MNO_IDS:
+        mno_steps = [step for step, broadcast_id in steps if broadcast_id == f"broadcast-{mno_id}"]
+        assert mno_steps == expected
+
+
+def test_duplicate_mno_entries_are_only_invited_once():
+    module = _load()
+    steps = _record_steps(module)
+
+    event = _event("ee")
+    event["mnos"] += [
+        {"mno_id": "EE", "provider_message_id": "broadcast-ee"},
+        {"mno_id": "ee", "provider_message_id": "broadcast-ee"},
+    ]
+
+    response = module.lambda_handler(event, None)
+
+    assert json.loads(response["body"])["links_generated"] == 1
+    assert [step for step, _ in steps].count("mark_invited") == 1
+
+
+def test_single_worker_runs_serially_without_a_pool():
+    module = _load(max_workers=1)
+    _record_steps(module)
+
+    with mock.patch.object(module, "ThreadPoolExecutor") as pool:
+        response = module.lambda_handler(_event(*MNO_IDS), None)
+
+    pool.assert_not_called()
+    assert json.loads(response["body"])["links_generated"] == len(MNO_IDS)
+
+
+def test_response_reports_per_stage_timings():
+    module = _load()
+    _record_steps(module)
+
+    body = json.loads(module.lambda_handler(_event(*MNO_IDS), None)["body"])
+
+    assert set(body["stage_timings_ms"]) == {
+        "ssm_fetch",
+        "invite_precheck",
+        "prepare_folder",
+        "register_upload_reference",
+        "mark_invited",
+        "send_invite",
+    }
+    assert body["duration_ms"] >= 0
+
+
+def test_stage_timings_are_the_durations_emitted_as_metrics(capsys):
+    module = _load(max_workers=1)
+    _record_steps(module)
+
+    body = json.loads(module.lambda_handler(_event("ee"), None)["body"])
+
+    lines = [json.loads(line) for line in capsys.readouterr().out.splitlines() if line.startswith('{"_aws"')]
+    emitted = {line["Stage"]: line["Duration"] for line in lines}
+    assert set(emitted) == set(body["stage_timings_ms"])
+    for stage, duration in emitted.items():
+        assert abs(body["stage_timings_ms"][stage] - duration) < 0.1
+
+
+def test_already_invited_mno_is_skipped_without_blocking_the_others():
+    module = _load()
+    steps = _record_steps(module)
+    module.ddb.batch_get_item.return_value = {
+        "Responses": {"invite-tracking": [{"AlertRef": {"S": "EE#broadcast-ee"}}]},
+        "UnprocessedKeys": {},
+    }
+
+    body = json.loads(module.lambda_handler(_event(*MNO_IDS), None)["body"])
+
+    assert body["links_generated"] == len(MNO_IDS) - 1
+    assert ("send_invite", "broadcast-ee") not in steps
@@ -0,0 +1,125 @@
+"""
+Every invite key for an event is resolved with BatchGetItem before any per-MNO work,
+so a re-delivered alert event costs one read rather than one per MNO.
+"""
+
+import json
+from unittest import mock
+
+from tests.unit._lambda_loader import load_lambda_module
+
+MODULE_PATH = (
+    "terraform/modules/operator-request-portal-lambda-functions/log-mgt-functions/"
+    "lambda-log-upload/files/log-upload-handler.py"
+)
+
+ENV = {
+    "LOG_BUCKET_NAME": "log-bucket",
+    "UPLOAD_DOMAIN": "upload.example.gov.uk",
+    "NOTIFY_LAMBDA_ARN": "arn:aws:lambda:eu-west-2:123456789012:function:notify",
+    "NOTIFY_LOG_TEMPLATE_ID": "template-id",
+    "LOG_INVITE_TRACKING_TABLE": "invite-tracking",
+    "LOG_UPLOAD_TRACKING_TABLE": "upload-tracking",
+}
+
+MNO_IDS = ("ee", "vodafone", "three")
+
+
+def _load():
+    module = load_lambda_module(MODULE_PATH, f"log_upload_handler_{id(object())}", env=ENV)
+    module._get_mno_identifier = lambda mno_id: f"PORTAL-{mno_id.upper()}"
+    module._get_mno_emails = lambda mno_id: [f"ops@{mno_id}.example"]
+    module.send_invite = mock.MagicMock()
+    module.prepare_folder = mock.MagicMock()
+    return module
+
+
+def _event(*mno_ids: str) -> dict:
+    return {
+        "alert_reference": "ref-1",
+        "broadcast_start": "2025-05-12T09:00:00Z",
+        "mnos": [{"mno_id": mno_id, "provider_message_id": "broadcast-1"} for mno_id in mno_ids],
+    }
+
+
+def _keys(*keys: str) -> list[dict]:
+    return [{"AlertRef": {"S": key}} for key in keys]
+
+
+def test_replayed_event_is_resolved_with_a_single_batch_read():
+    module = _load()
+    module.ddb.batch_get_item.return_value = {
+        "Responses": {"invite-tracking": _keys("EE#broadcast-1", "VODAFONE#broadcast-1", "THREE#broadcast-1")},
+        "UnprocessedKeys": {},
+    }
+
+    body = json.loads(module.lambda_handler(_event(*MNO_IDS), None)["body"])
+
+    assert body["links_generated"] == 0
+    module.ddb.batch_get_item.assert_called_once()
+    request = module.ddb.batch_get_item.call_args.kwargs["RequestItems"]["invite-tracking"]
+    assert request["Keys"] == _keys("EE#broadcast-1", "VODAFONE#broadcast-1", "THREE#broadcast-1")
+    module.ddb.get_item.assert_not_called()
+    module.ddb.transact_write_items.assert_not_called()
+    module.send_invite.assert_not_called()
+
+
+def test_only_uninvited_mnos_are_processed():
+    module = _load()
+    module.ddb.batch_get_item.return_value = {
+        "Responses": {"invite-tracking": _keys("EE#broadcast-1")},
+        "UnprocessedKeys": {},
+    }
+
+    body = json.loads(module.lambda_handler(_event(*MNO_IDS), None)["body"])
+
+    assert body["links_generated"] == 2
+    invited = {call.args[2] for call in module.send_invite.call_args_list}
+    assert invited == {"vodafone", "three"}
+
+
+def test_unprocessed_keys_are_retried_with_backoff():
+    module = _load()
+    module.ddb.batch_get_item.side_effect = [
+        {
+            "Responses": {"invite-tracking": _keys("EE#broadcast-1")},
+            "UnprocessedKeys": {"invite-tracking": {"Keys": _keys("THREE#broadcast-1")}},
+        },
+        {"Responses": {"invite-tracking": _keys("THREE#broadcast-1")}, "UnprocessedKeys": {}},
+    ]
+
+    with mock.patch.object(module.time, "sleep") as sleep:
+        known = module.fetch_existing_invites(["EE#broadcast-1", "VODAFONE#broadcast-1", "THREE#broadcast-1"])
+
+    assert known == {"EE#broadcast-1": True, "VODAFONE#broadcast-1": False, "THREE#broadcast-1": True}
+    sleep.assert_called_once_with(module.BATCH_GET_BACKOFF_SECONDS)
+    retry_request = module.ddb.batch_get_item.call_args_list[1].kwargs["RequestItems"]
+    assert retry_request == {"invite-tracking": {"Keys": _keys("THREE#broadcast-1")}}
+
+
+def test_keys_still_unprocessed_after_retries_are_left_unresolved():
+    module = _load()
+    module.ddb.batch_get_item.return_value = {
+        "Responses": {"invite-tracking": []},
+        "UnprocessedKeys": {"invite-tracking": {"Keys": _keys("THREE#broadcast-1")}},
+    }
+
+    with mock.patch.object(module.time, "sleep"):
+        known = module.fetch_existing_invites(["EE#broadcast-1", "THREE#broadcast-1"])
+
+    assert known == {"EE#broadcast-1": False}
+    assert module.ddb.batch_get_item.call_count == module.BATCH_GET_MAX_ATTEMPTS
+
+
+def test_large_events_are_split_into_batches_of_one_hundred_keys():
+    module = _load()
+    module.ddb.batch_get_item.return_value = {"Responses": {"invite-tracking": []}, "UnprocessedKeys": {}}
+
+    known = module.fetch_existing_invites([f"MNO{i}#broadcast-1" for i in range(150)])
+
+    assert len(known) == 150
+    batch_sizes = [
+        len(call.kwargs["RequestItems"]["invite-tracking"]["Keys"])
+        for call in module.ddb.batch_get_item.call_args_list
+    ]
+    assert batch_sizes == [100, 50]
@@ -0,0 +1,127 @@
+"""
+The invite record and the upload reference are written together in one
+TransactWriteItems call, with the "already invited" check folded into its condition
+expressions. The original read-then-write path remains as a fallback.
+"""
+
+from unittest import mock
+
+from tests.unit._lambda_loader import load_lambda_module
+
+MODULE_PATH = (
+    "terraform/modules/operator-request-portal-lambda-functions/log-mgt-functions/"
+    "lambda-log-upload/files/log-upload-handler.py"
+)
+
+ENV = {
+    "LOG_BUCKET_NAME": "log-bucket",
+    "UPLOAD_DOMAIN": "upload.example.gov.uk",
+    "NOTIFY_LAMBDA_ARN": "arn:aws:lambda:eu-west-2:123456789012:function:notify",
+    "NOTIFY_LOG_TEMPLATE_ID": "template-id",
+    "LOG_INVITE_TRACKING_TABLE": "invite-tracking",
+    "LOG_UPLOAD_TRACKING_TABLE": "upload-tracking",
+}
+
+BROADCAST_ID = "broadcast-123"
+PORTAL_ID = "PORTAL1"
+EVENT = {
+    "alert_reference": "ref-1",
+    "broadcast_start": "2025-05-12T09:00:00Z",
+    "mnos": [{"mno_id": "three", "provider_message_id": BROADCAST_ID}],
+}
+
+
+class _FakeTransactionCanceledException(Exception):
+    def __init__(self, *codes):
+        super().__init__("Transaction cancelled")
+        self.response = {"CancellationReasons": [{"Code": code} for code in codes]}
+
+
+class _FakeConditionalCheckFailedException(Exception):
+    pass
+
+
+def _load(write_mode: str = "transaction"):
+    module = load_lambda_module(
+        MODULE_PATH, f"log_upload_handler_{id(object())}", env={**ENV, "INVITE_WRITE_MODE": write_mode}
+    )
+    module.ddb.exceptions.TransactionCanceledException = _FakeTransactionCanceledException
+    module.ddb.exceptions.ConditionalCheckFailedException = _FakeConditionalCheckFailedException
+    module._get_mno_identifier = lambda mno_id: PORTAL_ID
+    module._get_mno_emails = lambda mno_id: ["ops@three.example"]
+    module.send_invite = mock.MagicMock()
+    module.prepare_folder = mock.MagicMock()
+    module.ddb.batch_get_item.return_value = {"Responses": {"invite-tracking": []}, "UnprocessedKeys": {}}
+    return module
+
+
+def test_invite_and_upload_reference_are_written_in_one_transaction():
+    module = _load()
+
+    module.lambda_handler(EVENT, None)
+
+    module.ddb.transact_write_items.assert_called_once()
+    module.ddb.get_item.assert_not_called()
+    module.ddb.put_item.assert_not_called()
+
+    items = module.ddb.transact_write_items.call_args.kwargs["TransactItems"]
+    invite_put, upload_put = (item["Put"] for item in items)
+    assert invite_put["TableName"] == "invite-tracking"
+    assert invite_put["Item"]["AlertRef"] == {"S": f"THREE#{BROADCAST_ID}"}
+    assert invite_put["Item"]["UploadRef"] == {"S": f"{PORTAL_ID}#{BROADCAST_ID}"}
+    assert invite_put["ConditionExpression"] == "attribute_not_exists(AlertRef)"
+    assert upload_put["TableName"] == "upload-tracking"
+    assert upload_put["Item"]["RequestId"] == {"S": f"{PORTAL_ID}#{BROADCAST_ID}"}
+    assert upload_put["Item"]["Used"] == {"BOOL": False}
+    assert upload_put["ConditionExpression"] == "attribute_not_exists(RequestId)"
+    module.send_invite.assert_called_once()
+
+
+def test_existing_invite_cancels_the_transaction_and_sends_no_email():
+    module = _load()
+    module.ddb.transact_write_items.side_effect = _FakeTransactionCanceledException("ConditionalCheckFailed", "None")
+
+    module.lambda_handler(EVENT, None)
+
+    module.send_invite.assert_not_called()
+    module.prepare_folder.assert_not_called()
+    module.ddb.put_item.assert_not_called()
+
+
+def test_leftover_upload_reference_falls_back_to_sequential_writes():
+    """An upload reference with no matching invite record (e.g. a partial run of the
+    old path) must not block the invite: the sequential path records it instead."""
+    module = _load()
+    module.ddb.transact_write_items.side_effect = _FakeTransactionCanceledException("None", "ConditionalCheckFailed")
+    module.ddb.get_item.return_value = {}
+
+    module.lambda_handler(EVENT, None)
+
+    tables = [call.kwargs["TableName"] for call in module.ddb.put_item.call_args_list]
+    assert tables == ["upload-tracking", "invite-tracking"]
+    module.send_invite.assert_called_once()
+
+
+def test_transaction_error_falls_back_to_sequential_writes():
+    module = _load()
+    module.ddb.transact_write_items.side_effect = Exception("AccessDeniedException")
+
+    module.lambda_handler(EVENT, None)
+
+    # The batch pre-check already showed no invite exists, so no per-key read is needed.
+    module.ddb.get_item.assert_not_called()
+    assert module.ddb.put_item.call_count == 2
+    module.send_invite.assert_called_once()
+
+
+def test_sequential_mode_keeps_the_read_then_write_path():
+    module = _load(write_mode="sequential")
+    module.ddb.batch_get_item.side_effect = Exception("ProvisionedThroughputExceededException")
+    module.ddb.get_item.return_value = {"Item": {"AlertRef": {"S": f"THREE#{BROADCAST_ID}"}}}
+
+    module.lambda_handler(EVENT, None)
+
+    module.ddb.transact_write_items.assert_not_called()
+    module.ddb.get_item.assert_called_once()
+    module.ddb.put_item.assert_not_called()
+    module.send_invite.assert_not_called()
@@ -0,0 +1,83 @@
+"""
+In lazy-init mode a handler's module-level clients, and the heavy imports behind them,
+are only built on first use, so the init phase of a cold start skips them.
+"""
+
+import json
+from unittest import mock
+
+from tests.unit._lambda_loader import load_lambda_module, load_shared_module
+
+NOTIFY_PATH = (
+    "terraform/modules/operator-request-portal-lambda-functions/notify-email-communications/"
+    "files/notify-service-lambda.py"
+)
+EDGE_DOWNLOAD_PATH = (
+    "terraform/modules/operator-request-portal-lambda-functions/log-mgt-functions/"
+    "lambda@edge-log-download/files/edge-log-download.py"
+)
+
+LAZY_ENV = {"AWS_CLIENTS_LAZY_INIT": "true"}
+
+
+def test_lazy_client_is_built_on_its_first_api_call():
+    aws_clients = load_shared_module("aws_clients", env=LAZY_ENV)
+
+    with mock.patch("boto3.client", side_effect=lambda *a, **k: mock.MagicMock()) as client:
+        s3 = aws_clients.get_client("s3")
+        assert aws_clients.get_client("s3") is s3
+        client.assert_not_called()
+
+        s3.put_object(Bucket="b", Key="k")
+        s3.put_object(Bucket="b", Key="k")
+
+    client.assert_called_once()
+    assert client.call_args.kwargs["config"] is aws_clients.client_config()
+    assert aws_clients.get_client("s3", lazy=False).put_object.call_count == 2
+
+
+def test_eager_mode_is_the_default():
+    aws_clients = load_shared_module("aws_clients")
+
+    with mock.patch("boto3.client", side_effect=lambda *a, **k: mock.MagicMock()) as client:
+        aws_clients.get_client("s3")
+
+    assert aws_clients.LAZY_INIT is False
+    client.assert_called_once()
+
+
+def test_edge_functions_read_the_mode_from_the_embedded_file(tmp_path):
+    aws_clients = load_shared_module("aws_clients")
+    settings = tmp_path / "aws_clients.json"
+    settings.write_text(json.dumps({"lazy_init": True}))
+
+    assert aws_clients._load_lazy_init(str(settings)) is True
+    assert aws_clients._load_lazy_init(str(tmp_path / "missing.json")) is False
+
+
+def test_edge_rejection_on_a_lazy_cold_start_builds_no_client():
+    module = load_lambda_module(EDGE_DOWNLOAD_PATH, f"edge_log_download_{id(object())}", env=LAZY_ENV)
+    event = {"Records": [{"cf": {"request": {"method": "GET", "querystring": "data=not-a-token"}}}]}
+
+    with mock.patch("boto3.client") as client:
+        response = module.lambda_handler(event, None)
+
+    assert response["status"] in ("400", "403")
+    client.assert_not_called()
+
+
+def test_notify_client_library_is_imported_on_first_send():
+    module = load_lambda_module(NOTIFY_PATH, f"notify_service_{id(object())}", env={
+        "NOTIFY_API_KEY_PARAM": "/key", **LAZY_ENV
+    })
+    assert module.NotificationsAPIClient is None
+
+    with mock.patch("boto3.client", side_effect=lambda *a, **k: mock.MagicMock()):
+        module.ssm.get_parameter.return_value = {"Parameter": {"Value": "api-key"}}
+    with mock.patch(
+        "notifications_python_client.notifications.NotificationsAPIClient.__init__", return_value=None
+    ):
+        module.get_notify_client()
+
+    assert module.NotificationsAPIClient is not None
+    assert module.APIError is not None
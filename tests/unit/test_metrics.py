@@ -0,0 +1,114 @@
+"""
+Per-stage latency metrics are written as CloudWatch Embedded Metric Format lines on
+stdout: one per timed stage, and one per AWS API call made by a shared client.
+"""
+
+import base64
+import json
+from datetime import datetime, timedelta, timezone
+
+import boto3
+import pytest
+from botocore.stub import Stubber
+
+from tests.unit._lambda_loader import load_lambda_module, load_shared_module
+
+EDGE_DOWNLOAD_PATH = (
+    "terraform/modules/operator-request-portal-lambda-functions/log-mgt-functions/"
+    "lambda@edge-log-download/files/edge-log-download.py"
+)
+
+
+def _emf_lines(capsys) -> list[dict]:
+    lines = [json.loads(line) for line in capsys.readouterr().out.splitlines() if line.startswith("{")]
+    return [line for line in lines if "_aws" in line]
+
+
+@pytest.fixture
+def metrics():
+    return load_shared_module("metrics")
+
+
+def test_emit_writes_an_emf_document(metrics, capsys, monkeypatch):
+    monkeypatch.setenv("AWS_LAMBDA_FUNCTION_NAME", "dev-log-upload-edge")
+
+    metrics.emit("viewer-request", 12.34567, "expired_link", Region="eu-west-2")
+
+    (line,) = _emf_lines(capsys)
+    directive = line["_aws"]["CloudWatchMetrics"][0]
+    assert directive["Namespace"] == metrics.NAMESPACE
+    assert ["Function", "Stage", "Outcome"] in directive["Dimensions"]
+    assert directive["Metrics"] == [{"Name": "Duration", "Unit": "Milliseconds"}]
+    assert line["Function"] == "dev-log-upload-edge"
+    assert line["Stage"] == "viewer-request"
+    assert line["Outcome"] == "expired_link"
+    assert line["Duration"] == 12.346
+    assert line["Region"] == "eu-west-2"
+
+
+def test_timed_records_the_outcome_set_by_the_block(metrics, capsys):
+    with metrics.timed("zip_validation") as result:
+        result["outcome"] = "rejected"
+
+    (line,) = _emf_lines(capsys)
+    assert (line["Stage"], line["Outcome"]) == ("zip_validation", "rejected")
+    assert line["Duration"] >= 0
+
+
+def test_timed_properties_set_by_the_block_override_those_passed_in(metrics, capsys):
+    with metrics.timed("dynamodb.GetItem", ConnectionReused=False) as result:
+        result["ConnectionReused"] = True
+
+    (line,) = _emf_lines(capsys)
+    assert line["ConnectionReused"] is True
+
+
+def test_timed_records_an_escaping_exception_as_error(metrics, capsys):
+    with pytest.raises(RuntimeError):
+        with metrics.timed("notify.SendEmail"):
+            raise RuntimeError("boom")
+
+    (line,) = _emf_lines(capsys)
+    assert line["Outcome"] == "error"
+
+
+def _stubbed_dynamodb(metrics):
+    client = boto3.client(
+        "dynamodb", region_name="us-east-1", aws_access_key_id="AKIDEXAMPLE", aws_secret_access_key="secret"
+    )
+    return metrics.instrument_client(client), Stubber(client)
+
+
+def test_instrumented_client_times_each_api_call(metrics, capsys):
+    client, stubber = _stubbed_dynamodb(metrics)
+    stubber.add_response("get_item", {"Item": {"RequestId": {"S": "ref"}}})
+
+    with stubber:
+        client.get_item(TableName="t", Key={"RequestId": {"S": "ref"}})
+
+    (line,) = _emf_lines(capsys)
+    assert (line["Stage"], line["Outcome"], line["Region"]) == ("dynamodb.GetItem", "ok", "us-east-1")
+
+
+def test_instrumented_client_records_the_error_code(metrics, capsys):
+    client, stubber = _stubbed_dynamodb(metrics)
+    stubber.add_client_error("update_item", service_error_code="ConditionalCheckFailedException", http_status_code=400)
+
+    with stubber, pytest.raises(client.exceptions.ConditionalCheckFailedException):
+        client.update_item(TableName="t", Key={"RequestId": {"S": "ref"}})
+
+    (line,) = _emf_lines(capsys)
+    assert (line["Stage"], line["Outcome"]) == ("dynamodb.UpdateItem", "ConditionalCheckFailedException")
+
+
+def test_edge_download_records_the_error_type_as_outcome(capsys):
+    module = load_lambda_module(EDGE_DOWNLOAD_PATH, f"edge_log_download_{id(object())}", env={})
+    expiry = (datetime.now(timezone.utc) - timedelta(minutes=1)).strftime("%Y%m%d%H%M")
+    token = base64.urlsafe_b64encode(f"alert=a&mno=M&expiry={expiry}&reference=a-1".encode()).decode()
+    event = {"Records": [{"cf": {"request": {"method": "GET", "querystring": f"data={token}"}}}]}
+    capsys.readouterr()
+
+    module.lambda_handler(event, None)
+
+    (line,) = _emf_lines(capsys)
+    assert (line["Stage"], line["Outcome"]) == ("viewer-request", "expired_link")
@@ -0,0 +1,168 @@
+"""
+MNO identifiers and contact emails are fetched from SSM in bulk, once per warm
+container, rather than with two get_parameter round trips per MNO per invocation.
+"""
+
+from unittest import mock
+
+import pytest
+
+from tests.unit._lambda_loader import load_lambda_module
+
+MODULE_PATH = (
+    "terraform/modules/operator-request-portal-lambda-functions/log-mgt-functions/"
+    "lambda-log-upload/files/log-upload-handler.py"
+)
+
+ENV = {
+    "LOG_BUCKET_NAME": "log-bucket",
+    "UPLOAD_DOMAIN": "upload.example.gov.uk",
+    "NOTIFY_LAMBDA_ARN": "arn:aws:lambda:eu-west-2:123456789012:function:notify",
+    "NOTIFY_LOG_TEMPLATE_ID": "template-id",
+    "LOG_INVITE_TRACKING_TABLE": "invite-tracking",
+    "LOG_UPLOAD_TRACKING_TABLE": "upload-tracking",
+}
+
+SSM_PARAMETERS = {
+    "/operator-portal/mno-ids": [
+        {"Name": "/operator-portal/mno-ids/ee", "Value": "EE1234 "},
+        {"Name": "/operator-portal/mno-ids/vodafone", "Value": "VF5678"},
+    ],
+    "/operator-portal/mno-emails": [
+        {"Name": "/operator-portal/mno-emails/ee", "Value": "a@ee.example, b@ee.example"},
+        {"Name": "/operator-portal/mno-emails/vodafone", "Value": "c@vf.example"},
+    ],
+}
+
+
+def _load():
+    module = load_lambda_module(MODULE_PATH, f"log_upload_handler_{id(object())}", env=ENV)
+    paginator = module.ssm.get_paginator.return_value
+    paginator.paginate.side_effect = lambda Path, **kwargs: [{"Parameters": SSM_PARAMETERS[Path]}]
+    return module
+
+
+def _paginated_paths(module) -> list[str]:
+    paginator = module.ssm.get_paginator.return_value
+    return [call.kwargs["Path"] for call in paginator.paginate.call_args_list]
+
+
+def _event(*mno_ids: str) -> dict:
+    return {
+        "alert_reference": "ref-1",
+        "broadcast_start": "2025-05-12T09:00:00Z",
+        "mnos": [{"mno_id": mno_id, "provider_message_id": f"broadcast-{mno_id}"} for mno_id in mno_ids],
+    }
+
+
+def test_lookups_for_every_mno_share_one_bulk_fetch_per_prefix():
+    module = _load()
+
+    assert module._get_mno_identifier("EE") == "EE1234"
+    assert module._get_mno_identifier("vodafone") == "VF5678"
+    assert module._get_mno_emails("ee") == ["a@ee.example", "b@ee.example"]
+    assert module._get_mno_emails("vodafone") == ["c@vf.example"]
+
+    assert sorted(_paginated_paths(module)) == ["/operator-portal/mno-emails", "/operator-portal/mno-ids"]
+    module.ssm.get_parameter.assert_not_called()
+
+
+def test_warm_invocation_makes_no_ssm_calls():
+    module = _load()
+    module.ddb.batch_get_item.return_value = {"Responses": {"invite-tracking": []}}
+
+    with mock.patch("boto3.client", side_effect=lambda *a, **k: mock.MagicMock()):
+        module.lambda_handler(_event("ee", "vodafone"), None)
+        calls_after_cold_start = len(_paginated_paths(module))
+        module.lambda_handler(_event("ee", "vodafone"), None)
+
+    assert calls_after_cold_start == 2
+    assert len(_paginated_paths(module)) == 2
+
+
+def test_cache_is_refreshed_once_the_ttl_has_elapsed():
+    module = _load()
+    module.MNO_SSM_CACHE_TTL_SECONDS = 60
+
+    with mock.patch.object(module.time, "monotonic", return_value=1000.0):
+        module._get_mno_identifier("ee")
+    with mock.patch.object(module.time, "monotonic", return_value=1059.0):
+        module._get_mno_identifier("ee")
+    assert len(_paginated_paths(module)) == 2
+
+    with mock.patch.object(module.time, "monotonic", return_value=1061.0):
+        module._get_mno_identifier("ee")
+    assert len(_paginated_paths(module)) == 4
+
+
+def test_explicit_invalidation_forces_a_reload():
+    module = _load()
+    module._get_mno_identifier("ee")
+
+    module.invalidate_mno_cache()
+    module._get_mno_identifier("ee")
+
+    assert len(_paginated_paths(module)) == 4
+
+
+def test_refresh_flag_in_event_invalidates_the_cache():
+    module = _load()
+    module.ddb.batch_get_item.return_value = {"Responses": {"invite-tracking": []}}
+
+    with mock.patch("boto3.client", side_effect=lambda *a, **k: mock.MagicMock()):
+        module.lambda_handler(_event("ee"), None)
+        module.lambda_handler({**_event("ee"), "refresh_mno_config": True}, None)
+
+    assert len(_paginated_paths(module)) == 4
+
+
+def test_unknown_mno_returns_no_identifier_or_emails():
+    module = _load()
+
+    assert module._get_mno_identifier("three") is None
+    assert module._get_mno_emails("three") == []
+
+
+def test_ssm_failure_with_nothing_loaded_fails_the_invocation_once(caplog):
+    module = _load()
+    paginator = module.ssm.get_paginator.return_value
+    paginator.paginate.side_effect = Exception("throttled")
+
+    with pytest.raises(Exception, match="throttled"):
+        module.lambda_handler(_event("ee", "vodafone", "three"), None)
+
+    assert len(_paginated_paths(module)) == 1
+    assert [r.getMessage() for r in caplog.records if "SSM" in r.getMessage()] == [
+        "Error fetching MNO SSM parameters: throttled"
+    ]
+    module.ddb.batch_get_item.assert_not_called()
+
+
+def test_ssm_failure_is_retried_by_the_next_invocation():
+    module = _load()
+    paginator = module.ssm.get_paginator.return_value
+    paginator.paginate.side_effect = Exception("throttled")
+    with pytest.raises(Exception):
+        module._get_mno_identifier("ee")
+
+    paginator.paginate.side_effect = lambda Path, **kwargs: [{"Parameters": SSM_PARAMETERS[Path]}]
+    assert module._get_mno_identifier("ee") == "EE1234"
+
+
+def test_failed_refresh_serves_the_previous_values_without_retrying_ssm_per_lookup():
+    module = _load()
+    module.MNO_SSM_CACHE_TTL_SECONDS = 60
+    paginator = module.ssm.get_paginator.return_value
+    with mock.patch.object(module.time, "monotonic", return_value=1000.0):
+        module._get_mno_identifier("ee")
+
+    paginator.paginate.side_effect = Exception("throttled")
+    with mock.patch.object(module.time, "monotonic", return_value=1061.0):
+        assert module._get_mno_identifier("ee") == "EE1234"
+        assert module._get_mno_emails("vodafone") == ["c@vf.example"]
+    assert len(_paginated_paths(module)) == 3
+
+    paginator.paginate.side_effect = lambda Path, **kwargs: [{"Parameters": SSM_PARAMETERS[Path]}]
+    with mock.patch.object(module.time, "monotonic", return_value=1061.0 + module.MNO_SSM_ERROR_RETRY_SECONDS):
+        module._get_mno_identifier("ee")
+    assert len(_paginated_paths(module)) == 5
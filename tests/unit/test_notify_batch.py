@@ -0,0 +1,221 @@
+"""
+Callers hand every recipient for an MNO (or an upload) to the Notify lambda in one
+asynchronous invocation, and the Notify lambda reports a status per recipient. Each
+email carries a per-recipient reference, so an asynchronous retry of the invocation
+skips recipients an earlier attempt already emailed.
+"""
+
+import json
+from unittest import mock
+
+import pytest
+
+from tests.unit._lambda_loader import load_lambda_module
+
+NOTIFY_PATH = (
+    "terraform/modules/operator-request-portal-lambda-functions/notify-email-communications/"
+    "files/notify-service-lambda.py"
+)
+UPLOAD_HANDLER_PATH = (
+    "terraform/modules/operator-request-portal-lambda-functions/log-mgt-functions/"
+    "lambda-log-upload/files/log-upload-handler.py"
+)
+DOWNLOAD_HANDLER_PATH = (
+    "terraform/modules/operator-request-portal-lambda-functions/log-mgt-functions/"
+    "lambda-log-download/files/lambda-log-download.py"
+)
+
+UPLOAD_ENV = {
+    "LOG_BUCKET_NAME": "log-bucket",
+    "UPLOAD_DOMAIN": "upload.example.gov.uk",
+    "NOTIFY_LAMBDA_ARN": "arn:aws:lambda:eu-west-2:123456789012:function:notify",
+    "NOTIFY_LOG_TEMPLATE_ID": "template-id",
+    "LOG_INVITE_TRACKING_TABLE": "invite-tracking",
+    "LOG_UPLOAD_TRACKING_TABLE": "upload-tracking",
+}
+
+DOWNLOAD_ENV = {
+    "GDS_AWS_PROFILE": "emergency-alerts-test",
+    "NOTIFY_LAMBDA_ARN": "arn:aws:lambda:eu-west-2:123456789012:function:notify",
+    "NOTIFY_TEMPLATE_ID": "template-id",
+    "LOG_INVITE_TRACKING_TABLE": "invite-tracking",
+    "ALERTS_TEAM_EMAILS": "alerts@example.gov.uk, duty@example.gov.uk",
+}
+
+BATCH_EVENT = {
+    "template_id": "template-id",
+    "personalisation": {"broadcastRef": "broadcast-1", "MNO": "three"},
+    "recipients": [
+        {"email_address": "a@three.example"},
+        {"email_address": "b@three.example", "personalisation": {"MNO": "Three UK"}},
+    ],
+}
+
+
+def _load_notify():
+    module = load_lambda_module(NOTIFY_PATH, f"notify_service_{id(object())}", env={"NOTIFY_API_KEY_PARAM": "/key"})
+    module.ssm.get_parameter.return_value = {"Parameter": {"Value": "api-key"}}
+    return module
+
+
+def _invoked_payloads(lambda_cli) -> list[dict]:
+    return [json.loads(call.kwargs["Payload"]) for call in lambda_cli.invoke.call_args_list]
+
+
+def test_batch_payload_sends_one_email_per_recipient():
+    module = _load_notify()
+
+    with mock.patch.object(module, "NotificationsAPIClient") as client_cls:
+        client = client_cls.return_value
+        client.send_email_notification.side_effect = [{"id": "n-1"}, {"id": "n-2"}]
+        response = module.lambda_handler(BATCH_EVENT, None)
+
+    assert response["statusCode"] == 200
+    assert json.loads(response["body"])["results"] == [
+        {"status": "sent", "notification_id": "n-1"},
+        {"status": "sent", "notification_id": "n-2"},
+    ]
+    client_cls.assert_called_once()
+    personalisations = [call.kwargs["personalisation"] for call in client.send_email_notification.call_args_list]
+    assert personalisations == [
+        {"broadcastRef": "broadcast-1", "MNO": "three"},
+        {"broadcastRef": "broadcast-1", "MNO": "Three UK"},
+    ]
+
+
+def test_one_failed_recipient_does_not_stop_the_batch():
+    module = _load_notify()
+    event = {**BATCH_EVENT, "recipients": [{"email_address": "a@three.example"}, {}, *BATCH_EVENT["recipients"][1:]]}
+
+    with mock.patch.object(module, "NotificationsAPIClient") as client_cls:
+        client_cls.return_value.send_email_notification.side_effect = [Exception("400 BadRequest"), {"id": "n-2"}]
+        response = module.lambda_handler(event, None)
+
+    assert response["statusCode"] == 207
+    statuses = [result["status"] for result in json.loads(response["body"])["results"]]
+    assert statuses == ["failed", "invalid", "sent"]
+
+
+def test_single_recipient_payload_is_still_accepted():
+    module = _load_notify()
+    event = {"email_address": "a@three.example", "template_id": "template-id", "personalisation": {}}
+
+    with mock.patch.object(module, "NotificationsAPIClient") as client_cls:
+        client_cls.return_value.send_email_notification.return_value = {"id": "n-1"}
+        response = module.lambda_handler(event, None)
+
+    assert response["statusCode"] == 200
+    assert json.loads(response["body"])["notification_id"] == "n-1"
+
+
+def test_batch_without_template_is_rejected():
+    module = _load_notify()
+
+    response = module.lambda_handler({"recipients": []}, None)
+
+    assert response["statusCode"] == 400
+    module.ssm.get_parameter.assert_not_called()
+
+
+def _context(request_id: str = "req-1", remaining_ms: int = 120_000):
+    context = mock.MagicMock(aws_request_id=request_id)
+    context.get_remaining_time_in_millis.return_value = remaining_ms
+    return context
+
+
+def test_each_recipient_is_sent_with_a_reference_the_async_retry_keeps():
+    module = _load_notify()
+
+    with mock.patch.object(module, "NotificationsAPIClient") as client_cls:
+        client = client_cls.return_value
+        client.get_all_notifications.return_value = {"notifications": []}
+        client.send_email_notification.side_effect = [{"id": "n-1"}, {"id": "n-2"}]
+        module.lambda_handler(BATCH_EVENT, _context())
+
+    references = [call.kwargs["reference"] for call in client.send_email_notification.call_args_list]
+    assert references == ["req-1-0", "req-1-1"]
+    assert client_cls.call_args.kwargs["timeout"] == module.NOTIFY_REQUEST_TIMEOUT_SECONDS
+
+
+def test_retry_skips_recipients_an_earlier_attempt_already_emailed():
+    module = _load_notify()
+    sent = {"req-1-0": [{"id": "n-1", "status": "delivered"}], "req-1-1": []}
+
+    with mock.patch.object(module, "NotificationsAPIClient") as client_cls:
+        client = client_cls.return_value
+        client.get_all_notifications.side_effect = lambda reference: {"notifications": sent[reference]}
+        client.send_email_notification.return_value = {"id": "n-2"}
+        response = module.lambda_handler(BATCH_EVENT, _context())
+
+    assert json.loads(response["body"])["results"] == [
+        {"status": "sent", "notification_id": "n-1"},
+        {"status": "sent", "notification_id": "n-2"},
+    ]
+    client.send_email_notification.assert_called_once()
+    assert client.send_email_notification.call_args.kwargs["email_address"] == "b@three.example"
+
+
+def test_recipient_whose_earlier_email_failed_is_sent_again():
+    module = _load_notify()
+
+    with mock.patch.object(module, "NotificationsAPIClient") as client_cls:
+        client = client_cls.return_value
+        client.get_all_notifications.return_value = {"notifications": [{"id": "n-0", "status": "technical-failure"}]}
+        client.send_email_notification.side_effect = [{"id": "n-1"}, {"id": "n-2"}]
+        module.lambda_handler(BATCH_EVENT, _context())
+
+    assert client.send_email_notification.call_count == 2
+
+
+def test_failed_sent_check_still_sends_the_email():
+    module = _load_notify()
+
+    with mock.patch.object(module, "NotificationsAPIClient") as client_cls:
+        client = client_cls.return_value
+        client.get_all_notifications.side_effect = Exception("503 ServiceUnavailable")
+        client.send_email_notification.side_effect = [{"id": "n-1"}, {"id": "n-2"}]
+        response = module.lambda_handler(BATCH_EVENT, _context())
+
+    assert response["statusCode"] == 200
+    assert client.send_email_notification.call_count == 2
+
+
+def test_batch_short_of_time_sends_what_it_can_then_raises_for_the_retry():
+    module = _load_notify()
+    context = _context()
+    context.get_remaining_time_in_millis.side_effect = [60_000, module.RECIPIENT_TIME_RESERVE_MS - 1]
+
+    with mock.patch.object(module, "NotificationsAPIClient") as client_cls:
+        client = client_cls.return_value
+        client.get_all_notifications.return_value = {"notifications": []}
+        client.send_email_notification.return_value = {"id": "n-1"}
+        with pytest.raises(module.BatchDeferred):
+            module.lambda_handler(BATCH_EVENT, context)
+
+    client.send_email_notification.assert_called_once()
+    assert client.send_email_notification.call_args.kwargs["reference"] == "req-1-0"
+
+
+def test_invite_makes_one_invoke_per_mno():
+    module = load_lambda_module(UPLOAD_HANDLER_PATH, f"log_upload_handler_{id(object())}", env=UPLOAD_ENV)
+
+    module.send_invite(["a@three.example", "b@three.example"], "broadcast-1", "three", "PORTAL1")
+
+    (payload,) = _invoked_payloads(module.lambda_cli)
+    assert payload["recipients"] == [{"email_address": "a@three.example"}, {"email_address": "b@three.example"}]
+    assert payload["personalisation"]["broadcastRef"] == "broadcast-1"
+
+
+def test_download_notification_makes_one_invoke_per_upload():
+    module = load_lambda_module(DOWNLOAD_HANDLER_PATH, f"lambda_log_download_{id(object())}", env=DOWNLOAD_ENV)
+    module.ddb.get_item.return_value = {}
+
+    module.send_notification(
+        "broadcast-1", "THREE", "log-bucket", "received/logs/broadcast-1/CBC_THREE_20250101-0000Z_broadcast-1.zip"
+    )
+
+    (payload,) = _invoked_payloads(module.lambda_cli)
+    assert payload["recipients"] == [
+        {"email_address": "alerts@example.gov.uk"},
+        {"email_address": "duty@example.gov.uk"},
+    ]
@@ -0,0 +1,107 @@
+"""
+The Notify API key and client are reused across warm invocations, re-read from SSM
+once the TTL lapses, and refreshed straight away if Notify rejects the key.
+"""
+
+from unittest import mock
+
+from notifications_python_client.errors import HTTPError
+
+from tests.unit._lambda_loader import load_lambda_module
+
+NOTIFY_PATH = (
+    "terraform/modules/operator-request-portal-lambda-functions/notify-email-communications/"
+    "files/notify-service-lambda.py"
+)
+
+EVENT = {"email_address": "a@three.example", "template_id": "template-id", "personalisation": {}}
+
+
+def _load(*api_keys: str):
+    module = load_lambda_module(NOTIFY_PATH, f"notify_service_{id(object())}", env={"NOTIFY_API_KEY_PARAM": "/key"})
+    module.ssm.get_parameter.side_effect = [{"Parameter": {"Value": key}} for key in api_keys]
+    return module
+
+
+def _auth_error():
+    return HTTPError(mock.Mock(status_code=403, json=lambda: {"errors": [{"error": "AuthError"}]}))
+
+
+def _client_factory():
+    """Build one mock NotificationsAPIClient per API key, recording the keys used."""
+    clients = {}
+
+    def _build(api_key, timeout=None):
+        clients[api_key] = mock.MagicMock(name=f"client-{api_key}")
+        clients[api_key].send_email_notification.return_value = {"id": f"sent-with-{api_key}"}
+        return clients[api_key]
+
+    return clients, _build
+
+
+def test_warm_invocations_reuse_the_key_and_client():
+    module = _load("key-1")
+    clients, build = _client_factory()
+
+    with mock.patch.object(module, "NotificationsAPIClient", side_effect=build):
+        for _ in range(3):
+            assert module.lambda_handler(EVENT, None)["statusCode"] == 200
+
+    module.ssm.get_parameter.assert_called_once()
+    assert list(clients) == ["key-1"]
+    assert clients["key-1"].send_email_notification.call_count == 3
+
+
+def test_key_is_re_read_once_the_ttl_has_elapsed():
+    module = _load("key-1", "key-1", "key-2")
+    module.NOTIFY_API_KEY_TTL_SECONDS = 60
+    clients, build = _client_factory()
+
+    with mock.patch.object(module, "NotificationsAPIClient", side_effect=build):
+        for now in (1000.0, 1059.0, 1060.0, 1121.0):
+            with mock.patch.object(module.time, "monotonic", return_value=now):
+                module.lambda_handler(EVENT, None)
+
+    assert module.ssm.get_parameter.call_count == 3
+    # An unchanged key value keeps the existing client.
+    assert list(clients) == ["key-1", "key-2"]
+
+
+def test_auth_error_forces_a_refresh_and_one_retry():
+    module = _load("old-key", "new-key")
+    clients, build = _client_factory()
+
+    with mock.patch.object(module, "NotificationsAPIClient", side_effect=build):
+        module.get_notify_client()
+        clients["old-key"].send_email_notification.side_effect = _auth_error()
+        response = module.lambda_handler(EVENT, None)
+
+    assert response["statusCode"] == 200
+    assert '"sent-with-new-key"' in response["body"]
+    assert module.ssm.get_parameter.call_count == 2
+
+
+def test_auth_error_with_an_unchanged_key_is_not_retried():
+    module = _load("key-1", "key-1")
+    clients, build = _client_factory()
+
+    with mock.patch.object(module, "NotificationsAPIClient", side_effect=build):
+        module.get_notify_client()
+        clients["key-1"].send_email_notification.side_effect = _auth_error()
+        response = module.lambda_handler(EVENT, None)
+
+    assert response["statusCode"] == 500
+    assert clients["key-1"].send_email_notification.call_count == 1
+
+
+def test_other_notify_errors_do_not_refresh_the_key():
+    module = _load("key-1")
+    clients, build = _client_factory()
+
+    with mock.patch.object(module, "NotificationsAPIClient", side_effect=build):
+        module.get_notify_client()
+        clients["key-1"].send_email_notification.side_effect = HTTPError(mock.Mock(status_code=400, json=dict))
+        response = module.lambda_handler(EVENT, None)
+
+    assert response["statusCode"] == 500
+    module.ssm.get_parameter.assert_called_once()
@@ -0,0 +1,134 @@
+"""
+build_site.py renders the static pages, fingerprints the gulp-built assets (rewriting
+the references to them), inlines each page's critical CSS and writes precompressed
+copies and the manifest Terraform uploads from.
+"""
+
+import gzip
+import importlib.util
+import json
+import shutil
+
+import pytest
+
+from tests.unit._lambda_loader import REPO_ROOT
+
+SITE_DIR = REPO_ROOT / "terraform/modules/operator-request-portal-static-site/files"
+
+STYLESHEET = """
+@font-face { font-family: "GDS Transport"; src: url("/assets/fonts/bold.woff2") format("woff2"); }
+.govuk-template { background-color: #f3f2f1; }
+.govuk-header, .unused-widget { background: url(../images/crest.svg); }
+.unused-widget > .unused-child { color: red; }
+@media (min-width: 40.0625em) { .govuk-width-container { margin: 0 30px; } .unused-widget { margin: 0; } }
+@keyframes spin { from { transform: rotate(0); } }
+"""
+
+
+def _load_build_site():
+    spec = importlib.util.spec_from_file_location("build_site", SITE_DIR / "build_site.py")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+@pytest.fixture
+def build_site():
+    return _load_build_site()
+
+
+@pytest.fixture
+def site_dir(tmp_path):
+    site = tmp_path / "site"
+    shutil.copytree(SITE_DIR / "templates", site / "templates")
+    shutil.copytree(SITE_DIR / "content", site / "content")
+    assets = site / "assets"
+    (assets / "stylesheets").mkdir(parents=True)
+    (assets / "fonts").mkdir()
+    (assets / "images").mkdir()
+    (assets / "stylesheets/all.css").write_text(STYLESHEET)
+    (assets / "fonts/bold.woff2").write_bytes(b"font")
+    (assets / "images/crest.svg").write_text("<svg/>")
+    (assets / "images/govuk-crest.svg").write_text("<svg>crest</svg>")
+    (assets / "images/favicon.ico").write_bytes(b"icon")
+    (assets / "images/favicon.svg").write_text("<svg>favicon</svg>")
+    return site
+
+
+def test_assets_are_fingerprinted_and_references_rewritten(build_site, site_dir, tmp_path):
+    manifest = build_site.build(site_dir, tmp_path / "dist", year=2026)
+
+    paths = manifest["asset_paths"]
+    font, crest = paths["assets/fonts/bold.woff2"], paths["assets/images/crest.svg"]
+    css = paths["assets/stylesheets/all.css"]
+    assert font.startswith("assets/fonts/bold.") and font.endswith(".woff2")
+    built_css = (tmp_path / "dist" / css).read_text()
+    assert f'url("/{font}")' in built_css and f"url(/{crest})" in built_css
+
+    index = (tmp_path / "dist/index.html").read_text()
+    assert f'href="{css}"' in index and f'href="{paths["assets/images/favicon.ico"]}"' in index
+    assert "<title>Welcome to the Operator Portal</title>" in index
+    assert "© Crown copyright 2026" in index
+    assert manifest["assets"][css]["cache_control"] == "public, max-age=31536000, immutable"
+    assert manifest["pages"]["index.html"]["cache_control"] == "no-cache"
+    assert json.loads((tmp_path / "dist/manifest.json").read_text()) == manifest
+
+
+def test_changed_asset_changes_the_hash_of_stylesheets_referencing_it(build_site, site_dir, tmp_path):
+    before = build_site.build(site_dir, tmp_path / "one")["asset_paths"]
+    (site_dir / "assets/fonts/bold.woff2").write_bytes(b"new font")
+    after = build_site.build(site_dir, tmp_path / "two")["asset_paths"]
+
+    assert after["assets/fonts/bold.woff2"] != before["assets/fonts/bold.woff2"]
+    assert after["assets/stylesheets/all.css"] != before["assets/stylesheets/all.css"]
+    assert after["assets/images/crest.svg"] == before["assets/images/crest.svg"]
+
+
+def test_critical_css_keeps_only_rules_that_can_match_the_page(build_site):
+    tokens = {"govuk-template", "govuk-header", "govuk-width-container"}
+
+    critical = build_site.critical_css(STYLESHEET, tokens)
+
+    assert ".govuk-template{background-color: #f3f2f1;}" in critical
+    assert ".govuk-header{background: url(../images/crest.svg);}" in critical
+    assert "@media (min-width: 40.0625em){.govuk-width-container{margin: 0 30px;}}" in critical
+    assert "@font-face" in critical
+    assert "unused" not in critical and "@keyframes" not in critical
+
+
+def test_pages_inline_critical_css_and_preload_the_stylesheet(build_site, site_dir, tmp_path):
+    manifest = build_site.build(site_dir, tmp_path / "dist")
+    css = manifest["asset_paths"]["assets/stylesheets/all.css"]
+
+    index = (tmp_path / "dist/index.html").read_text()
+
+    assert "<style>" in index and ".govuk-template{" in index and "unused" not in index
+    assert f'<link rel="preload" href="{css}" as="style"' in index
+    assert f'<noscript><link rel="stylesheet" href="{css}"></noscript>' in index
+
+
+def test_page_too_large_for_the_first_round_trip_keeps_its_stylesheet_link(build_site, site_dir, tmp_path):
+    build_site.INITIAL_WINDOW_BYTES = 0
+    manifest = build_site.build(site_dir, tmp_path / "dist")
+
+    index = (tmp_path / "dist/index.html").read_text()
+
+    assert "<style>" not in index
+    assert f'<link rel="stylesheet" href="{manifest["asset_paths"]["assets/stylesheets/all.css"]}">' in index
+
+
+def test_compressible_assets_have_precompressed_copies(build_site, site_dir, tmp_path):
+    manifest = build_site.build(site_dir, tmp_path / "dist")
+    css = manifest["asset_paths"]["assets/stylesheets/all.css"]
+    font = manifest["asset_paths"]["assets/fonts/bold.woff2"]
+
+    variant = manifest["assets"][css + ".gz"]
+    dist = tmp_path / "dist"
+    assert variant["content_encoding"] == "gzip" and variant["content_type"] == "text/css"
+    assert gzip.decompress((dist / variant["source"]).read_bytes()) == (dist / css).read_bytes()
+    assert manifest["assets"][css]["content_encoding"] is None
+    assert font + ".gz" not in manifest["assets"]
+    assert manifest["encodings"][-1] == "gzip"
+    if build_site.brotli is not None:
+        assert manifest["encodings"] == ["br", "gzip"]
+        assert manifest["assets"][css + ".br"]["content_encoding"] == "br"
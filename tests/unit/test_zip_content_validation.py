@@ -7,6 +7,8 @@ import io
 import zipfile
 from unittest import mock
 
+import pytest
+
 from tests.unit._lambda_loader import load_lambda_module
 
 MODULE_PATH = (
@@ -23,8 +25,10 @@ ENV = {
 }
 
 
-def _load():
-    return load_lambda_module(MODULE_PATH, f"lambda_log_download_{id(object())}", env=ENV)
+def _load(validation_mode: str = "suffix"):
+    return load_lambda_module(
+        MODULE_PATH, f"lambda_log_download_{id(object())}", env={**ENV, "ZIP_VALIDATION_MODE": validation_mode}
+    )
 
 
 def _make_zip_bytes() -> bytes:
@@ -38,10 +42,15 @@ def _mock_s3_object(module, content: bytes):
     module.s3.head_object.return_value = {"ContentLength": len(content)}
 
     def _get_object(Bucket, Key, Range):
-        start, end = (int(part) for part in Range.replace("bytes=", "").split("-"))
+        start, end = Range.replace("bytes=", "").split("-")
+        if start:
+            start, end = int(start), min(int(end), len(content) - 1)
+        else:
+            # Suffix range: the last N bytes, or the whole object if it is smaller.
+            start, end = max(0, len(content) - int(end)), len(content) - 1
         body = mock.MagicMock()
         body.read.return_value = content[start:end + 1]
-        return {"Body": body}
+        return {"Body": body, "ContentRange": f"bytes {start}-{end}/{len(content)}"}
 
     module.s3.get_object.side_effect = _get_object
 
@@ -79,18 +88,16 @@ def test_empty_object_is_rejected():
     assert module._is_zip_content(BUCKET, "received/logs/x/CBC_x_MNO1.zip") is False
 
 
-def test_is_zip_content_reads_from_the_bucket_named_in_the_event_not_a_hardcoded_one():
+@pytest.mark.parametrize("validation_mode", ["suffix", "head"])
+def test_is_zip_content_reads_from_the_bucket_named_in_the_event_not_a_hardcoded_one(validation_mode):
     """Regression test: the bucket to inspect must come from the triggering S3 event
     record, not a fixed/env-configured bucket name."""
-    module = _load()
+    module = _load(validation_mode)
     _mock_s3_object(module, _make_zip_bytes())
 
-    module._is_zip_content(BUCKET, "received/logs/x/CBC_x_MNO1.zip")
+    assert module._is_zip_content(BUCKET, "received/logs/x/CBC_x_MNO1.zip") is True
 
-    module.s3.head_object.assert_called_once_with(
-        Bucket=BUCKET, Key="received/logs/x/CBC_x_MNO1.zip"
-    )
-    for call in module.s3.get_object.call_args_list:
+    for call in module.s3.head_object.call_args_list + module.s3.get_object.call_args_list:
         assert call.kwargs["Bucket"] == BUCKET
 
 
@@ -136,6 +143,6 @@ def test_lambda_handler_sends_notification_for_valid_zip():
     module.lambda_handler(event, None)
 
     module.lambda_cli.invoke.assert_called_once()
-    module.s3.head_object.assert_called_once_with(
-        Bucket=BUCKET, Key=SELF_DESCRIPTIVE_KEY
+    module.s3.get_object.assert_called_once_with(
+        Bucket=BUCKET, Key=SELF_DESCRIPTIVE_KEY, Range=f"bytes=-{module.MAX_EOCD_SEARCH_WINDOW}"
     )
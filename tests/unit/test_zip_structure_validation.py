@@ -0,0 +1,251 @@
+"""
+Uploads are structurally validated from the EOCD record and central directory alone,
+using ranged reads, so zip bombs and truncated archives are rejected without
+downloading the whole object.
+"""
+
+import io
+import random
+import struct
+import zipfile
+from unittest import mock
+
+from tests.unit._lambda_loader import load_lambda_module
+
+MODULE_PATH = (
+    "terraform/modules/operator-request-portal-lambda-functions/log-mgt-functions/"
+    "lambda-log-download/files/lambda-log-download.py"
+)
+
+ENV = {
+    "GDS_AWS_PROFILE": "emergency-alerts-test",
+    "NOTIFY_LAMBDA_ARN": "arn:aws:lambda:eu-west-2:123456789012:function:notify",
+    "NOTIFY_TEMPLATE_ID": "template-id",
+    "LOG_INVITE_TRACKING_TABLE": "invite-tracking",
+    "ALERTS_TEAM_EMAILS": "alerts@example.gov.uk",
+}
+
+BUCKET = "log-bucket"
+KEY = "received/logs/x/CBC_x_MNO1.zip"
+
+
+def _load():
+    return load_lambda_module(MODULE_PATH, f"lambda_log_download_{id(object())}", env=ENV)
+
+
+def _make_zip_bytes(entries: dict) -> bytes:
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, "w", zipfile.ZIP_DEFLATED) as zf:
+        for name, content in entries.items():
+            zf.writestr(name, content)
+    return buf.getvalue()
+
+
+def _log_entries(count: int) -> dict:
+    return {f"cbc-{i}.log": f"2025-05-12T09:00:{i % 60:02d}Z broadcast sent to cell {i}\n" for i in range(count)}
+
+
+def _as_zip64(content: bytes) -> bytes:
+    """Rewrite a plain archive's EOCD the way large archives are written: saturated
+    fields in the EOCD, real values in a ZIP64 EOCD record found via its locator."""
+    eocd_offset = content.rindex(b"PK\x05\x06")
+    _, _, _, _, entries, cd_size, cd_offset, _ = struct.unpack_from("<4sHHHHIIH", content, eocd_offset)
+    zip64_record = struct.pack("<4sQHHIIQQQQ", b"PK\x06\x06", 44, 45, 45, 0, 0, entries, entries, cd_size, cd_offset)
+    locator = struct.pack("<4sIQI", b"PK\x06\x07", 0, eocd_offset, 1)
+    eocd = struct.pack("<4sHHHHIIH", b"PK\x05\x06", 0, 0, 0xFFFF, 0xFFFF, 0xFFFFFFFF, 0xFFFFFFFF, 0)
+    return content[:eocd_offset] + zip64_record + locator + eocd
+
+
+def _with_prefix(content: bytes, prefix: bytes) -> bytes:
+    """Prepend bytes to an archive, rebasing its central directory so it stays self-consistent."""
+    eocd_offset = content.rindex(b"PK\x05\x06")
+    cd_offset = struct.unpack_from("<I", content, eocd_offset + 16)[0]
+    rebased = bytearray(content)
+    position = cd_offset
+    while rebased[position:position + 4] == b"PK\x01\x02":
+        name_len, extra_len, comment_len = struct.unpack_from("<HHH", rebased, position + 28)
+        local_offset = struct.unpack_from("<I", rebased, position + 42)[0]
+        struct.pack_into("<I", rebased, position + 42, local_offset + len(prefix))
+        position += 46 + name_len + extra_len + comment_len
+    struct.pack_into("<I", rebased, eocd_offset + 16, cd_offset + len(prefix))
+    return prefix + bytes(rebased)
+
+
+def _mock_s3_object(module, content: bytes):
+    module.s3.head_object.return_value = {"ContentLength": len(content)}
+
+    def _get_object(Bucket, Key, Range):
+        start, end = Range.replace("bytes=", "").split("-")
+        if start:
+            start, end = int(start), min(int(end), len(content) - 1)
+        else:
+            # Suffix range: the last N bytes, or the whole object if it is smaller.
+            start, end = max(0, len(content) - int(end)), len(content) - 1
+        body = mock.MagicMock()
+        body.read.return_value = content[start:end + 1]
+        return {"Body": body, "ContentRange": f"bytes {start}-{end}/{len(content)}"}
+
+    module.s3.get_object.side_effect = _get_object
+
+
+def test_report_covers_every_entry_from_the_tail_read_alone():
+    module = _load()
+    content = _make_zip_bytes(_log_entries(20))
+    _mock_s3_object(module, content)
+
+    report = module.inspect_zip(BUCKET, KEY, len(content))
+
+    assert report["entries"] == 20
+    assert report["uncompressed_size"] == sum(len(v) for v in _log_entries(20).values())
+    assert report["anomalies"] == []
+    # The whole (small) archive fits in the tail read: no further GETs were needed.
+    assert module.s3.get_object.call_count == 1
+
+
+def test_zip64_end_of_central_directory_is_followed():
+    module = _load()
+    content = _as_zip64(_make_zip_bytes(_log_entries(3)))
+    _mock_s3_object(module, content)
+
+    assert module.inspect_zip(BUCKET, KEY, len(content))["entries"] == 3
+    assert module._is_zip_content(BUCKET, KEY) is True
+
+
+def test_zip64_central_directory_sizes_are_read_from_the_extra_field():
+    module = _load()
+    fields = [0] * 17
+    fields[8] = fields[9] = 0xFFFFFFFF
+    fields[16] = 128
+    extra = struct.pack("<HHQQ", 0x0001, 16, 6 * 1024 ** 3, 5 * 1024 ** 3)
+
+    entry = module._central_directory_entry(tuple(fields), extra)
+
+    assert entry == {
+        "uncompressed_size": 6 * 1024 ** 3,
+        "compressed_size": 5 * 1024 ** 3,
+        "local_header_offset": 128,
+    }
+
+
+def test_highly_compressed_entry_is_rejected_as_a_zip_bomb():
+    module = _load()
+    _mock_s3_object(module, _make_zip_bytes({"bomb.log": b"\0" * (4 * 1024 * 1024)}))
+
+    assert module._is_zip_content(BUCKET, KEY) is False
+
+
+def test_total_uncompressed_size_over_the_limit_is_rejected():
+    module = _load()
+    module.ZIP_MAX_UNCOMPRESSED_BYTES = 100
+    _mock_s3_object(module, _make_zip_bytes(_log_entries(5)))
+
+    assert module._is_zip_content(BUCKET, KEY) is False
+
+
+def test_too_many_entries_are_rejected_without_walking_the_directory():
+    module = _load()
+    module.ZIP_MAX_ENTRIES = 10
+    module.MAX_EOCD_SEARCH_WINDOW = 64
+    _mock_s3_object(module, _make_zip_bytes(_log_entries(11)))
+
+    assert module._is_zip_content(BUCKET, KEY) is False
+    # The suffix read only.
+    module.s3.get_object.assert_called_once()
+
+
+def test_archive_with_missing_bytes_is_rejected():
+    module = _load()
+    content = _make_zip_bytes(_log_entries(5))
+    _mock_s3_object(module, content[:30] + content[60:])
+
+    assert module._is_zip_content(BUCKET, KEY) is False
+
+
+def test_central_directory_outside_the_tail_is_streamed_in_chunks():
+    module = _load()
+    module.MAX_EOCD_SEARCH_WINDOW = 64
+    module.ZIP_DIRECTORY_READ_CHUNK_BYTES = 256
+    content = _make_zip_bytes(_log_entries(50))
+    _mock_s3_object(module, content)
+
+    report = module.inspect_zip(BUCKET, KEY, len(content))
+
+    assert report["entries"] == 50
+    directory_reads = module.s3.get_object.call_count - 1
+    assert directory_reads > 1
+    assert all(
+        _range_length(call.kwargs["Range"]) <= 256 for call in module.s3.get_object.call_args_list[1:]
+    )
+
+
+def test_trailing_bytes_after_the_end_record_are_rejected():
+    module = _load()
+    _mock_s3_object(module, _make_zip_bytes(_log_entries(2)) + b"appended")
+
+    assert module._is_zip_content(BUCKET, KEY) is False
+
+
+def test_small_archive_is_validated_with_a_single_request():
+    module = _load()
+    _mock_s3_object(module, _make_zip_bytes(_log_entries(5)))
+
+    assert module._is_zip_content(BUCKET, KEY) is True
+
+    module.s3.head_object.assert_not_called()
+    module.s3.get_object.assert_called_once_with(
+        Bucket=BUCKET, Key=KEY, Range=f"bytes=-{module.MAX_EOCD_SEARCH_WINDOW}"
+    )
+
+
+def test_archive_larger_than_the_suffix_window_is_validated_with_a_single_request():
+    module = _load()
+    module.MAX_EOCD_SEARCH_WINDOW = 2048
+    content = _make_zip_bytes({"big.log": random.Random(0).randbytes(8192), **_log_entries(3)})
+    _mock_s3_object(module, content)
+
+    assert len(content) > module.MAX_EOCD_SEARCH_WINDOW
+    assert module._is_zip_content(BUCKET, KEY) is True
+    module.s3.head_object.assert_not_called()
+    module.s3.get_object.assert_called_once_with(Bucket=BUCKET, Key=KEY, Range="bytes=-2048")
+
+
+def test_small_archive_without_a_local_header_at_its_first_entry_is_rejected():
+    module = _load()
+    content = bytearray(_make_zip_bytes(_log_entries(2)))
+    content[:4] = b"XXXX"
+    _mock_s3_object(module, bytes(content))
+
+    assert module._is_zip_content(BUCKET, KEY) is False
+
+
+def test_empty_archive_is_accepted():
+    module = _load()
+    _mock_s3_object(module, _make_zip_bytes({}))
+
+    assert module._is_zip_content(BUCKET, KEY) is True
+
+
+def test_archive_whose_first_entry_is_not_at_the_start_is_rejected():
+    module = _load()
+    stray_entry = _make_zip_bytes({"stray.log": "not listed in the directory"})
+    stray_entry = stray_entry[:stray_entry.rindex(b"PK\x01\x02")]
+    _mock_s3_object(module, _with_prefix(_make_zip_bytes(_log_entries(3)), stray_entry))
+
+    assert module._is_zip_content(BUCKET, KEY) is False
+
+
+def test_head_mode_keeps_the_three_request_validation():
+    module = load_lambda_module(
+        MODULE_PATH, f"lambda_log_download_{id(object())}", env={**ENV, "ZIP_VALIDATION_MODE": "head"}
+    )
+    _mock_s3_object(module, _make_zip_bytes(_log_entries(5)))
+
+    assert module._is_zip_content(BUCKET, KEY) is True
+
+    module.s3.head_object.assert_called_once()
+    assert module.s3.get_object.call_count == 2
+
+
+def _range_length(range_str: str) -> int:
+    start, end = (int(part) for part in range_str.replace("bytes=", "").split("-"))
+    return end - start + 1